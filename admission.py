@@ -0,0 +1,188 @@
+"""
+Request admission: keep game-critical actions fast when reads pile up.
+
+Every request is put in one of three lanes:
+
+- priority: anything that changes state (POST/PUT/PATCH/DELETE), i.e. host
+  actions, answers, joins and heartbeats. Always admitted, never queued.
+- read: GET requests to the API (mostly phones polling their room). Each
+  client has a token bucket, and only `read_slots` reads may run at once,
+  so some server threads are always left for the priority lane. A read
+  that finds every slot taken waits up to `queue_wait` seconds for one,
+  then is shed with 429 and a Retry-After hint.
+- exempt: pages and static files, streams (capped separately, see
+  push.StreamSlots), health checks and admin endpoints.
+
+Read limits are keyed on the client address, which a client cannot
+choose (behind a proxy the app takes it from X-Forwarded-For only for the
+configured number of trusted hops, see TTX_TRUSTED_PROXIES in app.py).
+Each address has an allowance of `clients_per_address` clients' worth of
+reads, so a classroom behind one NAT still fits. The X-Client-Id header
+(script.js sends one per tab) only picks a per-client bucket inside that
+allowance: a client inventing a fresh id per request gets a fresh bucket,
+but never more than its address allows.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Optional, Tuple
+
+PRIORITY = 'priority'
+READ = 'read'
+EXEMPT = 'exempt'
+
+_MUTATING = frozenset(('POST', 'PUT', 'PATCH', 'DELETE'))
+_EXEMPT_PREFIXES = ('/api/health', '/api/admin/')
+
+
+def classify(method: str, path: str) -> str:
+    """Lane of a request"""
+    if method in _MUTATING:
+        return PRIORITY
+    if method == 'OPTIONS' or not path.startswith('/api/'):
+        return EXEMPT
+    if path.startswith(_EXEMPT_PREFIXES) or path.endswith('/stream'):
+        return EXEMPT
+    return READ
+
+
+class TokenBucket:
+    """`rate` requests per second on average, bursts of up to `burst`"""
+
+    __slots__ = ('rate', 'burst', 'tokens', 'stamp')
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.stamp = now
+
+    def take(self, now: float) -> float:
+        """Spend a token; returns 0 when admitted, else seconds until one is available"""
+        self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def refund(self) -> None:
+        """Give back the token of a request that was not admitted after all"""
+        self.tokens = min(self.burst, self.tokens + 1)
+
+
+class _LatencyWindow:
+    """Durations of the most recent requests of one lane"""
+
+    def __init__(self, size: int = 2048):
+        self._samples = deque(maxlen=size)
+
+    def add(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def summary(self) -> dict:
+        samples = sorted(self._samples)
+        if not samples:
+            return {'count': 0, 'p50_ms': None, 'p99_ms': None, 'max_ms': None}
+
+        def pick(q: float) -> float:
+            return round(samples[min(len(samples) - 1, int(q * len(samples)))] * 1000, 2)
+
+        return {'count': len(samples), 'p50_ms': pick(0.5), 'p99_ms': pick(0.99),
+                'max_ms': round(samples[-1] * 1000, 2)}
+
+
+class Admission:
+    """Token buckets per address and per client plus a bounded number of concurrent reads"""
+
+    def __init__(self, read_rate: float = 5.0, read_burst: float = 10.0, read_slots: int = 12,
+                 queue_wait: float = 0.1, max_clients: int = 10000, clients_per_address: int = 60):
+        self.read_rate = read_rate
+        self.read_burst = read_burst
+        self.read_slots = read_slots
+        self.queue_wait = queue_wait
+        self.max_clients = max_clients
+        self.clients_per_address = clients_per_address
+        self._slots = threading.BoundedSemaphore(read_slots)
+        self._lock = threading.Lock()
+        self._addresses: 'OrderedDict[str, TokenBucket]' = OrderedDict()
+        self._buckets: 'OrderedDict[Tuple[str, str], TokenBucket]' = OrderedDict()
+        self._latency = {PRIORITY: _LatencyWindow(), READ: _LatencyWindow()}
+        self.inflight = {PRIORITY: 0, READ: 0}
+        self.admitted = {PRIORITY: 0, READ: 0}
+        self.deferred = 0
+        self.shed = {'rate_limited': 0, 'overloaded': 0}
+
+    def _bucket(self, buckets: OrderedDict, key, rate: float, burst: float, now: float) -> TokenBucket:
+        bucket = buckets.get(key)
+        if bucket is None:
+            bucket = buckets[key] = TokenBucket(rate, burst, now)
+            if len(buckets) > self.max_clients:
+                buckets.popitem(last=False)
+        else:
+            buckets.move_to_end(key)
+        return bucket
+
+    def admit_read(self, address: str, client: str = '') -> Tuple[Optional[str], int]:
+        """
+        Admit a read from `address` (optionally one `client` of it) or say why not.
+
+        Returns (None, 0) once the read holds a slot (call `finish` when it
+        is done), otherwise (reason, retry_after_seconds).
+        """
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._bucket(self._buckets, (address, client), self.read_rate, self.read_burst, now)
+            wait = bucket.take(now)
+            if not wait:
+                shared = self._bucket(self._addresses, address, self.read_rate * self.clients_per_address,
+                                      self.read_burst * self.clients_per_address, now)
+                wait = shared.take(now)
+                if wait:
+                    bucket.refund()
+            if wait:
+                self.shed['rate_limited'] += 1
+                return 'rate_limited', max(1, math.ceil(wait))
+
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.deferred += 1
+            if not self._slots.acquire(timeout=self.queue_wait):
+                with self._lock:
+                    self.shed['overloaded'] += 1
+                return 'overloaded', 1
+
+        with self._lock:
+            self.admitted[READ] += 1
+            self.inflight[READ] += 1
+        return None, 0
+
+    def start_priority(self) -> None:
+        with self._lock:
+            self.admitted[PRIORITY] += 1
+            self.inflight[PRIORITY] += 1
+
+    def finish(self, lane: str, seconds: float) -> None:
+        """Record an admitted request's duration and free its slot"""
+        with self._lock:
+            self.inflight[lane] -= 1
+            self._latency[lane].add(seconds)
+        if lane == READ:
+            self._slots.release()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'read_rate': self.read_rate,
+                'read_burst': self.read_burst,
+                'read_slots': self.read_slots,
+                'clients_per_address': self.clients_per_address,
+                'addresses': len(self._addresses),
+                'clients': len(self._buckets),
+                'inflight': dict(self.inflight),
+                'admitted': dict(self.admitted),
+                'deferred': self.deferred,
+                'shed': dict(self.shed),
+                'latency': {lane: window.summary() for lane, window in self._latency.items()}
+            }
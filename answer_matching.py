@@ -0,0 +1,114 @@
+"""
+Answer normalization and bounded fuzzy judging.
+
+Answers are normalized once when a question is created (accents folded,
+case folded, whitespace and punctuation dropped) and compiled into a
+matcher holding the bit-parallel pattern table for Myers' edit-distance
+algorithm. Judging a guess is then a single pass over the guess with a few
+integer operations per character, with an early exit as soon as the
+distance bound can no longer be met.
+"""
+import unicodedata
+from functools import lru_cache
+from typing import Dict, Tuple
+
+VERDICT_EXACT = 'exact'
+VERDICT_NEAR_MISS = 'near_miss'
+VERDICT_WRONG = 'wrong'
+
+
+def normalize_answer(text: str) -> str:
+    """Fold accents and case, keep only letters and digits"""
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(
+        ch for ch in decomposed.upper()
+        if ch.isalnum() and not unicodedata.combining(ch)
+    )
+
+
+def max_distance_for(length: int) -> int:
+    """Edit distance still counted as a near miss for an answer of `length`"""
+    if length <= 3:
+        return 0
+    if length <= 6:
+        return 1
+    return 2
+
+
+class AnswerMatcher:
+    """Precompiled matcher for one normalized answer"""
+
+    __slots__ = ('answer', 'length', 'max_distance', '_peq', '_full', '_last')
+
+    def __init__(self, normalized: str):
+        self.answer = normalized
+        self.length = len(normalized)
+        self.max_distance = max_distance_for(self.length)
+
+        peq: Dict[str, int] = {}
+        for i, ch in enumerate(normalized):
+            peq[ch] = peq.get(ch, 0) | (1 << i)
+        self._peq = peq
+        self._full = (1 << self.length) - 1
+        self._last = 1 << (self.length - 1) if self.length else 0
+
+    def distance(self, guess: str, bound: int) -> int:
+        """
+        Levenshtein distance between the answer and a normalized guess.
+
+        Uses Myers/Hyyro bit-vector recurrences. Returns `bound + 1` as soon
+        as the distance is known to exceed `bound`.
+        """
+        m = self.length
+        n = len(guess)
+        if abs(m - n) > bound:
+            return bound + 1
+        if m == 0:
+            return n
+
+        peq = self._peq
+        full = self._full
+        last = self._last
+        pv = full
+        mv = 0
+        score = m
+        for j, ch in enumerate(guess):
+            eq = peq.get(ch, 0)
+            xv = eq | mv
+            xh = (((eq & pv) + pv) ^ pv) | eq
+            ph = mv | (~(xh | pv) & full)
+            mh = pv & xh
+            if ph & last:
+                score += 1
+            elif mh & last:
+                score -= 1
+            # Row 0 of the DP matrix grows by one per text char: shift in a 1
+            ph = ((ph << 1) | 1) & full
+            mh = (mh << 1) & full
+            pv = mh | (~(xv | ph) & full)
+            mv = ph & xv
+            # The remaining characters can lower the score by at most one each
+            if score - (n - j - 1) > bound:
+                return bound + 1
+        return score
+
+    def judge(self, guess: str) -> Tuple[str, int]:
+        """Classify a normalized guess; returns (verdict, distance)"""
+        if guess == self.answer:
+            return VERDICT_EXACT, 0
+        bound = self.max_distance
+        dist = self.distance(guess, bound)
+        if dist <= bound:
+            return VERDICT_NEAR_MISS, dist
+        return VERDICT_WRONG, dist
+
+
+@lru_cache(maxsize=4096)
+def compile_answer(normalized: str) -> AnswerMatcher:
+    """Return the shared matcher for a normalized answer"""
+    return AnswerMatcher(normalized)
+
+
+def judge_answer(normalized_answer: str, guess: str) -> Tuple[str, int]:
+    """Normalize a raw guess and judge it against a normalized answer"""
+    return compile_answer(normalized_answer).judge(normalize_answer(guess))
@@ -1,20 +1,157 @@
-from flask import Flask, jsonify, request, send_from_directory
+from flask import Flask, g, jsonify, request, send_file, send_from_directory
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
+import hmac
+import itertools
+import json
+import threading
+import time
 import uuid
 import os
 from datetime import datetime
 from typing import Dict, List, Optional
+from urllib.parse import unquote
+
+import crossword
+from admission import EXEMPT, READ, Admission, classify
+from answer_matching import compile_answer, judge_answer, normalize_answer, VERDICT_EXACT
+from attempt_log import AttemptLog
+from coalescing import SingleFlight
+from eventlog import EventLog
+from journal import JournalCompacted, JournalStore
+from media import MediaError, MediaStore
+from presence import Presence
+import profiling
+from push import BroadcastScheduler, ChangeNotifier, StreamSlots
+import reports
+import wire
+from question_search import QuestionIndex, question_number
+from room_index import InvalidCursor, RoomIndex
+from roster import JoinBatcher, Roster, WaitList
+from score_history import MODES as SCORE_HISTORY_MODES, ScoreHistory
+from tournament import Tournament
+import wordindex
 
 # Get the directory of the current file
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 app = Flask(__name__)
+app.json = wire.WireJSONProvider(app)  # jsonify() also speaks MessagePack on request
 CORS(app)
 
+# Behind a reverse proxy (the Heroku router, nginx) the peer address is the
+# proxy's. TTX_TRUSTED_PROXIES is how many proxy hops to trust: the client
+# address is then read from X-Forwarded-For. Left at 0, the header is
+# ignored, since any client can send one.
+TRUSTED_PROXIES = int(os.environ.get('TTX_TRUSTED_PROXIES', 0))
+if TRUSTED_PROXIES:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=TRUSTED_PROXIES, x_proto=TRUSTED_PROXIES)
+
 # ==================== IN-MEMORY DATABASE ====================
 # In production, use a proper database like PostgreSQL, MongoDB, etc.
-rooms: Dict[str, dict] = {}
-connections: Dict[str, List[str]] = {}  # room_code -> list of player names
+class RoomTable(dict):
+    """Room store; a plain dict that request tracing can hook (see profiling.Tracer)"""
+
+
+rooms: Dict[str, dict] = RoomTable()
+attempt_logs: Dict[str, AttemptLog] = {}  # room_code -> judged answer attempts
+score_histories: Dict[str, ScoreHistory] = {}  # room_code -> score changes over time
+question_indexes: Dict[str, QuestionIndex] = {}  # room_code -> search index of its questions
+tournaments: Dict[str, Tournament] = {}  # tournament_id -> cross-room leaderboard
+room_tournaments: Dict[str, str] = {}  # room_code -> tournament_id
+tournament_changes: Dict[str, set] = {}  # room_code -> players to push to its board on publish
+
+# Secondary indexes (status, created_at, name) for listing and statistics
+room_index = RoomIndex()
+
+# Room versions come from one global counter so a deleted and re-created
+# room code can never reuse a version
+_room_versions = itertools.count(1)
+
+# room_code -> lock held while mutating or serializing the room
+room_locks: Dict[str, threading.RLock] = {}
+
+# Identical concurrent reads of the same room version share one encoded response
+room_reads = SingleFlight()
+
+# room_code -> mutation count. Read caches key on it as well as the version,
+# because a change held back by the broadcast scheduler (below) has not
+# bumped the version yet.
+room_revisions: Dict[str, int] = {}
+
+# Push transport: per-room wakeups and a cap on open room and tournament
+# streams (each holds a server thread)
+room_changes = ChangeNotifier()
+room_streams = StreamSlots(int(os.environ.get('TTX_ROOM_STREAMS', 16)))
+
+# Bursts of changes to a room (awards, joins) are published at most once
+# per tick; question switches, reveals and game start/finish go out at once
+room_broadcasts = BroadcastScheduler(
+    tick=float(os.environ.get('TTX_BROADCAST_TICK_MS', 75)) / 1000,
+    publish=lambda room_code: publish_held_changes(room_code)
+)
+
+# Admission control: per-client read rate limits within a per-address
+# allowance and a cap on concurrent reads, so host actions always find a
+# free server thread. By default reads may use three quarters of the
+# server's threads (run.py exports TTX_THREADS).
+admission = Admission(
+    read_rate=float(os.environ.get('TTX_READ_RATE', 5)),
+    read_burst=float(os.environ.get('TTX_READ_BURST', 10)),
+    clients_per_address=int(os.environ.get('TTX_READ_CLIENTS_PER_ADDRESS', 60)),
+    read_slots=int(os.environ.get('TTX_READ_CONCURRENCY')
+                   or max(2, int(os.environ.get('TTX_THREADS', 16)) * 3 // 4))
+)
+
+# Join storms: joins arriving while the room's previous join batch is
+# being applied go in as one room change (waiting at most the window), and
+# rooms with a capacity queue the overflow first come, first served. TTX_ROOM_CAPACITY is the default seat limit (0 = none).
+join_batcher = JoinBatcher(window=float(os.environ.get('TTX_JOIN_WINDOW_MS', 50)) / 1000)
+wait_lists: Dict[str, WaitList] = {}  # room_code -> players waiting for a seat
+DEFAULT_ROOM_CAPACITY = int(os.environ.get('TTX_ROOM_CAPACITY', 0)) or None
+
+# Admin-only request tracing; installs no hooks until enabled
+tracer = profiling.Tracer(app, RoomTable)
+
+# Image/audio clues, stored once per distinct file and served from disk
+media_store = MediaStore(
+    root=os.environ.get('TTX_MEDIA_DIR') or None,
+    max_bytes=int(os.environ.get('TTX_MEDIA_MAX_MB', 10)) * 1024 * 1024
+)
+
+# Indonesian word list for spelling checks and clue suggestions; the file is
+# memory-mapped, so worker processes share one copy (None if missing)
+word_index = wordindex.open_index(
+    os.environ.get('TTX_WORD_INDEX') or os.path.join(BASE_DIR, 'data', 'words_id.idx')
+)
+
+# Player heartbeats; idle players go away, then get evicted from their room
+presence = Presence(
+    away_after=float(os.environ.get('TTX_PRESENCE_AWAY', 15)),
+    evict_after=float(os.environ.get('TTX_PRESENCE_EVICT', 90))
+)
+
+# Result sheet exports, rendered in a process pool (the pool starts on first use)
+exports = reports.ExportJobs(
+    cache_dir=os.environ.get('TTX_EXPORT_DIR') or None,
+    ttl=int(os.environ.get('TTX_EXPORT_TTL', 3600)),
+    workers=int(os.environ.get('TTX_EXPORT_WORKERS', 2))
+)
+
+# Replay journal of every room change, with state checkpoints for fast
+# seeking; deleted rooms stay replayable until the retention period ends
+room_journals = JournalStore(
+    retention=float(os.environ.get('TTX_JOURNAL_RETENTION_HOURS', 24)) * 3600,
+    checkpoint_every=int(os.environ.get('TTX_JOURNAL_CHECKPOINT_EVERY', 256))
+)
+
+# Access and game-event audit trail (JSON lines), written in batches by a
+# background thread; an empty TTX_LOG_FILE keeps records in memory only
+event_log = EventLog(
+    path=os.environ.get('TTX_LOG_FILE', os.path.join(BASE_DIR, 'logs', 'events.jsonl')),
+    max_bytes=int(os.environ.get('TTX_LOG_MAX_MB', 10)) * 1024 * 1024,
+    backups=int(os.environ.get('TTX_LOG_BACKUPS', 5))
+)
 
 
 # ==================== PAGE ROUTES ====================
@@ -25,16 +162,84 @@ def index():
     return send_from_directory(BASE_DIR, 'index.html')
 
 
+# Session cookies (set by script.js next to localStorage) naming the room,
+# and for peserta the player, whose snapshot is inlined into the page
+PAGE_SESSION_COOKIES = {
+    'host.html': ('ttx_host_room', None),
+    'peserta.html': ('ttx_player_room', 'ttx_player_name'),
+}
+PAGE_SNAPSHOT_TAG = '<script id="roomSnapshot" type="application/json">{}</script>\n    '
+
+page_templates: Dict[str, tuple] = {}  # filename -> (mtime, html)
+
+
+def page_template(filename: str) -> tuple:
+    """(mtime, html) of a page, re-read only when the file changes"""
+    path = os.path.join(BASE_DIR, filename)
+    mtime = os.path.getmtime(path)
+    cached = page_templates.get(filename)
+    if cached is None or cached[0] != mtime:
+        with open(path, encoding='utf-8') as f:
+            cached = page_templates[filename] = (mtime, f.read())
+    return cached
+
+
+def serve_page(filename: str):
+    """
+    Serve a page with the session's room snapshot inlined.
+
+    With the session cookie of a live room the page carries that room (the
+    same data as GET /api/rooms/<code>) in a JSON script tag, so it renders
+    without an API round trip. The rendered page is cached per room
+    version and carries an ETag, so a reload after a network blip is a
+    304 while the room is unchanged. Without a usable cookie the plain file
+    is served.
+    """
+    room_cookie, player_cookie = PAGE_SESSION_COOKIES[filename]
+    room_code = unquote(request.cookies.get(room_cookie, '')).strip().upper()
+    room = rooms.get(room_code)
+    if room is None:
+        return send_from_directory(BASE_DIR, filename)
+
+    if player_cookie:
+        player_name = unquote(request.cookies.get(player_cookie, '')).strip()
+        if player_name and player_name in room['participants']:
+            presence.heartbeat(room_code, player_name)
+
+    mtime, template = page_template(filename)
+    version = room['version']
+    etag = f'{room_code}-v{version}-{int(mtime)}'
+
+    def render():
+        with room_lock(room_code):
+            # '<' is escaped so no string in the room can close the script tag
+            snapshot = app.json.dumps(room).replace('<', '\\u003c')
+        tag = PAGE_SNAPSHOT_TAG.format(snapshot)
+        marker = '<script src="script.js">' if '<script src="script.js">' in template else '</body>'
+        return template.replace(marker, tag + marker, 1).encode('utf-8')
+
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+    else:
+        body = room_reads.do(room_code, ('page', filename), (version, mtime), render)
+        response = app.response_class(body, mimetype='text/html')
+    response.set_etag(etag)
+    response.cache_control.no_cache = True
+    response.cache_control.private = True
+    response.vary.add('Cookie')
+    return response
+
+
 @app.route('/host')
 def host_page():
-    """Serve host.html"""
-    return send_from_directory(BASE_DIR, 'host.html')
+    """Serve host.html (with the host's room inlined, see serve_page)"""
+    return serve_page('host.html')
 
 
 @app.route('/peserta')
 def peserta_page():
-    """Serve peserta.html"""
-    return send_from_directory(BASE_DIR, 'peserta.html')
+    """Serve peserta.html (with the player's room inlined, see serve_page)"""
+    return serve_page('peserta.html')
 
 
 @app.route('/styles.css')
@@ -58,22 +263,461 @@ def generate_room_code():
     return ''.join(random.choices(chars, k=6))
 
 
-def create_room_object(code: str, name: str) -> dict:
+def create_room_object(code: str, name: str, capacity: Optional[int] = None) -> dict:
     """Create a room object"""
     return {
         'code': code,
         'name': name,
         'created_at': datetime.now().isoformat(),
-        'participants': [],
+        'participants': Roster(),  # insertion-ordered; encodes as a list
+        'capacity': capacity,  # seat limit, None for unlimited
+
         'status': 'waiting',  # waiting, playing, finished
         'host_id': str(uuid.uuid4()),
         'questions': [],  # List of questions
         'current_question_id': None,  # Current question being played
         'player_scores': {},  # {player_name: score}
-        'question_count': 0  # Counter for question IDs
+        'question_count': 0,  # Counter for question IDs
+        'crossword': None,  # Last generated crossword layout
+        'version': next(_room_versions)  # Bumped on every mutation
+    }
+
+
+def touch_room(room: dict, urgent: bool = False) -> None:
+    """
+    Mark a room as changed; call after every mutation.
+
+    The room index follows at once. Clients see the change (new version,
+    stream wakeup, tournament board) right away when it is `urgent` or the
+    room has been quiet for a tick; otherwise it is published with the
+    rest of the burst when the tick ends (see push.BroadcastScheduler).
+    """
+    room_revisions[room['code']] = room_revisions.get(room['code'], 0) + 1
+    room_index.update(room)
+    if room_broadcasts.changed(room['code'], urgent):
+        publish_room(room)
+    if tracer.enabled:
+        profiling.mark('mutation')
+
+
+def publish_room(room: dict) -> None:
+    """Give a room a new version and fan the change out; call under its lock"""
+    room['version'] = next(_room_versions)
+    changed = tournament_changes.pop(room['code'], None)
+    tournament_id = room_tournaments.get(room['code'])
+    if changed and tournament_id in tournaments:
+        push_tournament_players(tournaments[tournament_id], room, changed)
+    room_changes.notify(room['code'])
+
+
+def publish_held_changes(room_code: str) -> None:
+    """Scheduler callback: publish the changes a room held during its tick"""
+    room = rooms.get(room_code)
+    if room is None:
+        return
+    with room_lock(room_code):
+        if rooms.get(room_code) is room:
+            publish_room(room)
+
+
+def sync_tournament_room(tournament: Tournament, room: dict) -> None:
+    """Load all of a room's scores into its tournament board (when attaching it)"""
+    scores = dict.fromkeys(room['participants'], 0)
+    scores.update(room['player_scores'])
+    tournament.sync_room(room['code'], scores)
+
+
+def mark_player_changed(room: dict, player_name: str) -> None:
+    """Note that a player's score or seat changed, for the room's tournament board"""
+    if room['code'] in room_tournaments:
+        tournament_changes.setdefault(room['code'], set()).add(player_name)
+
+
+def push_tournament_players(tournament: Tournament, room: dict, names) -> None:
+    """Send only the marked players to the board; a player no longer on it gets None"""
+    participants, scores = room['participants'], room['player_scores']
+    tournament.update_players(room['code'], {
+        name: scores.get(name, 0 if name in participants else None) for name in names
+    })
+
+
+def check_admin():
+    """
+    Return an error response unless the request carries the admin token.
+
+    Admin endpoints are disabled entirely when TTX_ADMIN_TOKEN is not set.
+    """
+    expected = os.environ.get('TTX_ADMIN_TOKEN')
+    if not expected:
+        return jsonify({
+            'success': False,
+            'message': 'Admin endpoints are disabled (TTX_ADMIN_TOKEN not set)'
+        }), 403
+    
+    provided = request.headers.get('X-Admin-Token', '')
+    if not hmac.compare_digest(provided.encode('utf-8'), expected.encode('utf-8')):
+        return jsonify({
+            'success': False,
+            'message': 'Admin token required'
+        }), 403
+    
+    return None
+
+
+def encode_payload(payload: dict, status: int = 200, binary: bool = False):
+    """Encode a payload once so the bytes can be shared between requests"""
+    return app.json.encode(payload, binary), status
+
+
+def encoded_response(body: bytes, status: int, binary: bool):
+    response = app.response_class(body, status=status,
+                                  mimetype=wire.MSGPACK_MIMETYPE if binary else 'application/json')
+    response.vary.add('Accept')
+    return response
+
+
+def coalesced_read(room_code: str, view: str, build):
+    """
+    Serve a room read through the single-flight layer.
+
+    `build(room)` returns (payload, status) and runs at most once per room
+    version and encoding; concurrent and repeated reads reuse the encoded
+    buffer.
+    """
+    room = rooms[room_code]
+    lock = room_lock(room_code)
+    binary = wire.wants_msgpack()
+
+    def build_locked():
+        # Serialize under the room lock so a batch of host commands is
+        # never observed half-applied
+        with lock:
+            return encode_payload(*build(room), binary=binary)
+
+    view_key = (view, 'msgpack') if binary else view
+    version = (room['version'], room_revisions.get(room_code, 0))
+    body, status = room_reads.do(room_code, view_key, version, build_locked)
+    return encoded_response(body, status, binary)
+
+
+def room_lock(room_code: str) -> threading.RLock:
+    """Lock guarding every mutation (and serialization) of one room"""
+    lock = room_locks.get(room_code)
+    if lock is None:
+        lock = room_locks.setdefault(room_code, threading.RLock())
+    return lock
+
+
+@app.before_request
+def admit_request():
+    """
+    Admission control; registered first so shed requests do no other work.
+
+    Mutations take the priority lane and are always admitted. API reads
+    are rate limited per client within a per-address allowance and bounded
+    in number; a shed read gets 429 with Retry-After.
+    """
+    g.started = time.perf_counter()
+    lane = classify(request.method, request.path)
+    if lane == EXEMPT:
+        return None
+    if lane == READ:
+        reason, retry_after = admission.admit_read(
+            request.remote_addr or 'unknown', request.headers.get('X-Client-Id', '')[:64]
+        )
+        if reason is not None:
+            response = jsonify({
+                'success': False,
+                'message': 'Too many requests, retry later' if reason == 'rate_limited'
+                           else 'Server busy, retry later'
+            })
+            response.status_code = 429
+            response.headers['Retry-After'] = str(retry_after)
+            return response
+    else:
+        admission.start_priority()
+    g.admission = (lane, time.perf_counter())
+    return None
+
+
+@app.after_request
+def log_request(response):
+    """Access log entry for API requests; failures keep their error message"""
+    if request.path.startswith('/api/'):
+        status = response.status_code
+        started = g.get('started')
+        fields = {}
+        if status >= 500 and response.is_json:
+            fields['error'] = (response.get_json(silent=True) or {}).get('message')
+        event_log.emit(
+            'request', method=request.method, path=request.path, status=status,
+            ms=round((time.perf_counter() - started) * 1000, 2) if started else None,
+            client=request.headers.get('X-Client-Id') or request.remote_addr, **fields
+        )
+    return response
+
+
+@app.teardown_request
+def release_admission(exc=None):
+    admitted = g.pop('admission', None)
+    if admitted is not None:
+        lane, started = admitted
+        admission.finish(lane, time.perf_counter() - started)
+
+
+@app.before_request
+def evict_idle_players():
+    """
+    Advance the presence wheel and drop ghost players from their rooms.
+
+    Only wheel slots that came due are visited, at most once per tick, so
+    this costs nothing on most requests. An evicted player keeps their
+    score, exactly like leaving, and can join again under the same name.
+    """
+    for room_code, player_name in presence.sweep():
+        room = rooms.get(room_code)
+        if room is None:
+            continue
+        with room_lock(room_code):
+            if player_name in room['participants']:
+                room['participants'].remove(player_name)
+                mark_player_changed(room, player_name)
+                record_room_event(room_code, 'evict', {'player_name': player_name})
+                admit_waiting(room)
+                touch_room(room)
+
+
+# ==================== ROOM OPERATIONS ====================
+# Mutations shared by the single-purpose endpoints and the batched
+# /commands endpoint. Callers hold the room lock and call touch_room()
+# once afterwards; validation failures raise RoomOpError.
+
+class RoomOpError(Exception):
+    """A room operation was rejected; carries the HTTP status to answer with"""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def find_question(room: dict, question_id: str) -> Optional[dict]:
+    """Find a question by id (case-insensitive)"""
+    question_id = question_id.lower()
+    for q in room['questions']:
+        if q['question_id'].lower() == question_id:
+            return q
+    return None
+
+
+def mark_shown(question: dict) -> None:
+    """Remember when a question was first made current (for time-to-correct)"""
+    if not question.get('shown_at'):
+        question['shown_at'] = datetime.now().isoformat()
+
+
+def op_start_game(room: dict) -> dict:
+    if len(room['participants']) == 0:
+        raise RoomOpError('At least one participant is required to start the game')
+    room['status'] = 'playing'
+    return {'status': room['status']}
+
+
+def op_finish_game(room: dict) -> dict:
+    room['status'] = 'finished'
+    return {'status': room['status']}
+
+
+def op_set_current_question(room: dict, question_id: str) -> dict:
+    question_id = question_id.lower()  # Convert to lowercase to match stored question_ids
+    question = find_question(room, question_id)
+    if question is None:
+        raise RoomOpError('Question not found', 404)
+    mark_shown(question)
+    room['current_question_id'] = question_id
+    return {'current_question_id': room['current_question_id']}
+
+
+def op_clear_current_question(room: dict) -> dict:
+    room['current_question_id'] = None
+    return {'current_question_id': None}
+
+
+def op_reveal_question(room: dict, question_id: str) -> dict:
+    question = find_question(room, question_id)
+    if question is None:
+        raise RoomOpError('Question not found', 404)
+    question_index(room['code']).set_status(question, 'revealed')
+    question['revealed_at'] = datetime.now().isoformat()
+    return {
+        'question_id': question['question_id'],
+        'answer': question['answer']
+    }
+
+
+def op_next_question(room: dict) -> dict:
+    # Find current question index
+    current_idx = -1
+    for i, q in enumerate(room['questions']):
+        if q['question_id'] == room['current_question_id']:
+            current_idx = i
+            break
+
+    if current_idx >= len(room['questions']) - 1:
+        raise RoomOpError('No more questions available')
+
+    question = room['questions'][current_idx + 1]
+    mark_shown(question)
+    room['current_question_id'] = question['question_id']
+    return {'current_question_id': room['current_question_id']}
+
+
+def record_score(room_code: str, player_name: str, score: int) -> None:
+    """Append a player's new total to the room's score history"""
+    score_histories.setdefault(room_code, ScoreHistory()).record(player_name, score)
+
+
+def defer(effects: Optional[list], fn, *args) -> None:
+    """
+    Run a side effect outside the room dict now, or queue it on `effects`
+    so a command batch runs it only once every command has succeeded
+    """
+    if effects is None:
+        fn(*args)
+    else:
+        effects.append((fn, args))
+
+
+def op_award_points(room: dict, player_name: str, points: int, effects: Optional[list] = None) -> dict:
+    # Initialize score if not exists
+    if player_name not in room['player_scores']:
+        room['player_scores'][player_name] = 0
+    room['player_scores'][player_name] += points
+    mark_player_changed(room, player_name)
+    defer(effects, record_score, room['code'], player_name, room['player_scores'][player_name])
+    return {
+        'player_name': player_name,
+        'points_awarded': points,
+        'total_score': room['player_scores'][player_name]
+    }
+
+
+def op_update_points(room: dict, player_name: str, points: int, effects: Optional[list] = None) -> dict:
+    if player_name not in room['participants']:
+        raise RoomOpError('Player not found in this room', 404)
+    # Set points directly (overwrite)
+    room['player_scores'][player_name] = points
+    mark_player_changed(room, player_name)
+    defer(effects, record_score, room['code'], player_name, points)
+    return {
+        'player_name': player_name,
+        'total_score': room['player_scores'][player_name]
     }
 
 
+def op_remove_participant(room: dict, player_name: str, effects: Optional[list] = None) -> dict:
+    if player_name not in room['participants']:
+        raise RoomOpError('Player not found in this room', 404)
+    room['participants'].remove(player_name)
+    mark_player_changed(room, player_name)
+    defer(effects, presence.forget, room['code'], player_name)
+    # Also remove their score
+    if player_name in room['player_scores']:
+        del room['player_scores'][player_name]
+        defer(effects, record_score, room['code'], player_name, 0)
+    return {'player_name': player_name}
+
+
+def record_room_event(room_code: str, event: str, result: dict) -> None:
+    """
+    Audit-log a room operation once it is final and append it to the
+    room's replay journal, with its result fields
+    """
+    fields = {k: v for k, v in result.items() if k != 'op'}
+    event_log.emit(event, room=room_code, **fields)
+    room_journals.append(room_code, event, fields)
+
+
+def wait_list(room_code: str) -> WaitList:
+    wait = wait_lists.get(room_code)
+    if wait is None:
+        wait = wait_lists.setdefault(room_code, WaitList(stale_after=presence.evict_after))
+    return wait
+
+
+def admit_waiting(room: dict) -> List[str]:
+    """
+    Seat queued players while the room has free seats.
+
+    Callers hold the room lock and call touch_room() afterwards. Not part
+    of the /commands operations, since a rolled-back batch cannot un-seat
+    anyone; the endpoints call it once their change is final.
+    """
+    wait = wait_lists.get(room['code'])
+    if not wait:
+        return []
+    capacity = room['capacity']
+    free = len(wait) if capacity is None else capacity - len(room['participants'])
+    admitted = wait.pop(free) if free > 0 else []
+    for name in admitted:
+        if name not in room['participants']:
+            room['participants'].append(name)
+            mark_player_changed(room, name)
+            presence.heartbeat(room['code'], name)
+            record_room_event(room['code'], 'join', {'player_name': name, 'from_waitlist': True})
+    return admitted
+
+
+def apply_joins(room_code: str, names: List[str]) -> list:
+    """
+    Apply one batch of joins as a single room change.
+
+    Returns (outcome, position) per name: 'joined', 'exists', 'queued'
+    (with the 1-based place in line) or 'missing' for a deleted room.
+    """
+    room = rooms.get(room_code)
+    if room is None:
+        return [('missing', None)] * len(names)
+
+    results = []
+    with room_lock(room_code):
+        participants = room['participants']
+        capacity = room['capacity']
+        # Seats that freed up go to the queue before anyone new
+        changed = bool(admit_waiting(room))
+        for name in names:
+            if name in participants:
+                results.append(('exists', None))
+            elif capacity is None or len(participants) < capacity:
+                participants.append(name)
+                mark_player_changed(room, name)
+                changed = True
+                results.append(('joined', None))
+            else:
+                results.append(('queued', wait_list(room_code).enqueue(name)))
+        # Recorded under the lock, so the journal keeps the joins in order
+        # with whatever op takes the lock next
+        for name, (outcome, position) in zip(names, results):
+            if outcome == 'joined':
+                presence.heartbeat(room_code, name)
+                record_room_event(room_code, 'join', {'player_name': name})
+            elif outcome == 'queued':
+                event_log.emit('join_queued', room=room_code, player_name=name, position=position)
+        if changed:
+            touch_room(room)
+    return results
+
+
+def parse_capacity(value) -> Optional[int]:
+    """A seat limit from a request body: a positive integer, or null/0 for none"""
+    if value in (None, 0, '0', ''):
+        return None
+    capacity = int(value)
+    if capacity < 1:
+        raise ValueError('capacity must be positive')
+    return capacity
+
+
 # ==================== ROOM MANAGEMENT ENDPOINTS ====================
 
 @app.route('/api/rooms', methods=['POST'])
@@ -83,7 +727,8 @@ def create_room():
     
     Request body:
     {
-        "name": "Room Name"
+        "name": "Room Name",
+        "capacity": 300  # optional seat limit; default TTX_ROOM_CAPACITY
     }
     
     Response:
@@ -94,6 +739,7 @@ def create_room():
             "name": "Room Name",
             "created_at": "2026-02-06T...",
             "participants": [],
+            "capacity": 300,
             "status": "waiting"
         }
     }
@@ -120,15 +766,28 @@ def create_room():
                 'message': 'Room name cannot exceed 50 characters'
             }), 400
         
+        try:
+            capacity = parse_capacity(data['capacity']) if 'capacity' in data else DEFAULT_ROOM_CAPACITY
+        except (TypeError, ValueError):
+            return jsonify({
+                'success': False,
+                'message': 'capacity must be a positive integer or null'
+            }), 400
+        
         # Generate unique room code
         room_code = generate_room_code()
         while room_code in rooms:
             room_code = generate_room_code()
         
         # Create room
-        room = create_room_object(room_code, room_name)
+        room = create_room_object(room_code, room_name, capacity)
         rooms[room_code] = room
-        connections[room_code] = []
+        attempt_logs[room_code] = AttemptLog()
+        score_histories[room_code] = ScoreHistory()
+        question_indexes[room_code] = QuestionIndex()
+        room_index.add(room)
+        room_journals.start(room_code)
+        record_room_event(room_code, 'room_created', {'name': room_name})
         
         return jsonify({
             'success': True,
@@ -143,6 +802,119 @@ def create_room():
         }), 500
 
 
+ROOM_STATUSES = ('waiting', 'playing', 'finished')
+
+
+@app.route('/api/rooms', methods=['GET'])
+def list_rooms():
+    """
+    List rooms for operator dashboards (requires X-Admin-Token)
+    
+    Query parameters (all optional):
+        status            waiting, playing or finished
+        created_from      ISO date/time, inclusive (e.g. 2026-02-06)
+        created_to        ISO date/time, inclusive
+        name_prefix       case-insensitive room name prefix
+        min_participants  / max_participants
+        order             desc (newest first, default) or asc
+        limit             page size (default 50, max 200)
+        cursor            next_cursor from the previous page
+    
+    Response:
+    {
+        "success": true,
+        "data": {
+            "rooms": [
+                {
+                    "code": "ABC123",
+                    "name": "Room Name",
+                    "status": "playing",
+                    "created_at": "2026-02-06T...",
+                    "participants_count": 12,
+                    "questions_count": 10
+                }
+            ],
+            "next_cursor": "WyIyMDI2LTAy..."  # null on the last page
+        }
+    }
+    """
+    try:
+        denied = check_admin()
+        if denied:
+            return denied
+        
+        args = request.args
+        status = args.get('status') or None
+        if status is not None and status not in ROOM_STATUSES:
+            return jsonify({
+                'success': False,
+                'message': f"status must be one of {', '.join(ROOM_STATUSES)}"
+            }), 400
+        
+        order = args.get('order', 'desc')
+        if order not in ('asc', 'desc'):
+            return jsonify({
+                'success': False,
+                'message': 'order must be asc or desc'
+            }), 400
+        
+        try:
+            limit = min(200, max(1, int(args.get('limit', 50))))
+            min_participants = int(args['min_participants']) if args.get('min_participants') else None
+            max_participants = int(args['max_participants']) if args.get('max_participants') else None
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'message': 'limit, min_participants and max_participants must be integers'
+            }), 400
+        
+        codes, next_cursor = room_index.query(
+            status=status,
+            created_from=args.get('created_from') or None,
+            created_to=args.get('created_to') or None,
+            name_prefix=args.get('name_prefix') or None,
+            min_participants=min_participants,
+            max_participants=max_participants,
+            cursor=args.get('cursor') or None,
+            limit=limit,
+            descending=(order == 'desc')
+        )
+        
+        summaries = []
+        for code in codes:
+            room = rooms.get(code)
+            if room is None:
+                continue  # deleted since the index was read
+            summaries.append({
+                'code': room['code'],
+                'name': room['name'],
+                'status': room['status'],
+                'created_at': room['created_at'],
+                'participants_count': len(room['participants']),
+                'questions_count': len(room['questions'])
+            })
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'rooms': summaries,
+                'next_cursor': next_cursor
+            }
+        }), 200
+    
+    except InvalidCursor as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error listing rooms: {str(e)}'
+        }), 500
+
+
 @app.route('/api/rooms/<room_code>', methods=['GET'])
 def get_room(room_code: str):
     """
@@ -159,6 +931,10 @@ def get_room(room_code: str):
             "status": "waiting"
         }
     }
+    
+    Query parameter `player_name` counts as a presence heartbeat. The
+    response carries an ETag for the room version (If-None-Match gives
+    304), and X-Room-Stream when a push stream slot is free.
     """
     try:
         room_code = room_code.upper()
@@ -170,10 +946,23 @@ def get_room(room_code: str):
             }), 404
         
         room = rooms[room_code]
-        return jsonify({
-            'success': True,
-            'data': room
-        }), 200
+        player_name = request.args.get('player_name', '').strip()
+        if player_name and player_name in room['participants']:
+            presence.heartbeat(room_code, player_name)
+        
+        version = room['version']
+        if request.if_none_match.contains(f'v{version}'):
+            response = app.response_class(status=304)
+            response.vary.add('Accept')
+        else:
+            response = coalesced_read(room_code, 'room', lambda room: ({
+                'success': True,
+                'data': room
+            }, 200))
+        response.set_etag(f'v{version}')
+        if room_streams.available():
+            response.headers['X-Room-Stream'] = f'/api/rooms/{room_code}/stream'
+        return response
     
     except Exception as e:
         return jsonify({
@@ -182,6 +971,103 @@ def get_room(room_code: str):
         }), 500
 
 
+ROOM_STREAM_SECONDS = 300
+
+
+@app.route('/api/rooms/<room_code>/stream', methods=['GET'])
+def stream_room(room_code: str):
+    """
+    Follow a room as Server-Sent Events (push alternative to polling GET /api/rooms/<code>)
+
+    Events:
+        room      full room snapshot, sent first and after every change;
+                  the event id is the room version
+        deleted   the room was deleted; the stream ends
+
+    Query parameters: `since` (or Last-Event-ID) skips the first snapshot
+    if the room is still at that version; `player_name` makes the open
+    stream count as that player's presence heartbeat.
+
+    With `Accept: application/msgpack` the body is a sequence of MessagePack
+    maps {"event", "id", "data"} instead. Answers 503 when all stream slots
+    (TTX_ROOM_STREAMS) are taken; clients then keep polling.
+    """
+    try:
+        room_code = room_code.upper()
+
+        if room_code not in rooms:
+            return jsonify({
+                'success': False,
+                'message': 'Room not found'
+            }), 404
+
+        try:
+            since = request.headers.get('Last-Event-ID') or request.args.get('since')
+            since = int(since) if since else None
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'message': 'since must be an integer'
+            }), 400
+
+        room = rooms[room_code]
+        lock = room_lock(room_code)
+        player_name = request.args.get('player_name', '').strip()
+        binary = wire.wants_msgpack()
+        # Keep the stream's heartbeats well inside the presence away threshold
+        keepalive = min(15.0, presence.away_after / 3)
+
+        def build_frame():
+            with lock:
+                version = room['version']
+                if binary:
+                    return wire.packb({'event': 'room', 'id': version, 'data': room}, default=app.json.default)
+                body = app.json.dumps(room).replace('\n', '\ndata: ')
+                return f'id: {version}\nevent: room\ndata: {body}\n\n'
+
+        def generate():
+            seq = since
+            deadline = time.monotonic() + ROOM_STREAM_SECONDS
+            yield wire.packb({'event': 'ping'}) if binary else 'retry: 2000\n\n'
+            while time.monotonic() < deadline:
+                if rooms.get(room_code) is not room:
+                    yield wire.packb({'event': 'deleted'}) if binary else 'event: deleted\ndata: {}\n\n'
+                    return
+                if player_name and player_name in room['participants']:
+                    presence.heartbeat(room_code, player_name)
+                version = room['version']
+                if version != seq:
+                    # Every follower of this room shares one encoded frame per version
+                    yield room_reads.do(room_code, ('stream', binary), version, build_frame)
+                    seq = version
+                    continue
+                if not room_changes.wait(room_code, lambda: rooms.get(room_code) is not room
+                                         or room['version'] != seq, keepalive):
+                    yield wire.packb({'event': 'ping'}) if binary else ': keepalive\n\n'
+
+        if not room_streams.acquire():
+            return jsonify({
+                'success': False,
+                'message': 'Too many open room streams, poll instead'
+            }), 503
+
+        mimetype = wire.MSGPACK_MIMETYPE if binary else 'text/event-stream'
+        response = app.response_class(generate(), mimetype=mimetype, headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no',
+            'Vary': 'Accept'
+        })
+        # Runs even if the client goes away before the first chunk
+        response.call_on_close(room_streams.release)
+        return response
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error streaming room: {str(e)}'
+        }), 500
+
+
 @app.route('/api/rooms/<room_code>', methods=['DELETE'])
 def delete_room(room_code: str):
     """
@@ -202,9 +1088,34 @@ def delete_room(room_code: str):
                 'message': 'Room not found'
             }), 404
         
-        del rooms[room_code]
-        if room_code in connections:
-            del connections[room_code]
+        with room_lock(room_code):
+            room = rooms.pop(room_code, None)
+        if room is None:
+            # Another delete of the same room got there first
+            return jsonify({
+                'success': False,
+                'message': 'Room not found'
+            }), 404
+        for question in room['questions']:
+            release_media(question)
+        presence.forget_room(room_code)
+        attempt_logs.pop(room_code, None)
+        score_histories.pop(room_code, None)
+        question_indexes.pop(room_code, None)
+        wait_lists.pop(room_code, None)
+        join_batcher.forget(room_code)
+        room_broadcasts.forget(room_code)
+        room_revisions.pop(room_code, None)
+        tournament_changes.pop(room_code, None)
+        room_index.remove(room_code)
+        tournament_id = room_tournaments.pop(room_code, None)
+        if tournament_id in tournaments:
+            tournaments[tournament_id].remove_room(room_code)
+        room_locks.pop(room_code, None)
+        room_reads.forget(room_code)
+        room_changes.forget(room_code)
+        room_journals.close(room_code)
+        event_log.emit('room_deleted', room=room_code)
         
         return jsonify({
             'success': True,
@@ -240,6 +1151,10 @@ def join_room(room_code: str):
             "status": "waiting"
         }
     }
+    
+    When the room is at capacity the player is queued instead (202,
+    {"queued": true, "position": 3}); GET /waitlist tells them when they
+    have a seat.
     """
     try:
         room_code = room_code.upper()
@@ -270,23 +1185,40 @@ def join_room(room_code: str):
                 'message': 'Room not found'
             }), 404
         
-        room = rooms[room_code]
+        # Concurrent joins share one room change (see roster.JoinBatcher)
+        outcome, position = join_batcher.submit(
+            room_code, player_name, lambda names: apply_joins(room_code, names)
+        )
         
-        # Check if player already exists
-        if player_name in room['participants']:
+        if outcome == 'missing':
+            return jsonify({
+                'success': False,
+                'message': 'Room not found'
+            }), 404
+        
+        if outcome == 'exists':
             return jsonify({
                 'success': False,
                 'message': 'Player name already exists in this room'
             }), 400
         
-        # Add player to room
-        room['participants'].append(player_name)
-        
-        return jsonify({
+        if outcome == 'queued':
+            return jsonify({
+                'success': True,
+                'message': 'Room is full, waiting for a seat',
+                'data': {
+                    'queued': True,
+                    'position': position,
+                    'capacity': rooms[room_code]['capacity']
+                }
+            }), 202
+        
+        # Everyone joining in the same batch gets the same encoded room
+        return coalesced_read(room_code, 'joined', lambda room: ({
             'success': True,
             'message': 'Successfully joined room',
             'data': room
-        }), 200
+        }, 200))
     
     except Exception as e:
         return jsonify({
@@ -331,14 +1263,29 @@ def leave_room(room_code: str):
         
         room = rooms[room_code]
         
-        if player_name not in room['participants']:
-            return jsonify({
-                'success': False,
-                'message': 'Player not found in this room'
-            }), 404
-        
-        # Remove player from room
-        room['participants'].remove(player_name)
+        with room_lock(room_code):
+            # A queued player giving up just leaves the line
+            wait = wait_lists.get(room_code)
+            if wait is not None and player_name in wait:
+                wait.discard(player_name)
+                return jsonify({
+                    'success': True,
+                    'message': 'Left the waiting list'
+                }), 200
+            
+            if player_name not in room['participants']:
+                return jsonify({
+                    'success': False,
+                    'message': 'Player not found in this room'
+                }), 404
+            
+            # Remove player from room
+            room['participants'].remove(player_name)
+            mark_player_changed(room, player_name)
+            record_room_event(room_code, 'leave', {'player_name': player_name})
+            presence.forget(room_code, player_name)
+            admit_waiting(room)
+            touch_room(room)
         
         return jsonify({
             'success': True,
@@ -362,7 +1309,9 @@ def get_participants(room_code: str):
         "success": true,
         "data": {
             "participants": ["Player1", "Player2"],
-            "count": 2
+            "count": 2,
+            "capacity": null,
+            "waiting": 0
         }
     }
     """
@@ -377,12 +1326,15 @@ def get_participants(room_code: str):
         
         room = rooms[room_code]
         participants = room['participants']
+        wait = wait_lists.get(room_code)
         
         return jsonify({
             'success': True,
             'data': {
                 'participants': participants,
-                'count': len(participants)
+                'count': len(participants),
+                'capacity': room['capacity'],
+                'waiting': len(wait) if wait else 0
             }
         }), 200
     
@@ -393,6 +1345,240 @@ def get_participants(room_code: str):
         }), 500
 
 
+@app.route('/api/rooms/<room_code>/waitlist', methods=['GET'])
+def get_waitlist(room_code: str):
+    """
+    Check a queued player's place in line (this also keeps their place)
+    
+    Query: ?player_name=Player Name
+    
+    Response:
+    {
+        "success": true,
+        "data": {"status": "waiting", "position": 3, "waiting": 12}
+    }
+    
+    Once seated, status is "joined". Without player_name the host gets
+    the whole line: {"capacity": 300, "waiting": ["Player A", ...]}.
+    Players who stop checking in lose their place.
+    """
+    try:
+        room_code = room_code.upper()
+        
+        if room_code not in rooms:
+            return jsonify({
+                'success': False,
+                'message': 'Room not found'
+            }), 404
+        
+        room = rooms[room_code]
+        wait = wait_list(room_code)
+        player_name = request.args.get('player_name', '').strip()
+        
+        if not player_name:
+            return jsonify({
+                'success': True,
+                'data': {
+                    'capacity': room['capacity'],
+                    'waiting': wait.names()
+                }
+            }), 200
+        
+        if player_name in room['participants']:
+            return jsonify({
+                'success': True,
+                'data': {'status': 'joined'}
+            }), 200
+        
+        position = wait.position(player_name)
+        if position is None:
+            return jsonify({
+                'success': False,
+                'message': 'Player is not waiting for this room'
+            }), 404
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'status': 'waiting',
+                'position': position,
+                'waiting': len(wait)
+            }
+        }), 200
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error getting waiting list: {str(e)}'
+        }), 500
+
+
+@app.route('/api/rooms/<room_code>/capacity', methods=['PUT'])
+def set_capacity(room_code: str):
+    """
+    Change the room's seat limit
+    
+    Request body:
+    {
+        "capacity": 300  # null or 0 for no limit
+    }
+    
+    Raising the limit seats queued players right away; lowering it never
+    removes anyone already in the room.
+    
+    Response:
+    {
+        "success": true,
+        "data": {"capacity": 300, "admitted": ["Player A"]}
+    }
+    """
+    try:
+        room_code = room_code.upper()
+        data = request.get_json()
+        
+        if not data or 'capacity' not in data:
+            return jsonify({
+                'success': False,
+                'message': 'capacity is required'
+            }), 400
+        
+        try:
+            capacity = parse_capacity(data['capacity'])
+        except (TypeError, ValueError):
+            return jsonify({
+                'success': False,
+                'message': 'capacity must be a positive integer or null'
+            }), 400
+        
+        if room_code not in rooms:
+            return jsonify({
+                'success': False,
+                'message': 'Room not found'
+            }), 404
+        
+        room = rooms[room_code]
+        
+        with room_lock(room_code):
+            room['capacity'] = capacity
+            admitted = admit_waiting(room)
+            touch_room(room)
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'capacity': capacity,
+                'admitted': admitted
+            }
+        }), 200
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error setting capacity: {str(e)}'
+        }), 500
+
+
+@app.route('/api/rooms/<room_code>/heartbeat', methods=['POST'])
+def heartbeat(room_code: str):
+    """
+    Tell the server a player is still connected
+    
+    Request body:
+    {
+        "player_name": "Player Name"
+    }
+    
+    Response:
+    {
+        "success": true,
+        "data": {
+            "version": 42
+        }
+    }
+    
+    Players that stop sending heartbeats are shown as away and are later
+    removed from the room. A 404 "Player was disconnected for inactivity"
+    means the client should join again (the score is kept).
+    """
+    try:
+        room_code = room_code.upper()
+        data = request.get_json()
+        
+        if not data or 'player_name' not in data:
+            return jsonify({
+                'success': False,
+                'message': 'Player name is required'
+            }), 400
+        
+        player_name = data['player_name'].strip()
+        
+        if room_code not in rooms:
+            return jsonify({
+                'success': False,
+                'message': 'Room not found'
+            }), 404
+        
+        room = rooms[room_code]
+        if player_name not in room['participants']:
+            return jsonify({
+                'success': False,
+                'message': 'Player was disconnected for inactivity' if presence.was_evicted(room_code, player_name)
+                else 'Player not found in this room'
+            }), 404
+        
+        presence.heartbeat(room_code, player_name)
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'version': room['version']
+            }
+        }), 200
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error recording heartbeat: {str(e)}'
+        }), 500
+
+
+@app.route('/api/rooms/<room_code>/presence', methods=['GET'])
+def get_presence(room_code: str):
+    """
+    Get which participants are online
+    
+    Response:
+    {
+        "success": true,
+        "data": {
+            "online": ["Player1"],
+            "away": ["Player2"],
+            "online_count": 1,
+            "idle_seconds": {"Player1": 2.1, "Player2": 31.0}
+        }
+    }
+    """
+    try:
+        room_code = room_code.upper()
+        
+        if room_code not in rooms:
+            return jsonify({
+                'success': False,
+                'message': 'Room not found'
+            }), 404
+        
+        return jsonify({
+            'success': True,
+            'data': presence.room(room_code)
+        }), 200
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error getting presence: {str(e)}'
+        }), 500
+
+
 # ==================== ROOM STATUS ENDPOINTS ====================
 
 @app.route('/api/rooms/<room_code>/status', methods=['GET'])
@@ -406,7 +1592,8 @@ def get_room_status(room_code: str):
         "data": {
             "code": "ABC123",
             "status": "waiting",
-            "participants_count": 2
+            "participants_count": 2,
+            "online_count": 1
         }
     }
     """
@@ -427,7 +1614,8 @@ def get_room_status(room_code: str):
                 'code': room['code'],
                 'name': room['name'],
                 'status': room['status'],
-                'participants_count': len(room['participants'])
+                'participants_count': len(room['participants']),
+                'online_count': presence.online_count(room_code)
             }
         }), 200
     
@@ -463,20 +1651,23 @@ def start_game(room_code: str):
         
         room = rooms[room_code]
         
-        if len(room['participants']) == 0:
-            return jsonify({
-                'success': False,
-                'message': 'At least one participant is required to start the game'
-            }), 400
-        
-        room['status'] = 'playing'
+        with room_lock(room_code):
+            result = op_start_game(room)
+            touch_room(room, urgent=True)
+            record_room_event(room_code, 'start_game', result)
         
         return jsonify({
             'success': True,
             'message': 'Game started',
-            'data': {'status': room['status']}
+            'data': result
         }), 200
     
+    except RoomOpError as e:
+        return jsonify({
+            'success': False,
+            'message': e.message
+        }), e.status
+    
     except Exception as e:
         return jsonify({
             'success': False,
@@ -508,12 +1699,15 @@ def finish_game(room_code: str):
             }), 404
         
         room = rooms[room_code]
-        room['status'] = 'finished'
+        with room_lock(room_code):
+            result = op_finish_game(room)
+            touch_room(room, urgent=True)
+            record_room_event(room_code, 'finish_game', result)
         
         return jsonify({
             'success': True,
             'message': 'Game finished',
-            'data': {'status': room['status']}
+            'data': result
         }), 200
     
     except Exception as e:
@@ -536,21 +1730,36 @@ def get_stats():
         "data": {
             "total_rooms": 5,
             "active_rooms": 3,
-            "total_participants": 12
+            "total_participants": 12,
+            "online_players": 9,
+            "read_coalescing": {"misses": 10, "shared_inflight": 42, "hits": 310, ...},
+            "admission": {"shed": {"rate_limited": 4, "overloaded": 0}, "latency": {...}, ...}
         }
     }
     """
     try:
-        total_rooms = len(rooms)
-        active_rooms = sum(1 for room in rooms.values() if room['status'] != 'finished')
-        total_participants = sum(len(room['participants']) for room in rooms.values())
+        # Read from the room index instead of scanning every room
+        total_rooms = len(room_index)
+        active_rooms = total_rooms - room_index.status_counts().get('finished', 0)
+        total_participants = room_index.total_participants
         
         return jsonify({
             'success': True,
             'data': {
                 'total_rooms': total_rooms,
                 'active_rooms': active_rooms,
-                'total_participants': total_participants
+                'total_participants': total_participants,
+                'online_players': presence.online_count(),
+                'read_coalescing': room_reads.stats(),
+                'export_jobs': exports.stats(),
+                'room_streams': room_streams.stats(),
+                'media': media_store.stats(),
+                'admission': admission.stats(),
+                'word_index': word_index.stats() if word_index is not None else None,
+                'joins': join_batcher.stats(),
+                'broadcasts': room_broadcasts.stats(),
+                'event_log': event_log.stats(),
+                'journals': room_journals.stats()
             }
         }), 200
     
@@ -601,8 +1810,12 @@ def create_question(room_code: str):
             "answer_length": 7,
             "helping_letters": [...],
             "status": "active"
-        }
+        },
+        "spelling": {"known": true, "similar": []}
     }
+    
+    `spelling` is null when no word index is installed. An unknown answer
+    is still accepted (names, phrases); the host just gets a hint.
     """
     try:
         room_code = room_code.upper()
@@ -631,32 +1844,57 @@ def create_question(room_code: str):
                 'message': 'Question and answer cannot be empty'
             }), 400
         
-        # Create question object
-        room = rooms[room_code]
-        question_id = f"q{room['question_count'] + 1}"
-        room['question_count'] += 1
-        
-        question_obj = {
-            'question_id': question_id,
-            'question': question_text,
-            'answer': answer,
-            'answer_length': len(answer),
-            'helping_letters': helping_letters,  # [{"position": 0, "letter": "A"}, ...]
-            'status': 'active',  # active, revealed
-            'revealed_at': None,
-            'created_at': datetime.now().isoformat()
-        }
+        answer_normalized = normalize_answer(answer)
+        if not answer_normalized:
+            return jsonify({
+                'success': False,
+                'message': 'Answer must contain letters or digits'
+            }), 400
         
-        room['questions'].append(question_obj)
+        # Compile the matcher once so judging never re-parses the answer
+        compile_answer(answer_normalized)
         
-        # If no current question, set this as current
-        if room['current_question_id'] is None:
-            room['current_question_id'] = question_id
+        # Create question object
+        room = rooms[room_code]
+        with room_lock(room_code):
+            question_id = f"q{room['question_count'] + 1}"
+            room['question_count'] += 1
+            
+            question_obj = {
+                'question_id': question_id,
+                'question': question_text,
+                'answer': answer,
+                'answer_normalized': answer_normalized,  # accent/space/punctuation-folded form used for judging
+                'answer_length': len(answer),
+                'helping_letters': helping_letters,  # [{"position": 0, "letter": "A"}, ...]
+                'status': 'active',  # active, revealed
+                'revealed_at': None,
+                'shown_at': None,  # first time the question was made current
+                'media': [],  # image/audio clues, see POST .../media
+                'created_at': datetime.now().isoformat()
+            }
+            
+            room['questions'].append(question_obj)
+            question_index(room_code).add(question_obj)
+            
+            # If no current question, set this as current
+            if room['current_question_id'] is None:
+                mark_shown(question_obj)
+                room['current_question_id'] = question_id
+            
+            touch_room(room)
+            record_room_event(room_code, 'create_question', {
+                'question_id': question_id,
+                'question': question_text,
+                'answer': answer,
+                'current_question_id': room['current_question_id']
+            })
         
         return jsonify({
             'success': True,
             'message': 'Question created successfully',
-            'data': question_obj
+            'data': question_obj,
+            'spelling': check_spelling(answer_normalized)
         }), 201
     
     except Exception as e:
@@ -666,22 +1904,43 @@ def create_question(room_code: str):
         }), 500
 
 
-@app.route('/api/rooms/<room_code>/questions/current', methods=['GET'])
-def get_current_question(room_code: str):
+def question_index(room_code: str) -> QuestionIndex:
+    """The room's question search index, built from its questions if missing"""
+    index = question_indexes.get(room_code)
+    if index is None:
+        index = question_indexes.setdefault(room_code, QuestionIndex(rooms[room_code]['questions']))
+    return index
+
+
+QUESTION_STATUSES = ('active', 'revealed')
+
+
+@app.route('/api/rooms/<room_code>/questions', methods=['GET'])
+def search_questions(room_code: str):
     """
-    Get current question
+    Search the room's question bank, one page at a time
+    
+    Query parameters (all optional):
+        q        words to find in the question or answer; each word
+                 matches as a prefix ("jak" finds JAKARTA)
+        status   active or revealed
+        cursor   next_cursor of the previous page
+        limit    page size (default 20, max 100)
     
     Response:
     {
         "success": true,
         "data": {
-            "question_id": "q1",
-            "question": "Ibu Kota Indonesia",
-            "answer_length": 7,
-            "helping_letters": [...],
-            "status": "active"
+            "questions": [
+                {"question_id": "q1", "question": "Ibu Kota Indonesia",
+                 "answer": "JAKARTA", "status": "active", "is_current": true}
+            ],
+            "total": 1,
+            "next_cursor": null
         }
     }
+    
+    Questions come in creation order; `total` counts every match.
     """
     try:
         room_code = room_code.upper()
@@ -692,64 +1951,129 @@ def get_current_question(room_code: str):
                 'message': 'Room not found'
             }), 404
         
-        room = rooms[room_code]
-        
-        if not room['current_question_id']:
+        status = request.args.get('status') or None
+        if status is not None and status not in QUESTION_STATUSES:
             return jsonify({
                 'success': False,
-                'message': 'No active question'
-            }), 404
-        
-        # Find current question
-        current_q = None
-        for q in room['questions']:
-            if q['question_id'] == room['current_question_id']:
-                current_q = q
-                break
+                'message': f"status must be one of {', '.join(QUESTION_STATUSES)}"
+            }), 400
         
-        if not current_q:
+        try:
+            limit = min(100, max(1, int(request.args.get('limit', 20))))
+        except ValueError:
             return jsonify({
                 'success': False,
-                'message': 'Current question not found'
-            }), 404
+                'message': 'limit must be an integer'
+            }), 400
+        
+        cursor = request.args.get('cursor') or None
+        after = question_number(cursor) if cursor else None
+        
+        room = rooms[room_code]
+        with room_lock(room_code):
+            page, total, more = question_index(room_code).search(
+                request.args.get('q', ''), status=status, after=after, limit=limit
+            )
+            current = room['current_question_id']
+            questions = [
+                {
+                    'question_id': q['question_id'],
+                    'question': q['question'],
+                    'answer': q['answer'],
+                    'status': q['status'],
+                    'is_current': q['question_id'] == current
+                }
+                for q in page
+            ]
         
-        # Return question without full answer for participants
         return jsonify({
             'success': True,
             'data': {
-                'question_id': current_q['question_id'],
-                'question': current_q['question'],
-                'answer_length': current_q['answer_length'],
-                'helping_letters': current_q['helping_letters'],
-                'status': current_q['status'],
-                'answer': current_q['answer'] if current_q['status'] == 'revealed' else None
+                'questions': questions,
+                'total': total,
+                'next_cursor': page[-1]['question_id'] if more else None
             }
         }), 200
     
+    except InvalidCursor as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
+    
     except Exception as e:
         return jsonify({
             'success': False,
-            'message': f'Error getting current question: {str(e)}'
+            'message': f'Error searching questions: {str(e)}'
         }), 500
 
 
-@app.route('/api/rooms/<room_code>/current-question/<question_id>', methods=['PUT'])
-def set_current_question(room_code: str, question_id: str):
-    """
-    Set the current question for a room
+def check_spelling(answer_normalized: str) -> Optional[dict]:
+    """Dictionary hint for a new answer, or None without a word index"""
+    if word_index is None:
+        return None
+    known = word_index.contains(answer_normalized)
+    return {
+        'known': known,
+        'similar': [] if known else word_index.similar(answer_normalized, limit=5)
+    }
+
+
+def current_question_view(room: dict):
+    """Build the participant view of the current question as (payload, status)"""
+    if not room['current_question_id']:
+        return {
+            'success': False,
+            'message': 'No active question'
+        }, 404
     
-    Response:
-    {
-        "success": true,
-        "message": "Current question updated",
+    # Find current question
+    current_q = None
+    for q in room['questions']:
+        if q['question_id'] == room['current_question_id']:
+            current_q = q
+            break
+    
+    if not current_q:
+        return {
+            'success': False,
+            'message': 'Current question not found'
+        }, 404
+    
+    # Return question without full answer for participants
+    return {
+        'success': True,
+        'data': {
+            'question_id': current_q['question_id'],
+            'question': current_q['question'],
+            'answer_length': current_q['answer_length'],
+            'helping_letters': current_q['helping_letters'],
+            'status': current_q['status'],
+            'media': current_q.get('media', []),
+            'answer': current_q['answer'] if current_q['status'] == 'revealed' else None
+        }
+    }, 200
+
+
+@app.route('/api/rooms/<room_code>/questions/current', methods=['GET'])
+def get_current_question(room_code: str):
+    """
+    Get current question
+    
+    Response:
+    {
+        "success": true,
         "data": {
-            "current_question_id": "q1"
+            "question_id": "q1",
+            "question": "Ibu Kota Indonesia",
+            "answer_length": 7,
+            "helping_letters": [...],
+            "status": "active"
         }
     }
     """
     try:
         room_code = room_code.upper()
-        question_id = question_id.lower()  # Convert to lowercase to match stored question_ids
         
         if room_code not in rooms:
             return jsonify({
@@ -757,27 +2081,57 @@ def set_current_question(room_code: str, question_id: str):
                 'message': 'Room not found'
             }), 404
         
-        room = rooms[room_code]
+        return coalesced_read(room_code, 'current_question', current_question_view)
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error getting current question: {str(e)}'
+        }), 500
+
+
+@app.route('/api/rooms/<room_code>/current-question/<question_id>', methods=['PUT'])
+def set_current_question(room_code: str, question_id: str):
+    """
+    Set the current question for a room
+    
+    Response:
+    {
+        "success": true,
+        "message": "Current question updated",
+        "data": {
+            "current_question_id": "q1"
+        }
+    }
+    """
+    try:
+        room_code = room_code.upper()
         
-        # Check if question exists (case-insensitive comparison)
-        question_exists = any(q['question_id'].lower() == question_id for q in room['questions'])
-        if not question_exists:
+        if room_code not in rooms:
             return jsonify({
                 'success': False,
-                'message': 'Question not found'
+                'message': 'Room not found'
             }), 404
         
-        # Set current question
-        room['current_question_id'] = question_id
+        room = rooms[room_code]
+        
+        with room_lock(room_code):
+            result = op_set_current_question(room, question_id)
+            touch_room(room, urgent=True)
+            record_room_event(room_code, 'set_current_question', result)
         
         return jsonify({
             'success': True,
             'message': 'Current question updated',
-            'data': {
-                'current_question_id': room['current_question_id']
-            }
+            'data': result
         }), 200
     
+    except RoomOpError as e:
+        return jsonify({
+            'success': False,
+            'message': e.message
+        }), e.status
+    
     except Exception as e:
         return jsonify({
             'success': False,
@@ -806,7 +2160,10 @@ def clear_current_question(room_code: str):
             }), 404
         
         room = rooms[room_code]
-        room['current_question_id'] = None
+        with room_lock(room_code):
+            result = op_clear_current_question(room)
+            touch_room(room, urgent=True)
+            record_room_event(room_code, 'clear_current_question', result)
         
         return jsonify({
             'success': True,
@@ -843,12 +2200,23 @@ def delete_question_api(room_code: str, question_id: str):
         
         room = rooms[room_code]
         
-        # Find and remove question (case-insensitive comparison)
-        room['questions'] = [q for q in room['questions'] if q['question_id'].lower() != question_id]
-        
-        # If deleted question was current, clear it (case-insensitive comparison)
-        if room['current_question_id'] and room['current_question_id'].lower() == question_id:
-            room['current_question_id'] = None
+        with room_lock(room_code):
+            # Find and remove question (case-insensitive comparison)
+            for q in room['questions']:
+                if q['question_id'].lower() == question_id:
+                    release_media(q)
+            room['questions'] = [q for q in room['questions'] if q['question_id'].lower() != question_id]
+            question_index(room_code).remove(question_id)
+            
+            # If deleted question was current, clear it (case-insensitive comparison)
+            if room['current_question_id'] and room['current_question_id'].lower() == question_id:
+                room['current_question_id'] = None
+            
+            touch_room(room)
+            record_room_event(room_code, 'delete_question', {
+                'question_id': question_id,
+                'current_question_id': room['current_question_id']
+            })
         
         return jsonify({
             'success': True,
@@ -878,7 +2246,6 @@ def reveal_question(room_code: str, question_id: str):
     """
     try:
         room_code = room_code.upper()
-        question_id = question_id.lower()  # Convert to lowercase to match stored question_ids
         
         if room_code not in rooms:
             return jsonify({
@@ -888,32 +2255,23 @@ def reveal_question(room_code: str, question_id: str):
         
         room = rooms[room_code]
         
-        # Find question (case-insensitive comparison)
-        question = None
-        for q in room['questions']:
-            if q['question_id'].lower() == question_id:
-                question = q
-                break
-        
-        if not question:
-            return jsonify({
-                'success': False,
-                'message': 'Question not found'
-            }), 404
-        
-        # Reveal answer
-        question['status'] = 'revealed'
-        question['revealed_at'] = datetime.now().isoformat()
+        with room_lock(room_code):
+            result = op_reveal_question(room, question_id)
+            touch_room(room, urgent=True)
+            record_room_event(room_code, 'reveal', result)
         
         return jsonify({
             'success': True,
             'message': 'Answer revealed',
-            'data': {
-                'question_id': question['question_id'],
-                'answer': question['answer']
-            }
+            'data': result
         }), 200
     
+    except RoomOpError as e:
+        return jsonify({
+            'success': False,
+            'message': e.message
+        }), e.status
+    
     except Exception as e:
         return jsonify({
             'success': False,
@@ -946,28 +2304,23 @@ def next_question(room_code: str):
         
         room = rooms[room_code]
         
-        # Find current question index
-        current_idx = -1
-        for i, q in enumerate(room['questions']):
-            if q['question_id'] == room['current_question_id']:
-                current_idx = i
-                break
-        
         # Move to next question if available
-        if current_idx < len(room['questions']) - 1:
-            room['current_question_id'] = room['questions'][current_idx + 1]['question_id']
-            return jsonify({
-                'success': True,
-                'message': 'Moved to next question',
-                'data': {
-                    'current_question_id': room['current_question_id']
-                }
-            }), 200
-        else:
-            return jsonify({
-                'success': False,
-                'message': 'No more questions available'
-            }), 400
+        with room_lock(room_code):
+            result = op_next_question(room)
+            touch_room(room, urgent=True)
+            record_room_event(room_code, 'next_question', result)
+        
+        return jsonify({
+            'success': True,
+            'message': 'Moved to next question',
+            'data': result
+        }), 200
+    
+    except RoomOpError as e:
+        return jsonify({
+            'success': False,
+            'message': e.message
+        }), e.status
     
     except Exception as e:
         return jsonify({
@@ -992,9 +2345,15 @@ def submit_answer(room_code: str):
         "success": true,
         "data": {
             "is_correct": true,
+            "verdict": "exact",  # exact, near_miss, wrong
+            "distance": 0,
             "correct_answer": "JAKARTA"
         }
     }
+    
+    Guesses are compared after accent/case folding and stripping spaces and
+    punctuation. A near miss (small edit distance) is not counted as correct;
+    it is flagged so the host can judge it.
     """
     try:
         room_code = room_code.upper()
@@ -1007,7 +2366,7 @@ def submit_answer(room_code: str):
             }), 400
         
         player_name = data['player_name'].strip()
-        answer = data['answer'].strip().upper()
+        answer = data['answer']
         
         if room_code not in rooms:
             return jsonify({
@@ -1016,6 +2375,13 @@ def submit_answer(room_code: str):
             }), 404
         
         room = rooms[room_code]
+        # Only players in the room are judged and logged
+        if player_name not in room['participants']:
+            return jsonify({
+                'success': False,
+                'message': 'Player not found in this room'
+            }), 404
+        presence.heartbeat(room_code, player_name)
         
         if not room['current_question_id']:
             return jsonify({
@@ -1037,12 +2403,29 @@ def submit_answer(room_code: str):
             }), 404
         
         # Check answer
-        is_correct = (answer == current_q['answer'])
+        answer_normalized = current_q.get('answer_normalized') or normalize_answer(current_q['answer'])
+        verdict, distance = judge_answer(answer_normalized, answer)
+        is_correct = (verdict == VERDICT_EXACT)
+        
+        shown_at = datetime.fromisoformat(current_q.get('shown_at') or current_q['created_at'])
+        attempt_logs.setdefault(room_code, AttemptLog()).append(
+            player_name, current_q['question_id'], verdict,
+            (datetime.now() - shown_at).total_seconds()
+        )
+        record_room_event(room_code, 'answer', {
+            'player_name': player_name,
+            'question_id': current_q['question_id'],
+            'answer': str(answer)[:100],
+            'verdict': verdict,
+            'distance': distance
+        })
         
         return jsonify({
             'success': True,
             'data': {
                 'is_correct': is_correct,
+                'verdict': verdict,
+                'distance': distance,
                 'correct_answer': current_q['answer'] if is_correct else None
             }
         }), 200
@@ -1096,21 +2479,15 @@ def award_points(room_code: str):
         
         room = rooms[room_code]
         
-        # Initialize score if not exists
-        if player_name not in room['player_scores']:
-            room['player_scores'][player_name] = 0
-        
-        # Add points
-        room['player_scores'][player_name] += points
+        with room_lock(room_code):
+            result = op_award_points(room, player_name, points)
+            touch_room(room)
+            record_room_event(room_code, 'award_points', result)
         
         return jsonify({
             'success': True,
             'message': 'Points awarded',
-            'data': {
-                'player_name': player_name,
-                'points_awarded': points,
-                'total_score': room['player_scores'][player_name]
-            }
+            'data': result
         }), 200
     
     except Exception as e:
@@ -1167,6 +2544,82 @@ def get_scores(room_code: str):
         }), 500
 
 
+SCORE_HISTORY_MAX_POINTS = 1000
+
+
+@app.route('/api/rooms/<room_code>/scores/history', methods=['GET'])
+def get_score_history(room_code: str):
+    """
+    Get every player's score over time, downsampled for charts
+    
+    Query parameters (all optional):
+        points   maximum points per player (default 100, 3-1000)
+        mode     lttb (default, line charts) or max (highest score per
+                 time bucket)
+        players  comma-separated player names (default: everyone)
+        since    unix time; only changes from then on
+    
+    Response:
+    {
+        "success": true,
+        "data": {
+            "started_at": 1770370245.12,
+            "mode": "lttb",
+            "points": 100,
+            "changes": 1840,
+            "dropped": 0,
+            "players": [
+                {"player_name": "Player 1", "changes": 62,
+                 "t": [0.0, 31.5, ...], "score": [10, 20, ...]}
+            ]
+        }
+    }
+    
+    `t` is seconds since `started_at`, the room's first score change.
+    """
+    try:
+        room_code = room_code.upper()
+        
+        if room_code not in rooms:
+            return jsonify({
+                'success': False,
+                'message': 'Room not found'
+            }), 404
+        
+        try:
+            points = int(request.args.get('points', 100))
+            since = request.args.get('since')
+            since = float(since) if since else None
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'message': 'points and since must be numbers'
+            }), 400
+        
+        mode = request.args.get('mode', 'lttb')
+        if mode not in SCORE_HISTORY_MODES or not 3 <= points <= SCORE_HISTORY_MAX_POINTS:
+            return jsonify({
+                'success': False,
+                'message': f"mode must be one of {', '.join(SCORE_HISTORY_MODES)} "
+                           f"and points between 3 and {SCORE_HISTORY_MAX_POINTS}"
+            }), 400
+        
+        players = request.args.get('players')
+        players = [name.strip() for name in players.split(',')] if players else None
+        
+        history = score_histories.setdefault(room_code, ScoreHistory())
+        return jsonify({
+            'success': True,
+            'data': history.series(points=points, mode=mode, players=players, since=since)
+        }), 200
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error getting score history: {str(e)}'
+        }), 500
+
+
 @app.route('/api/rooms/<room_code>/remove-participant', methods=['POST'])
 def remove_participant(room_code: str):
     """
@@ -1203,24 +2656,23 @@ def remove_participant(room_code: str):
         
         room = rooms[room_code]
         
-        if player_name not in room['participants']:
-            return jsonify({
-                'success': False,
-                'message': 'Player not found in this room'
-            }), 404
-        
-        # Remove player from room
-        room['participants'].remove(player_name)
-        
-        # Also remove their score
-        if player_name in room['player_scores']:
-            del room['player_scores'][player_name]
+        with room_lock(room_code):
+            result = op_remove_participant(room, player_name)
+            record_room_event(room_code, 'remove_participant', result)
+            admit_waiting(room)
+            touch_room(room)
         
         return jsonify({
             'success': True,
             'message': 'Participant removed successfully'
         }), 200
     
+    except RoomOpError as e:
+        return jsonify({
+            'success': False,
+            'message': e.message
+        }), e.status
+    
     except Exception as e:
         return jsonify({
             'success': False,
@@ -1269,23 +2721,22 @@ def update_points(room_code: str):
         
         room = rooms[room_code]
         
-        if player_name not in room['participants']:
-            return jsonify({
-                'success': False,
-                'message': 'Player not found in this room'
-            }), 404
-        
-        # Set points directly (overwrite)
-        room['player_scores'][player_name] = points
+        with room_lock(room_code):
+            result = op_update_points(room, player_name, points)
+            touch_room(room)
+            record_room_event(room_code, 'update_points', result)
         
         return jsonify({
             'success': True,
-            'data': {
-                'player_name': player_name,
-                'total_score': room['player_scores'][player_name]
-            }
+            'data': result
         }), 200
     
+    except RoomOpError as e:
+        return jsonify({
+            'success': False,
+            'message': e.message
+        }), e.status
+    
     except Exception as e:
         return jsonify({
             'success': False,
@@ -1293,63 +2744,1813 @@ def update_points(room_code: str):
         }), 500
 
 
-# ==================== ERROR HANDLERS ====================
-
-@app.errorhandler(404)
-def not_found(error):
-    """Handle 404 errors"""
-    return jsonify({
-        'success': False,
-        'message': 'Endpoint not found'
-    }), 404
+# ==================== QUESTION MEDIA ENDPOINTS ====================
 
+MAX_QUESTION_MEDIA = 4
+MEDIA_MAX_AGE = 365 * 24 * 3600
 
-@app.errorhandler(405)
-def method_not_allowed(error):
-    """Handle 405 errors"""
-    return jsonify({
-        'success': False,
-        'message': 'Method not allowed'
-    }), 405
 
+def media_view(item: dict) -> dict:
+    """Attach the serving URLs to a stored media descriptor"""
+    url = f"/api/media/{item['media_id']}"
+    return dict(item, url=url, thumbnail_url=url + '/thumbnail' if item['thumbnail'] else url)
 
-@app.errorhandler(500)
-def internal_error(error):
-    """Handle 500 errors"""
-    return jsonify({
-        'success': False,
-        'message': 'Internal server error'
-    }), 500
 
+def release_media(question: dict) -> None:
+    """Drop a question's references to its media files"""
+    for item in question.get('media', []):
+        media_store.release(item['media_id'])
 
-# ==================== MAIN ====================
 
-if __name__ == '__main__':
-    print("=" * 50)
-    print("TTX (Teka-Teki Extreme) - Backend Server")
-    print("=" * 50)
-    print("\nServer berjalan di: http://localhost:5000")
-    print("CORS enabled for frontend communication")
-    print("\nEndpoints tersedia:")
-    print("  - POST   /api/rooms")
-    print("  - GET    /api/rooms/<code>")
-    print("  - DELETE /api/rooms/<code>")
-    print("  - POST   /api/rooms/<code>/join")
-    print("  - POST   /api/rooms/<code>/leave")
-    print("  - GET    /api/rooms/<code>/participants")
-    print("  - GET    /api/rooms/<code>/status")
-    print("  - POST   /api/rooms/<code>/start")
-    print("  - POST   /api/rooms/<code>/finish")
-    print("  - GET    /api/stats")
-    print("  - GET    /api/health")
-    print("\n" + "=" * 50 + "\n")
+@app.route('/api/rooms/<room_code>/questions/<question_id>/media', methods=['POST'])
+def upload_question_media(room_code: str, question_id: str):
+    """
+    Attach an image or audio clue to a question (multipart/form-data, field "file")
     
-    app.run(
-        host='0.0.0.0',
-        port=5000,
-        debug=True,
-        use_reloader=True
-    )
-
-if __name__ == "__main__":
-    app.run(debug=True)
+    Response:
+    {
+        "success": true,
+        "data": {
+            "media_id": "9f86d081884c7d65...",
+            "mime_type": "image/png",
+            "kind": "image",
+            "size": 48213,
+            "thumbnail": true,
+            "url": "/api/media/9f86d081884c7d65...",
+            "thumbnail_url": "/api/media/9f86d081884c7d65.../thumbnail"
+        }
+    }
+    
+    Identical files are stored once, however many rooms use them.
+    """
+    try:
+        room_code = room_code.upper()
+        
+        if room_code not in rooms:
+            return jsonify({
+                'success': False,
+                'message': 'Room not found'
+            }), 404
+        
+        room = rooms[room_code]
+        question = find_question(room, question_id)
+        if not question:
+            return jsonify({
+                'success': False,
+                'message': 'Question not found'
+            }), 404
+        
+        if request.content_length and request.content_length > media_store.max_bytes + 64 * 1024:
+            return jsonify({
+                'success': False,
+                'message': f'File exceeds {media_store.max_bytes // (1024 * 1024)} MB'
+            }), 413
+        
+        upload = request.files.get('file')
+        if upload is None:
+            return jsonify({
+                'success': False,
+                'message': 'File is required (form field "file")'
+            }), 400
+        
+        # Hash and store outside the room lock; only the attach is locked
+        item = media_view(media_store.put(upload.stream))
+        
+        with room_lock(room_code):
+            question = find_question(room, question_id) if room_code in rooms else None
+            if question is None:
+                media_store.release(item['media_id'])
+                return jsonify({
+                    'success': False,
+                    'message': 'Question not found'
+                }), 404
+            
+            media = question.setdefault('media', [])
+            if any(m['media_id'] == item['media_id'] for m in media):
+                media_store.release(item['media_id'])
+                return jsonify({
+                    'success': True,
+                    'message': 'Media already attached',
+                    'data': item
+                }), 200
+            
+            if len(media) >= MAX_QUESTION_MEDIA:
+                media_store.release(item['media_id'])
+                return jsonify({
+                    'success': False,
+                    'message': f'A question can have at most {MAX_QUESTION_MEDIA} media files'
+                }), 400
+            
+            media.append(item)
+            touch_room(room)
+        
+        return jsonify({
+            'success': True,
+            'message': 'Media attached',
+            'data': item
+        }), 201
+    
+    except MediaError as e:
+        return jsonify({
+            'success': False,
+            'message': e.message
+        }), e.status
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error uploading media: {str(e)}'
+        }), 500
+
+
+@app.route('/api/rooms/<room_code>/questions/<question_id>/media/<media_id>', methods=['DELETE'])
+def delete_question_media(room_code: str, question_id: str, media_id: str):
+    """
+    Detach a media clue from a question
+    
+    Response:
+    {
+        "success": true,
+        "message": "Media removed"
+    }
+    """
+    try:
+        room_code = room_code.upper()
+        
+        if room_code not in rooms:
+            return jsonify({
+                'success': False,
+                'message': 'Room not found'
+            }), 404
+        
+        room = rooms[room_code]
+        
+        with room_lock(room_code):
+            question = find_question(room, question_id)
+            if not question:
+                return jsonify({
+                    'success': False,
+                    'message': 'Question not found'
+                }), 404
+            
+            media = question.get('media', [])
+            remaining = [m for m in media if m['media_id'] != media_id]
+            if len(remaining) == len(media):
+                return jsonify({
+                    'success': False,
+                    'message': 'Media not found'
+                }), 404
+            
+            question['media'] = remaining
+            media_store.release(media_id)
+            touch_room(room)
+        
+        return jsonify({
+            'success': True,
+            'message': 'Media removed'
+        }), 200
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error removing media: {str(e)}'
+        }), 500
+
+
+def serve_media(media_id: str, thumbnail: bool):
+    found = media_store.lookup(media_id, thumbnail=thumbnail)
+    if found is None:
+        return jsonify({
+            'success': False,
+            'message': 'Media not found'
+        }), 404
+    
+    path, mimetype = found
+    # The URL names the content, so the file can be cached forever. Range
+    # requests are handled by conditional=True, and the file is streamed by
+    # the server's file wrapper (sendfile under gunicorn)
+    response = send_file(
+        path,
+        mimetype=mimetype,
+        conditional=True,
+        etag=os.path.basename(path),
+        max_age=MEDIA_MAX_AGE
+    )
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+
+@app.route('/api/media/<media_id>', methods=['GET'])
+def get_media(media_id: str):
+    """Serve a stored media file (supports Range and If-None-Match)"""
+    try:
+        return serve_media(media_id, thumbnail=False)
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error serving media: {str(e)}'
+        }), 500
+
+
+@app.route('/api/media/<media_id>/thumbnail', methods=['GET'])
+def get_media_thumbnail(media_id: str):
+    """Serve an image's thumbnail (the original when no thumbnail exists)"""
+    try:
+        return serve_media(media_id, thumbnail=True)
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error serving media: {str(e)}'
+        }), 500
+
+
+# ==================== WORD INDEX ENDPOINTS ====================
+
+WORD_LIMIT_MAX = 100
+
+
+def word_index_unavailable():
+    return jsonify({
+        'success': False,
+        'message': 'Word index not available'
+    }), 503
+
+
+def word_limit(default: int = 20) -> int:
+    """The `limit` query parameter, clamped to 1..WORD_LIMIT_MAX"""
+    limit = int(request.args.get('limit', default))
+    return max(1, min(limit, WORD_LIMIT_MAX))
+
+
+@app.route('/api/words/check', methods=['GET'])
+def check_word():
+    """
+    Check a word against the dictionary
+    
+    Query: ?word=JAKARTA
+    
+    Response:
+    {
+        "success": true,
+        "data": {"word": "JAKARTA", "known": true, "similar": []}
+    }
+    """
+    try:
+        if word_index is None:
+            return word_index_unavailable()
+        
+        word = normalize_answer(request.args.get('word', ''))
+        if not word:
+            return jsonify({
+                'success': False,
+                'message': 'word is required'
+            }), 400
+        
+        known = word_index.contains(word)
+        return jsonify({
+            'success': True,
+            'data': {
+                'word': word,
+                'known': known,
+                'similar': [] if known else word_index.similar(word, limit=word_limit(10))
+            }
+        }), 200
+    
+    except ValueError:
+        return jsonify({
+            'success': False,
+            'message': 'limit must be a number'
+        }), 400
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error checking word: {str(e)}'
+        }), 500
+
+
+@app.route('/api/words/match', methods=['GET'])
+def match_words():
+    """
+    Words that fit a crossword pattern (`_`, `?` or `.` for unknown letters)
+    
+    Query: ?pattern=J_K_RTA&limit=20
+    
+    Response:
+    {
+        "success": true,
+        "data": {"pattern": "J_K_RTA", "words": ["JAKARTA"]}
+    }
+    """
+    try:
+        if word_index is None:
+            return word_index_unavailable()
+        
+        pattern = request.args.get('pattern', '').strip()
+        if not pattern:
+            return jsonify({
+                'success': False,
+                'message': 'pattern is required'
+            }), 400
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'pattern': pattern,
+                'words': word_index.match(pattern, limit=word_limit())
+            }
+        }), 200
+    
+    except ValueError:
+        return jsonify({
+            'success': False,
+            'message': 'limit must be a number'
+        }), 400
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error matching words: {str(e)}'
+        }), 500
+
+
+@app.route('/api/words/suggest', methods=['GET'])
+def suggest_words():
+    """
+    Suggest answers by shape
+    
+    Query: ?length=7&prefix=JA&contains=RT&limit=20 (all optional)
+    
+    Response:
+    {
+        "success": true,
+        "data": {"words": ["JAKARTA", ...]}
+    }
+    """
+    try:
+        if word_index is None:
+            return word_index_unavailable()
+        
+        length = request.args.get('length')
+        length = int(length) if length else None
+        if length is not None and length < 1:
+            return jsonify({
+                'success': False,
+                'message': 'length must be positive'
+            }), 400
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'words': word_index.suggest(
+                    length=length,
+                    prefix=request.args.get('prefix', ''),
+                    contains=request.args.get('contains', ''),
+                    limit=word_limit()
+                )
+            }
+        }), 200
+    
+    except ValueError:
+        return jsonify({
+            'success': False,
+            'message': 'length and limit must be numbers'
+        }), 400
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error suggesting words: {str(e)}'
+        }), 500
+
+
+# ==================== ANSWER ANALYTICS ENDPOINTS ====================
+
+@app.route('/api/rooms/<room_code>/analytics', methods=['GET'])
+def get_answer_analytics(room_code: str):
+    """
+    Get answer-attempt analytics for a room
+
+    Query parameters (optional):
+        hardest       number of hardest questions to list (default 5)
+        min_attempts  attempts a question needs to be ranked (default 1)
+
+    Response:
+    {
+        "success": true,
+        "data": {
+            "attempts": 1200,
+            "dropped": 0,
+            "questions": [
+                {"question_id": "q1", "attempts": 40, "correct": 18, "near_miss": 6,
+                 "accuracy": 0.45, "median_time_to_correct": 12.4}
+            ],
+            "hardest": [...],
+            "players": [
+                {"player_name": "Player 1", "attempts": 30, "correct": 12,
+                 "current_streak": 2, "longest_streak": 5}
+            ],
+            "elapsed_ms": 3.1
+        }
+    }
+    """
+    try:
+        room_code = room_code.upper()
+
+        if room_code not in rooms:
+            return jsonify({
+                'success': False,
+                'message': 'Room not found'
+            }), 404
+
+        try:
+            hardest = max(0, int(request.args.get('hardest', 5)))
+            min_attempts = max(1, int(request.args.get('min_attempts', 1)))
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'message': 'hardest and min_attempts must be integers'
+            }), 400
+
+        log = attempt_logs.setdefault(room_code, AttemptLog())
+        started = datetime.now()
+        stats = log.analytics(hardest=hardest, min_attempts=min_attempts)
+        stats['elapsed_ms'] = round((datetime.now() - started).total_seconds() * 1000, 3)
+
+        return jsonify({
+            'success': True,
+            'data': stats
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error getting analytics: {str(e)}'
+        }), 500
+
+
+# ==================== REPLAY ENDPOINTS ====================
+
+REPLAY_MAX_EVENTS = 100
+
+
+@app.route('/api/rooms/<room_code>/replay', methods=['GET'])
+def get_replay(room_code: str):
+    """
+    Reconstruct a room as it was at a point in time
+    
+    Query parameters (all optional):
+        at      unix time to replay to (default: now)
+        t       seconds since the room was created, instead of `at`
+        events  how many journal entries leading up to that time to
+                include (default 10, 0-100)
+    
+    Response:
+    {
+        "success": true,
+        "data": {
+            "at": 1770370290.5,
+            "started_at": 1770370245.12,
+            "applied": 131,
+            "replayed": 3,
+            "state": {
+                "name": "Kelas 7A",
+                "status": "playing",
+                "participants": ["Player 1", "Player 2"],
+                "current_question_id": "q3",
+                "questions": {"q1": {"question": "...", "answer": "JAKARTA", "status": "revealed"}},
+                "player_scores": {"Player 1": 200}
+            },
+            "events": [
+                {"op": "award_points", "ts": 1770370290.1, "player_name": "Player 1",
+                 "points_awarded": 100, "total_score": 200}
+            ]
+        }
+    }
+    
+    Deleted rooms can be replayed until the journal retention ends.
+    """
+    try:
+        room_code = room_code.upper()
+        journal = room_journals.get(room_code)
+        
+        if journal is None:
+            return jsonify({
+                'success': False,
+                'message': 'Replay not found'
+            }), 404
+        
+        try:
+            events = int(request.args.get('events', 10))
+            if request.args.get('t'):
+                at = (journal.started_at or time.time()) + float(request.args['t'])
+            else:
+                at = float(request.args.get('at') or time.time())
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'message': 'at, t and events must be numbers'
+            }), 400
+        
+        if not 0 <= events <= REPLAY_MAX_EVENTS:
+            return jsonify({
+                'success': False,
+                'message': f'events must be between 0 and {REPLAY_MAX_EVENTS}'
+            }), 400
+        
+        try:
+            replay = journal.state_at(at, events=events)
+        except JournalCompacted as e:
+            return jsonify({
+                'success': False,
+                'message': str(e)
+            }), 410
+        
+        return jsonify({
+            'success': True,
+            'data': replay
+        }), 200
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error replaying room: {str(e)}'
+        }), 500
+
+
+# ==================== RESULT EXPORT ENDPOINTS ====================
+
+def report_snapshot(room_code: str) -> dict:
+    """Plain-data copy of everything a result sheet shows, taken atomically"""
+    room = rooms[room_code]
+    with room_lock(room_code):
+        # Exports are keyed by version, so publish any held change first
+        if room_broadcasts.flush(room_code):
+            publish_room(room)
+        snapshot = {
+            'code': room['code'],
+            'name': room['name'],
+            'status': room['status'],
+            'version': room['version'],
+            'generated_at': datetime.now().isoformat(timespec='seconds'),
+            'scores': dict(room['player_scores']),
+            'participants': list(room['participants']),
+            'questions': [
+                {k: q[k] for k in ('question_id', 'question', 'answer', 'status')}
+                for q in room['questions']
+            ]
+        }
+    
+    stats = attempt_logs.setdefault(room_code, AttemptLog()).analytics(hardest=0)
+    by_question = {q['question_id']: q for q in stats['questions']}
+    by_player = {p['player_name']: p for p in stats['players']}
+    
+    for q in snapshot['questions']:
+        q_stats = by_question.get(q['question_id'], {})
+        q['attempts'] = q_stats.get('attempts', 0)
+        q['accuracy'] = q_stats.get('accuracy')
+        q['median_time_to_correct'] = q_stats.get('median_time_to_correct')
+    
+    names = list(dict.fromkeys(snapshot['participants'] + list(snapshot['scores'])))
+    snapshot['players'] = sorted((
+        {
+            'player_name': name,
+            'score': snapshot['scores'].get(name, 0),
+            'attempts': by_player.get(name, {}).get('attempts', 0),
+            'correct': by_player.get(name, {}).get('correct', 0),
+            'longest_streak': by_player.get(name, {}).get('longest_streak', 0)
+        }
+        for name in names
+    ), key=lambda p: p['score'], reverse=True)
+    return snapshot
+
+
+@app.route('/api/rooms/<room_code>/exports', methods=['POST'])
+def create_export(room_code: str):
+    """
+    Start rendering a result sheet for the room
+
+    Request body:
+    {
+        "format": "csv"  # csv, xlsx, pdf
+    }
+
+    Response (202):
+    {
+        "success": true,
+        "data": {
+            "job_id": "3f2a...",
+            "room_code": "ABC123",
+            "room_version": 42,
+            "format": "csv",
+            "status": "queued",  # queued, done, failed
+            "filename": "ttx-ABC123-results.csv",
+            ...
+        }
+    }
+
+    Asking again for the same format before the room changes returns the
+    same job instead of rendering twice.
+    """
+    try:
+        room_code = room_code.upper()
+        
+        if room_code not in rooms:
+            return jsonify({
+                'success': False,
+                'message': 'Room not found'
+            }), 404
+        
+        data = request.get_json(silent=True) or {}
+        fmt = str(data.get('format', 'csv')).lower()
+        
+        if fmt not in reports.FORMATS:
+            return jsonify({
+                'success': False,
+                'message': f"format must be one of {', '.join(reports.FORMATS)}"
+            }), 400
+        
+        snapshot = report_snapshot(room_code)
+        job = exports.submit(room_code, snapshot['version'], fmt, snapshot)
+        
+        return jsonify({
+            'success': True,
+            'message': 'Export started',
+            'data': job
+        }), 202
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error starting export: {str(e)}'
+        }), 500
+
+
+def find_export(room_code: str, job_id: str) -> Optional[dict]:
+    job = exports.get(job_id)
+    if job is None or job['room_code'] != room_code.upper():
+        return None
+    return job
+
+
+@app.route('/api/rooms/<room_code>/exports/<job_id>', methods=['GET'])
+def get_export(room_code: str, job_id: str):
+    """
+    Get the status of an export job
+    
+    Response:
+    {
+        "success": true,
+        "data": {
+            "job_id": "3f2a...",
+            "status": "done",
+            "size": 1832,
+            ...
+        }
+    }
+    """
+    try:
+        job = find_export(room_code, job_id)
+        
+        if job is None:
+            return jsonify({
+                'success': False,
+                'message': 'Export not found'
+            }), 404
+        
+        return jsonify({
+            'success': True,
+            'data': reports.ExportJobs.public(job)
+        }), 200
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error getting export: {str(e)}'
+        }), 500
+
+
+@app.route('/api/rooms/<room_code>/exports/<job_id>/download', methods=['GET'])
+def download_export(room_code: str, job_id: str):
+    """
+    Download a finished export
+
+    The file is streamed from the export cache; Range and conditional
+    (If-None-Match / If-Modified-Since) requests are supported.
+    """
+    try:
+        job = find_export(room_code, job_id)
+        
+        if job is None:
+            return jsonify({
+                'success': False,
+                'message': 'Export not found'
+            }), 404
+        
+        if job['status'] != reports.STATUS_DONE:
+            return jsonify({
+                'success': False,
+                'message': f"Export is not ready (status: {job['status']})"
+            }), 409
+        
+        if not os.path.exists(job['path']):
+            return jsonify({
+                'success': False,
+                'message': 'Export has expired'
+            }), 410
+        
+        return send_file(
+            job['path'],
+            mimetype=job['mimetype'],
+            as_attachment=True,
+            download_name=job['filename'],
+            conditional=True,
+            max_age=0
+        )
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error downloading export: {str(e)}'
+        }), 500
+
+
+# ==================== HOST COMMAND BATCH ENDPOINTS ====================
+
+MAX_BATCH_COMMANDS = 20
+
+
+def _command_player(cmd: dict) -> str:
+    player_name = str(cmd.get('player_name', '')).strip()
+    if not player_name:
+        raise RoomOpError('player_name is required')
+    return player_name
+
+
+def _command_points(cmd: dict) -> int:
+    try:
+        return int(cmd['points'])
+    except (KeyError, TypeError, ValueError):
+        raise RoomOpError('points must be an integer')
+
+
+def _command_reveal(room: dict, cmd: dict, effects: list) -> dict:
+    # Without an explicit id, reveal whatever question is current
+    question_id = cmd.get('question_id') or room['current_question_id']
+    if not question_id:
+        raise RoomOpError('No active question')
+    return op_reveal_question(room, str(question_id))
+
+
+def _command_set_current(room: dict, cmd: dict, effects: list) -> dict:
+    if not cmd.get('question_id'):
+        raise RoomOpError('question_id is required')
+    return op_set_current_question(room, str(cmd['question_id']))
+
+
+# Commands get the batch's effect queue (see defer) as a third argument
+ROOM_COMMANDS = {
+    'start_game': lambda room, cmd, effects: op_start_game(room),
+    'finish_game': lambda room, cmd, effects: op_finish_game(room),
+    'set_current_question': _command_set_current,
+    'clear_current_question': lambda room, cmd, effects: op_clear_current_question(room),
+    'reveal': _command_reveal,
+    'next_question': lambda room, cmd, effects: op_next_question(room),
+    'award_points': lambda room, cmd, effects: op_award_points(
+        room, _command_player(cmd), _command_points(cmd), effects),
+    'update_points': lambda room, cmd, effects: op_update_points(
+        room, _command_player(cmd), _command_points(cmd), effects),
+    'remove_participant': lambda room, cmd, effects: op_remove_participant(room, _command_player(cmd), effects),
+}
+
+# Room fields each command may change; a batch saves only these for rollback
+# ('questions' stands for the status/revealed_at/shown_at of every question)
+COMMAND_FIELDS = {
+    'start_game': ('status',),
+    'finish_game': ('status',),
+    'set_current_question': ('current_question_id', 'questions'),
+    'clear_current_question': ('current_question_id',),
+    'reveal': ('questions',),
+    'next_question': ('current_question_id', 'questions'),
+    'award_points': ('player_scores',),
+    'update_points': ('player_scores',),
+    'remove_participant': ('participants', 'player_scores'),
+}
+
+_QUESTION_STATE = ('status', 'revealed_at', 'shown_at')
+
+
+def save_fields(room: dict, fields: set) -> dict:
+    """Copy the given room fields so a failed batch can put them back"""
+    saved = {}
+    for field in fields:
+        if field == 'questions':
+            saved[field] = [(q, tuple(q[k] for k in _QUESTION_STATE)) for q in room['questions']]
+        elif field == 'participants':
+            saved[field] = Roster(room['participants'])
+        elif field == 'player_scores':
+            saved[field] = dict(room['player_scores'])
+        else:
+            saved[field] = room[field]
+    return saved
+
+
+def restore_fields(room: dict, saved: dict) -> None:
+    for field, value in saved.items():
+        if field == 'questions':
+            index = question_index(room['code'])
+            for question, state in value:
+                if question['status'] != state[0]:
+                    index.set_status(question, state[0])
+                question.update(zip(_QUESTION_STATE, state))
+        else:
+            room[field] = value
+
+# Batches containing these are published at once instead of at the end of the tick
+URGENT_COMMANDS = {'start_game', 'finish_game', 'set_current_question', 'clear_current_question',
+                   'reveal', 'next_question'}
+
+
+@app.route('/api/rooms/<room_code>/commands', methods=['POST'])
+def run_room_commands(room_code: str):
+    """
+    Apply an ordered list of host commands atomically
+
+    All commands run under the room lock, in order. If any command fails,
+    the room is rolled back to its state before the batch and nothing is
+    applied. Readers never observe a half-applied batch.
+
+    Request body:
+    {
+        "commands": [
+            {"op": "reveal", "question_id": "q1"},
+            {"op": "award_points", "player_name": "Player 1", "points": 100},
+            {"op": "next_question"}
+        ]
+    }
+
+    Response:
+    {
+        "success": true,
+        "data": {
+            "results": [
+                {"op": "reveal", "question_id": "q1", "answer": "JAKARTA"},
+                {"op": "award_points", "player_name": "Player 1", "points_awarded": 100, "total_score": 100},
+                {"op": "next_question", "current_question_id": "q2"}
+            ],
+            "version": 42
+        }
+    }
+
+    `version` is the room's published version. A batch of only awards
+    made during a burst is published when the tick ends, so it may not
+    reflect the batch yet.
+    """
+    try:
+        room_code = room_code.upper()
+
+        if room_code not in rooms:
+            return jsonify({
+                'success': False,
+                'message': 'Room not found'
+            }), 404
+
+        data = request.get_json(silent=True) or {}
+        commands = data.get('commands')
+
+        if not isinstance(commands, list) or not commands:
+            return jsonify({
+                'success': False,
+                'message': 'commands must be a non-empty list'
+            }), 400
+
+        if len(commands) > MAX_BATCH_COMMANDS:
+            return jsonify({
+                'success': False,
+                'message': f'At most {MAX_BATCH_COMMANDS} commands per batch'
+            }), 400
+
+        for i, cmd in enumerate(commands):
+            if not isinstance(cmd, dict) or cmd.get('op') not in ROOM_COMMANDS:
+                return jsonify({
+                    'success': False,
+                    'message': f'Unknown command at index {i}',
+                    'failed_index': i
+                }), 400
+
+        room = rooms[room_code]
+
+        with room_lock(room_code):
+            saved = save_fields(room, {field for cmd in commands for field in COMMAND_FIELDS[cmd['op']]})
+            effects = []
+            results = []
+            for i, cmd in enumerate(commands):
+                try:
+                    result = ROOM_COMMANDS[cmd['op']](room, cmd, effects)
+                except RoomOpError as e:
+                    restore_fields(room, saved)
+                    return jsonify({
+                        'success': False,
+                        'message': e.message,
+                        'failed_index': i
+                    }), e.status
+                except Exception:
+                    restore_fields(room, saved)
+                    raise
+                results.append(dict(op=cmd['op'], **result))
+
+            # The batch is final: now run what the commands deferred
+            for fn, args in effects:
+                fn(*args)
+            for result in results:
+                record_room_event(room_code, result['op'], result)
+            admit_waiting(room)
+            touch_room(room, urgent=any(cmd['op'] in URGENT_COMMANDS for cmd in commands))
+            version = room['version']
+
+        return jsonify({
+            'success': True,
+            'message': f'{len(results)} commands applied',
+            'data': {
+                'results': results,
+                'version': version
+            }
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error running commands: {str(e)}'
+        }), 500
+
+
+# ==================== TOURNAMENT ENDPOINTS ====================
+
+# A stream is closed after this long; EventSource reconnects with Last-Event-ID
+TOURNAMENT_STREAM_SECONDS = 300
+
+
+def attach_room(tournament: Tournament, room_code: str) -> Optional[tuple]:
+    """Add a room to a tournament; returns an error response or None"""
+    if room_code not in rooms:
+        return jsonify({
+            'success': False,
+            'message': f'Room {room_code} not found'
+        }), 404
+
+    owner = room_tournaments.get(room_code)
+    if owner is not None and owner != tournament.tournament_id:
+        return jsonify({
+            'success': False,
+            'message': f'Room {room_code} already belongs to another tournament'
+        }), 409
+
+    with room_lock(room_code):
+        room_tournaments[room_code] = tournament.tournament_id
+        sync_tournament_room(tournament, rooms[room_code])
+    return None
+
+
+@app.route('/api/tournaments', methods=['POST'])
+def create_tournament():
+    """
+    Create a tournament grouping several rooms into one leaderboard
+
+    Request body:
+    {
+        "name": "Lomba Antar Kelas",
+        "room_codes": ["ABC123", "DEF456"]
+    }
+
+    Response:
+    {
+        "success": true,
+        "data": {
+            "tournament_id": "1A2B3C4D",
+            "name": "Lomba Antar Kelas",
+            "rooms": ["ABC123", "DEF456"]
+        }
+    }
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        name = str(data.get('name', '')).strip()
+        room_codes = data.get('room_codes', [])
+
+        if not name:
+            return jsonify({
+                'success': False,
+                'message': 'Tournament name is required'
+            }), 400
+
+        if not isinstance(room_codes, list):
+            return jsonify({
+                'success': False,
+                'message': 'room_codes must be a list'
+            }), 400
+
+        room_codes = list(dict.fromkeys(str(code).upper() for code in room_codes))
+        for code in room_codes:
+            if code not in rooms:
+                return jsonify({
+                    'success': False,
+                    'message': f'Room {code} not found'
+                }), 404
+            if code in room_tournaments:
+                return jsonify({
+                    'success': False,
+                    'message': f'Room {code} already belongs to another tournament'
+                }), 409
+
+        tournament_id = uuid.uuid4().hex[:8].upper()
+        tournament = Tournament(tournament_id, name[:50])
+        tournaments[tournament_id] = tournament
+        for code in room_codes:
+            attach_room(tournament, code)
+
+        return jsonify({
+            'success': True,
+            'message': 'Tournament created successfully',
+            'data': {
+                'tournament_id': tournament_id,
+                'name': tournament.name,
+                'rooms': list(tournament.rooms)
+            }
+        }), 201
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error creating tournament: {str(e)}'
+        }), 500
+
+
+@app.route('/api/tournaments/<tournament_id>', methods=['DELETE'])
+def delete_tournament(tournament_id: str):
+    """
+    Delete a tournament (its rooms are kept)
+
+    Response:
+    {
+        "success": true,
+        "message": "Tournament deleted successfully"
+    }
+    """
+    try:
+        tournament_id = tournament_id.upper()
+        tournament = tournaments.pop(tournament_id, None)
+
+        if tournament is None:
+            return jsonify({
+                'success': False,
+                'message': 'Tournament not found'
+            }), 404
+
+        for code in list(tournament.rooms):
+            if room_tournaments.get(code) == tournament_id:
+                del room_tournaments[code]
+        room_reads.forget(('tournament', tournament_id))
+
+        return jsonify({
+            'success': True,
+            'message': 'Tournament deleted successfully'
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error deleting tournament: {str(e)}'
+        }), 500
+
+
+@app.route('/api/tournaments/<tournament_id>/rooms', methods=['POST'])
+def add_tournament_room(tournament_id: str):
+    """
+    Add a room to a tournament
+
+    Request body:
+    {
+        "room_code": "GHI789"
+    }
+
+    Response:
+    {
+        "success": true,
+        "data": {
+            "rooms": ["ABC123", "DEF456", "GHI789"]
+        }
+    }
+    """
+    try:
+        tournament = tournaments.get(tournament_id.upper())
+
+        if tournament is None:
+            return jsonify({
+                'success': False,
+                'message': 'Tournament not found'
+            }), 404
+
+        data = request.get_json(silent=True) or {}
+        room_code = str(data.get('room_code', '')).strip().upper()
+
+        if not room_code:
+            return jsonify({
+                'success': False,
+                'message': 'room_code is required'
+            }), 400
+
+        error = attach_room(tournament, room_code)
+        if error is not None:
+            return error
+
+        return jsonify({
+            'success': True,
+            'message': 'Room added to tournament',
+            'data': {'rooms': list(tournament.rooms)}
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error adding room to tournament: {str(e)}'
+        }), 500
+
+
+@app.route('/api/tournaments/<tournament_id>/rooms/<room_code>', methods=['DELETE'])
+def remove_tournament_room(tournament_id: str, room_code: str):
+    """
+    Remove a room (and its players) from a tournament
+
+    Response:
+    {
+        "success": true,
+        "data": {
+            "rooms": ["ABC123"]
+        }
+    }
+    """
+    try:
+        tournament_id = tournament_id.upper()
+        room_code = room_code.upper()
+        tournament = tournaments.get(tournament_id)
+
+        if tournament is None:
+            return jsonify({
+                'success': False,
+                'message': 'Tournament not found'
+            }), 404
+
+        if room_tournaments.get(room_code) != tournament_id:
+            return jsonify({
+                'success': False,
+                'message': 'Room is not part of this tournament'
+            }), 404
+
+        with room_lock(room_code):
+            del room_tournaments[room_code]
+            tournament.remove_room(room_code)
+
+        return jsonify({
+            'success': True,
+            'message': 'Room removed from tournament',
+            'data': {'rooms': list(tournament.rooms)}
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error removing room from tournament: {str(e)}'
+        }), 500
+
+
+@app.route('/api/tournaments/<tournament_id>/leaderboard', methods=['GET'])
+def get_tournament_leaderboard(tournament_id: str):
+    """
+    Get the combined ranking of a tournament
+
+    Query parameters (optional):
+        limit   entries to return (default 10, max 500)
+        offset  entries to skip (default 0)
+
+    Response:
+    {
+        "success": true,
+        "data": {
+            "tournament_id": "1A2B3C4D",
+            "name": "Lomba Antar Kelas",
+            "seq": 812,
+            "total_players": 5000,
+            "entries": [
+                {"rank": 1, "room_code": "ABC123", "player_name": "Player 1", "score": 900}
+            ],
+            "rooms": [
+                {"room_code": "ABC123", "total_score": 12000}
+            ]
+        }
+    }
+
+    Ties share a rank (1, 2, 2, 4).
+    """
+    try:
+        tournament_id = tournament_id.upper()
+        tournament = tournaments.get(tournament_id)
+
+        if tournament is None:
+            return jsonify({
+                'success': False,
+                'message': 'Tournament not found'
+            }), 404
+
+        try:
+            limit = min(500, max(1, int(request.args.get('limit', 10))))
+            offset = max(0, int(request.args.get('offset', 0)))
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'message': 'limit and offset must be integers'
+            }), 400
+
+        # Same board version + same page + same encoding: share one encoded response
+        binary = wire.wants_msgpack()
+        body, status = room_reads.do(
+            ('tournament', tournament_id), f"top:{limit}:{offset}{':msgpack' if binary else ''}", tournament.seq,
+            lambda: encode_payload({'success': True, 'data': tournament.top(limit, offset)}, binary=binary)
+        )
+        return encoded_response(body, status, binary)
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error getting leaderboard: {str(e)}'
+        }), 500
+
+
+@app.route('/api/tournaments/<tournament_id>/rank', methods=['GET'])
+def get_tournament_rank(tournament_id: str):
+    """
+    Get one player's position in the tournament
+
+    Query parameters:
+        room_code, player_name
+
+    Response:
+    {
+        "success": true,
+        "data": {
+            "rank": 17,
+            "room_code": "ABC123",
+            "player_name": "Player 1",
+            "score": 400,
+            "total_players": 5000
+        }
+    }
+    """
+    try:
+        tournament = tournaments.get(tournament_id.upper())
+
+        if tournament is None:
+            return jsonify({
+                'success': False,
+                'message': 'Tournament not found'
+            }), 404
+
+        room_code = request.args.get('room_code', '').strip().upper()
+        player_name = request.args.get('player_name', '').strip()
+
+        if not room_code or not player_name:
+            return jsonify({
+                'success': False,
+                'message': 'room_code and player_name are required'
+            }), 400
+
+        entry = tournament.rank_of(room_code, player_name)
+        if entry is None:
+            return jsonify({
+                'success': False,
+                'message': 'Player not found in this tournament'
+            }), 404
+
+        return jsonify({
+            'success': True,
+            'data': entry
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error getting rank: {str(e)}'
+        }), 500
+
+
+@app.route('/api/tournaments/<tournament_id>/stream', methods=['GET'])
+def stream_tournament(tournament_id: str):
+    """
+    Follow a tournament leaderboard as Server-Sent Events
+
+    Events:
+        board   full leaderboard (first event, and whenever the reader fell
+                too far behind the change feed)
+        delta   one score change: {"seq", "room_code", "player_name", "score", "delta"}
+
+    Every event carries its seq as the event id, so a reconnecting
+    EventSource resumes from Last-Event-ID. Query parameter `limit` sets the
+    size of board events (default 10).
+
+    With `Accept: application/msgpack` the body is instead a sequence of
+    MessagePack maps {"event", "id", "data"} (keepalives are {"event": "ping"});
+    such readers resume with ?since=<last id>.
+
+    Open streams count against the same TTX_ROOM_STREAMS cap as room
+    streams; when it is reached the answer is 503 and clients poll
+    GET /leaderboard instead.
+    """
+    try:
+        tournament_id = tournament_id.upper()
+        tournament = tournaments.get(tournament_id)
+
+        if tournament is None:
+            return jsonify({
+                'success': False,
+                'message': 'Tournament not found'
+            }), 404
+
+        try:
+            limit = min(500, max(1, int(request.args.get('limit', 10))))
+            since = request.headers.get('Last-Event-ID') or request.args.get('since')
+            since = int(since) if since is not None else None
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'message': 'limit and since must be integers'
+            }), 400
+
+        binary = wire.wants_msgpack()
+
+        def event(name: str, seq: int, data: dict):
+            if binary:
+                return wire.packb({'event': name, 'id': seq, 'data': data})
+            return f'id: {seq}\nevent: {name}\ndata: {json.dumps(data)}\n\n'
+
+        def generate():
+            seq = since
+            deadline = time.monotonic() + TOURNAMENT_STREAM_SECONDS
+            yield wire.packb({'event': 'ping'}) if binary else 'retry: 2000\n\n'
+            while time.monotonic() < deadline and tournaments.get(tournament_id) is tournament:
+                changes, complete = ([], False) if seq is None else tournament.changes_since(seq)
+                if not complete:
+                    board = tournament.top(limit)
+                    seq = board['seq']
+                    yield event('board', seq, board)
+                    continue
+                for change in changes:
+                    seq = change['seq']
+                    yield event('delta', seq, change)
+                if not tournament.wait_for_change(seq, 15):
+                    yield wire.packb({'event': 'ping'}) if binary else ': keepalive\n\n'
+
+        # Shares the room streams' cap: every open stream holds a server thread
+        if not room_streams.acquire():
+            return jsonify({
+                'success': False,
+                'message': 'Too many open streams, poll the leaderboard instead'
+            }), 503
+
+        mimetype = wire.MSGPACK_MIMETYPE if binary else 'text/event-stream'
+        response = app.response_class(generate(), mimetype=mimetype, headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no',
+            'Vary': 'Accept'
+        })
+        response.call_on_close(room_streams.release)
+        return response
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error streaming tournament: {str(e)}'
+        }), 500
+
+
+# ==================== CROSSWORD LAYOUT ENDPOINTS ====================
+
+@app.route('/api/rooms/<room_code>/crossword', methods=['POST'])
+def generate_crossword(room_code: str):
+    """
+    Generate (or regenerate) a crossword grid from the room's questions
+
+    Request body (all optional):
+    {
+        "timeout_ms": 250,
+        "max_size": 20,
+        "seed": 0
+    }
+
+    Response:
+    {
+        "success": true,
+        "data": {
+            "width": 8,
+            "height": 11,
+            "grid": ["###J####", ...],
+            "entries": [
+                {"number": 1, "direction": "down", "row": 0, "col": 3,
+                 "length": 7, "question_id": "q1", "question": "Ibu Kota Indonesia"}
+            ],
+            "unplaced": [],
+            "timed_out": false,
+            "elapsed_ms": 12.4
+        }
+    }
+    """
+    try:
+        room_code = room_code.upper()
+
+        if room_code not in rooms:
+            return jsonify({
+                'success': False,
+                'message': 'Room not found'
+            }), 404
+
+        data = request.get_json(silent=True) or {}
+        timeout_ms = int(data.get('timeout_ms', crossword.DEFAULT_TIMEOUT_MS))
+        max_size = data.get('max_size')
+        seed = int(data.get('seed', 0))
+
+        if timeout_ms < 1 or timeout_ms > crossword.MAX_TIMEOUT_MS:
+            return jsonify({
+                'success': False,
+                'message': f'timeout_ms must be between 1 and {crossword.MAX_TIMEOUT_MS}'
+            }), 400
+
+        if max_size is not None:
+            max_size = int(max_size)
+            if max_size < 2 or max_size > crossword.MAX_GRID_SIZE:
+                return jsonify({
+                    'success': False,
+                    'message': f'max_size must be between 2 and {crossword.MAX_GRID_SIZE}'
+                }), 400
+
+        room = rooms[room_code]
+        # Lay out a snapshot; the search itself runs without the room lock
+        with room_lock(room_code):
+            questions = list(room['questions'])
+
+        if not questions:
+            return jsonify({
+                'success': False,
+                'message': 'No questions to lay out'
+            }), 400
+
+        layout = crossword.generate_layout(
+            [q['answer'] for q in questions],
+            timeout_ms=timeout_ms,
+            max_size=max_size,
+            seed=seed
+        )
+
+        # Attach clue info to each placed entry
+        for entry in layout['entries']:
+            q = questions[entry.pop('answer_index')]
+            entry['question_id'] = q['question_id']
+            entry['question'] = q['question']
+        layout['unplaced'] = [questions[i]['question_id'] for i in layout['unplaced']]
+        layout['generated_at'] = datetime.now().isoformat()
+
+        with room_lock(room_code):
+            room['crossword'] = layout
+            touch_room(room)
+
+        return jsonify({
+            'success': True,
+            'message': 'Crossword generated',
+            'data': layout
+        }), 200
+
+    except (TypeError, ValueError):
+        return jsonify({
+            'success': False,
+            'message': 'timeout_ms, max_size and seed must be integers'
+        }), 400
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error generating crossword: {str(e)}'
+        }), 500
+
+
+@app.route('/api/rooms/<room_code>/crossword', methods=['GET'])
+def get_crossword(room_code: str):
+    """
+    Get the last generated crossword layout for a room
+
+    Response:
+    {
+        "success": true,
+        "data": { ...same shape as POST /crossword... }
+    }
+    """
+    try:
+        room_code = room_code.upper()
+
+        if room_code not in rooms:
+            return jsonify({
+                'success': False,
+                'message': 'Room not found'
+            }), 404
+
+        room = rooms[room_code]
+
+        if not room.get('crossword'):
+            return jsonify({
+                'success': False,
+                'message': 'Crossword has not been generated'
+            }), 404
+
+        return jsonify({
+            'success': True,
+            'data': room['crossword']
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error getting crossword: {str(e)}'
+        }), 500
+
+
+# ==================== ADMIN: PROFILING & TRACING ENDPOINTS ====================
+
+@app.route('/api/admin/profile', methods=['POST'])
+def run_profile():
+    """
+    Sample request-handler stacks for N seconds (admin only)
+    
+    Headers:
+        X-Admin-Token: <TTX_ADMIN_TOKEN>
+    
+    Request body (optional):
+    {
+        "seconds": 10,
+        "interval_ms": 5
+    }
+    
+    Response (text/plain, flamegraph collapsed format):
+        wsgi_app (app.py:1);full_dispatch_request (app.py:1);get_room (app.py:150) 42
+        ...
+    """
+    denied = check_admin()
+    if denied:
+        return denied
+    
+    try:
+        data = request.get_json(silent=True) or {}
+        seconds = float(data.get('seconds', 10))
+        interval_ms = float(data.get('interval_ms', 5))
+        
+        if seconds <= 0 or seconds > 60:
+            return jsonify({
+                'success': False,
+                'message': 'seconds must be between 0 and 60'
+            }), 400
+        
+        if interval_ms < 1 or interval_ms > 100:
+            return jsonify({
+                'success': False,
+                'message': 'interval_ms must be between 1 and 100'
+            }), 400
+        
+        stacks, ticks = profiling.sample_request_stacks(seconds, interval_ms / 1000.0)
+        
+        response = app.response_class(profiling.collapsed(stacks), status=200, mimetype='text/plain')
+        response.headers['X-Profile-Ticks'] = str(ticks)
+        response.headers['X-Profile-Samples'] = str(sum(stacks.values()))
+        return response
+    
+    except RuntimeError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 409
+    
+    except (TypeError, ValueError):
+        return jsonify({
+            'success': False,
+            'message': 'seconds and interval_ms must be numbers'
+        }), 400
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error running profile: {str(e)}'
+        }), 500
+
+
+@app.route('/api/admin/tracing', methods=['PUT'])
+def set_tracing():
+    """
+    Switch per-request Server-Timing spans on or off (admin only)
+    
+    Request body:
+    {
+        "enabled": true
+    }
+    
+    Response:
+    {
+        "success": true,
+        "data": {
+            "enabled": true
+        }
+    }
+    """
+    denied = check_admin()
+    if denied:
+        return denied
+    
+    try:
+        data = request.get_json(silent=True)
+        
+        if not data or not isinstance(data.get('enabled'), bool):
+            return jsonify({
+                'success': False,
+                'message': 'enabled (true/false) is required'
+            }), 400
+        
+        if data['enabled']:
+            tracer.enable()
+        else:
+            tracer.disable()
+        
+        return jsonify({
+            'success': True,
+            'message': 'Tracing enabled' if tracer.enabled else 'Tracing disabled',
+            'data': {'enabled': tracer.enabled}
+        }), 200
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error switching tracing: {str(e)}'
+        }), 500
+
+
+@app.route('/api/admin/tracing', methods=['GET'])
+def get_tracing():
+    """
+    Get tracing status and span timings of recent requests (admin only)
+    
+    Response:
+    {
+        "success": true,
+        "data": {
+            "enabled": true,
+            "recent": [
+                {
+                    "method": "GET",
+                    "path": "/api/rooms/ABC123",
+                    "status": 200,
+                    "spans_ms": {"lookup": 0.04, "handler": 0.01, "serialization": 0.2, "write": 0.05},
+                    "total_ms": 0.6
+                }
+            ]
+        }
+    }
+    """
+    denied = check_admin()
+    if denied:
+        return denied
+    
+    try:
+        return jsonify({
+            'success': True,
+            'data': {
+                'enabled': tracer.enabled,
+                'recent': tracer.recent()
+            }
+        }), 200
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error getting traces: {str(e)}'
+        }), 500
+
+
+# ==================== ADMIN: EVENT LOG ENDPOINTS ====================
+
+@app.route('/api/admin/logs', methods=['GET'])
+def get_event_log():
+    """
+    Get recently written access and game-event records (admin only)
+    
+    Query params:
+        limit: number of records, newest first (default 100, max 500)
+        event: only records of this event (e.g. "answer", "request")
+    
+    Response:
+    {
+        "success": true,
+        "data": {
+            "records": [
+                {"ts": 1718000000.123, "event": "award_points", "room": "ABC123",
+                 "player_name": "Player 1", "points_awarded": 100, "total_score": 300}
+            ],
+            "log": {"path": "logs/events.jsonl", "buffered": 0, "written": 5120, "dropped": 0, ...}
+        }
+    }
+    
+    Records reach this list and the log file together, when the background
+    writer drains its buffer (about once a second).
+    """
+    denied = check_admin()
+    if denied:
+        return denied
+    
+    try:
+        try:
+            limit = int(request.args.get('limit', 100))
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'message': 'limit must be an integer'
+            }), 400
+        limit = max(1, min(limit, 500))
+        event = request.args.get('event') or None
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'records': event_log.recent(limit, event),
+                'log': event_log.stats()
+            }
+        }), 200
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error getting event log: {str(e)}'
+        }), 500
+
+
+# ==================== ERROR HANDLERS ====================
+
+@app.errorhandler(404)
+def not_found(error):
+    """Handle 404 errors"""
+    return jsonify({
+        'success': False,
+        'message': 'Endpoint not found'
+    }), 404
+
+
+@app.errorhandler(405)
+def method_not_allowed(error):
+    """Handle 405 errors"""
+    return jsonify({
+        'success': False,
+        'message': 'Method not allowed'
+    }), 405
+
+
+@app.errorhandler(500)
+def internal_error(error):
+    """Handle 500 errors"""
+    return jsonify({
+        'success': False,
+        'message': 'Internal server error'
+    }), 500
+
+
+# ==================== MAIN ====================
+
+if __name__ == '__main__':
+    print("=" * 50)
+    print("TTX (Teka-Teki Extreme) - Backend Server")
+    print("=" * 50)
+    print("\nServer berjalan di: http://localhost:5000")
+    print("CORS enabled for frontend communication")
+    print("\nEndpoints tersedia:")
+    print("  - POST   /api/rooms")
+    print("  - GET    /api/rooms/<code>")
+    print("  - DELETE /api/rooms/<code>")
+    print("  - POST   /api/rooms/<code>/join")
+    print("  - POST   /api/rooms/<code>/leave")
+    print("  - GET    /api/rooms/<code>/participants")
+    print("  - GET    /api/rooms/<code>/status")
+    print("  - POST   /api/rooms/<code>/start")
+    print("  - POST   /api/rooms/<code>/finish")
+    print("  - GET    /api/stats")
+    print("  - GET    /api/health")
+    print("\nDevelopment server only. For production use: python run.py")
+    print("\n" + "=" * 50 + "\n")
+    
+    app.run(
+        host='0.0.0.0',
+        port=5000,
+        debug=True,
+        use_reloader=True
+    )
@@ -0,0 +1,158 @@
+"""
+Columnar, append-only log of answer attempts.
+
+Every judged guess is stored as typed `array`/`bytearray` columns,
+clustered the way a column store clusters data by the keys it is queried
+on: a per-question segment (verdict code, player index, seconds since the
+question was shown) and a per-player segment (verdict code). Player names
+and question ids are interned to small integers on the way in. Only these
+segments are kept; there is no separate time-ordered copy of the rows.
+
+Analytics work on whole segments with C-level operations (`bytes.count`,
+`bytes.translate`/`split`, `compress`, `dict(zip(...))`); the only
+Python-level loops run once per question or per player, never per row.
+"""
+import threading
+from array import array
+from itertools import compress
+from statistics import median
+from typing import Dict, List
+
+from answer_matching import VERDICT_EXACT, VERDICT_NEAR_MISS, VERDICT_WRONG
+
+VERDICT_CODES = {VERDICT_WRONG: 0, VERDICT_NEAR_MISS: 1, VERDICT_EXACT: 2}
+_NEAR_MISS = VERDICT_CODES[VERDICT_NEAR_MISS]
+_EXACT = VERDICT_CODES[VERDICT_EXACT]
+
+# Maps verdict codes to 1 for correct, 0 otherwise
+_CORRECT_MASK = bytes(1 if code == _EXACT else 0 for code in range(256))
+
+# Rows kept per room; later attempts are counted but not stored
+MAX_ATTEMPTS = 500_000
+
+
+class _QuestionSegment:
+    __slots__ = ('verdict', 'player', 'elapsed')
+
+    def __init__(self):
+        self.verdict = bytearray()
+        self.player = array('I')
+        self.elapsed = array('f')
+
+
+class AttemptLog:
+    """Append-only attempt log for one room"""
+
+    def __init__(self, max_attempts: int = MAX_ATTEMPTS):
+        self._lock = threading.Lock()
+        self.max_attempts = max_attempts
+        self.dropped = 0
+
+        self.players: List[str] = []
+        self.questions: List[str] = []
+        self._player_index: Dict[str, int] = {}
+        self._question_index: Dict[str, int] = {}
+
+        # Attempts clustered by question and by player
+        self._by_question: List[_QuestionSegment] = []
+        self._by_player: List[bytearray] = []
+        self.total = 0
+
+    def __len__(self) -> int:
+        return self.total
+
+    def append(self, player_name: str, question_id: str, verdict: str, elapsed: float) -> None:
+        """Record one judged attempt (`elapsed`: seconds since the question was shown)"""
+        code = VERDICT_CODES[verdict]
+        elapsed = max(0.0, elapsed)
+        with self._lock:
+            if self.total >= self.max_attempts:
+                self.dropped += 1
+                return
+
+            pi = self._player_index.get(player_name)
+            if pi is None:
+                pi = self._player_index[player_name] = len(self.players)
+                self.players.append(player_name)
+                self._by_player.append(bytearray())
+            qi = self._question_index.get(question_id)
+            if qi is None:
+                qi = self._question_index[question_id] = len(self.questions)
+                self.questions.append(question_id)
+                self._by_question.append(_QuestionSegment())
+
+            self.total += 1
+            segment = self._by_question[qi]
+            segment.verdict.append(code)
+            segment.player.append(pi)
+            segment.elapsed.append(elapsed)
+            self._by_player[pi].append(code)
+
+    def _snapshot(self):
+        # Segments only ever grow, so copying them under the lock gives a
+        # consistent view the analytics can work on without holding it
+        with self._lock:
+            questions = [(question_id, bytes(s.verdict), s.player[:], s.elapsed[:])
+                         for question_id, s in zip(self.questions, self._by_question)]
+            players = [(player_name, bytes(flags))
+                       for player_name, flags in zip(self.players, self._by_player)]
+            return self.total, self.dropped, questions, players
+
+    def analytics(self, hardest: int = 5, min_attempts: int = 1) -> dict:
+        """
+        Per-question and per-player statistics over the whole log.
+
+        - questions: attempts, correct, near misses, accuracy and the median
+          time-to-correct (first correct attempt of each player)
+        - hardest: the `hardest` questions with the lowest accuracy among
+          those with at least `min_attempts` attempts
+        - players: attempts, correct, current and longest correct streak
+        """
+        total, dropped, questions, players = self._snapshot()
+
+        question_stats = []
+        for question_id, verdicts, player_col, elapsed_col in questions:
+            attempts = len(verdicts)
+            correct_mask = verdicts.translate(_CORRECT_MASK)
+            correct = correct_mask.count(1)
+
+            # First correct attempt per player: the dict is built from the
+            # reversed rows so each player's earliest attempt is written last
+            ttc = None
+            if correct:
+                first = dict(zip(reversed(list(compress(player_col, correct_mask))),
+                                 reversed(list(compress(elapsed_col, correct_mask)))))
+                ttc = round(median(first.values()), 3)
+
+            question_stats.append({
+                'question_id': question_id,
+                'attempts': attempts,
+                'correct': correct,
+                'near_miss': verdicts.count(_NEAR_MISS),
+                'accuracy': round(correct / attempts, 4),
+                'median_time_to_correct': ttc
+            })
+
+        ranked = [s for s in question_stats if s['attempts'] >= max(1, min_attempts)]
+        ranked.sort(key=lambda s: (s['accuracy'], -s['attempts']))
+
+        # A player's streaks are the runs of 1s in their correct mask
+        player_stats = []
+        for player_name, verdicts in players:
+            correct_mask = verdicts.translate(_CORRECT_MASK)
+            runs = correct_mask.split(b'\x00')
+            player_stats.append({
+                'player_name': player_name,
+                'attempts': len(verdicts),
+                'correct': correct_mask.count(1),
+                'current_streak': len(runs[-1]),
+                'longest_streak': max(map(len, runs))
+            })
+
+        return {
+            'attempts': total,
+            'dropped': dropped,
+            'questions': question_stats,
+            'hardest': ranked[:hardest],
+            'players': player_stats
+        }
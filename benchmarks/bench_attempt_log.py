@@ -0,0 +1,58 @@
+"""
+Benchmark answer-attempt analytics on 10k-500k logged attempts.
+
+Usage:
+    python benchmarks/bench_attempt_log.py [--players 200] [--questions 50] [--runs 5]
+
+Attempts are synthetic (fixed seed): each row picks a random player and
+question, a verdict weighted towards wrong guesses and a time offset.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from answer_matching import VERDICT_EXACT, VERDICT_NEAR_MISS, VERDICT_WRONG  # noqa: E402
+from attempt_log import AttemptLog  # noqa: E402
+
+LOG_SIZES = [10_000, 100_000, 500_000]
+VERDICTS = [VERDICT_WRONG] * 6 + [VERDICT_NEAR_MISS] * 1 + [VERDICT_EXACT] * 3
+
+
+def make_log(size: int, players: int, questions: int, seed: int) -> AttemptLog:
+    rng = random.Random(seed)
+    log = AttemptLog(max_attempts=size)
+    for _ in range(size):
+        log.append(f'player{rng.randrange(players)}', f'q{rng.randrange(questions) + 1}',
+                   rng.choice(VERDICTS), rng.uniform(0, 60))
+    return log
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--players', type=int, default=200)
+    parser.add_argument('--questions', type=int, default=50)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'attempts':>9} {'append us/row':>14} {'median ms':>10} {'min ms':>8}")
+    for size in LOG_SIZES:
+        started = time.perf_counter()
+        log = make_log(size, args.players, args.questions, seed=size)
+        append_us = (time.perf_counter() - started) * 1e6 / size
+
+        timings = []
+        for _ in range(args.runs):
+            started = time.perf_counter()
+            log.analytics()
+            timings.append((time.perf_counter() - started) * 1000)
+
+        print(f"{size:>9} {append_us:>14.2f} {statistics.median(timings):>10.1f} {min(timings):>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Benchmark the crossword layout engine on 20-200 word banks.
+
+Usage:
+    python benchmarks/bench_crossword.py [--timeout-ms 250] [--runs 3]
+
+Word banks are synthetic Indonesian-like words built from common syllables,
+generated from a fixed seed so numbers are comparable between commits.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import crossword  # noqa: E402
+
+SYLLABLES = [
+    'ba', 'ka', 'ta', 'ma', 'na', 'ri', 'lu', 'si', 'po', 'ja', 'ra', 'de',
+    'nu', 'ga', 'bu', 'sa', 'pi', 'to', 'la', 'ke', 'an', 'ng', 'wa', 'ya'
+]
+
+BANK_SIZES = [20, 50, 100, 200]
+
+
+def make_bank(size: int, seed: int):
+    rng = random.Random(seed)
+    return [''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 5))).upper()
+            for _ in range(size)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--timeout-ms', type=int, default=crossword.DEFAULT_TIMEOUT_MS)
+    parser.add_argument('--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'words':>6} {'placed':>7} {'grid':>7} {'density':>8} "
+          f"{'cross':>6} {'nodes':>6} {'median ms':>10} {'cached ms':>10}")
+    for size in BANK_SIZES:
+        timings = []
+        layout = None
+        for run in range(args.runs):
+            bank = make_bank(size, seed=run)
+            crossword.clear_cache()
+            started = time.perf_counter()
+            layout = crossword.generate_layout(bank, timeout_ms=args.timeout_ms)
+            timings.append((time.perf_counter() - started) * 1000)
+
+        # Same bank, shuffled: must be served from the cache
+        shuffled = list(bank)
+        random.Random(size).shuffle(shuffled)
+        started = time.perf_counter()
+        crossword.generate_layout(shuffled, timeout_ms=args.timeout_ms)
+        cached_ms = (time.perf_counter() - started) * 1000
+
+        print(f"{size:>6} {layout['placed_count']:>7} "
+              f"{layout['width']:>3}x{layout['height']:<3} {layout['density']:>8.3f} "
+              f"{layout['crossings']:>6} {layout['nodes']:>6} "
+              f"{statistics.median(timings):>10.1f} {cached_ms:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
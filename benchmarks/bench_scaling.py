@@ -0,0 +1,318 @@
+"""
+Measure how each endpoint's latency grows with room size.
+
+Usage:
+    python benchmarks/bench_scaling.py [--sizes 10,100,1000,5000] [--repeat 15]
+                                       [--only get_room,join_leave]
+                                       [--save results.json] [--compare results.json]
+
+Two sweeps run against the real app (Flask test client): participants
+grow with 10 questions, then questions grow with 10 participants. At each
+size a fresh room is built (players joined, questions added, game started
+on the first question) and every endpoint below is timed; the fastest of
+--repeat calls is kept.
+
+Each endpoint's curve is fitted as t = a + b * f(n) for f in 1, log n, n,
+n log n and n^2, and the best fit names its scaling class. A curve that
+grows less than 1.5x across the whole sweep is O(1) whatever fits best,
+since the fixed per-request cost dominates it.
+
+To catch a regression between commits, save a run on the old commit and
+compare on the new one:
+
+    git stash; python benchmarks/bench_scaling.py --save /tmp/before.json; git stash pop
+    python benchmarks/bench_scaling.py --compare /tmp/before.json
+
+The comparison exits with status 1 when any endpoint moved to a worse
+family on either axis (sublinear: O(1), O(log n); linear: O(n),
+O(n log n); quadratic) and is also at least --tolerance times slower at
+the largest size. Neighbouring classes within a family are too close to
+separate from a few noisy points, and the slowdown check keeps a single
+noisy sample from failing the run.
+"""
+import argparse
+import gc
+import json
+import math
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# One process plays every client; keep the per-client read limits out of the way
+os.environ.setdefault('TTX_READ_RATE', '1000000')
+os.environ.setdefault('TTX_READ_BURST', '1000000')
+# Joins come one at a time here; never hold one back for a batch
+os.environ.setdefault('TTX_JOIN_WINDOW_MS', '0')
+
+import app as ttx  # noqa: E402
+
+FIXED = 10  # size of the axis that is not being swept
+CLASSES = [
+    ('O(1)', lambda n: 0.0),
+    ('O(log n)', lambda n: math.log(n)),
+    ('O(n)', lambda n: float(n)),
+    ('O(n log n)', lambda n: n * math.log(n)),
+    ('O(n^2)', lambda n: float(n) * n),
+]
+# Regressions are judged between families, not neighbouring classes: with a
+# handful of noisy points O(n) and O(n log n) are hard to tell apart
+FAMILY = {'O(1)': 0, 'O(log n)': 0, 'O(n)': 1, 'O(n log n)': 1, 'O(n^2)': 2}
+
+
+class Room:
+    """A room of a given size plus the client that talks to it"""
+
+    def __init__(self, client, players: int, questions: int):
+        self.client = client
+        response = self.call('POST', '/api/rooms', json={'name': 'Scaling'})
+        self.code = response.get_json()['data']['code']
+        self.base = f'/api/rooms/{self.code}'
+        self.players = [f'Pemain {i}' for i in range(players)]
+        for name in self.players:
+            self.call('POST', f'{self.base}/join', json={'player_name': name})
+        for i in range(questions):
+            self.call('POST', f'{self.base}/questions', json={
+                'question': f'Soal nomor {i}', 'answer': 'JAKARTA',
+                'helping_letters': [{'position': 0, 'letter': 'J'}]
+            })
+        self.call('POST', f'{self.base}/start')
+        self.call('PUT', f'{self.base}/current-question/q1')
+        self.last_question = f'q{questions}'
+        self.spare = 0
+
+    def call(self, method: str, url: str, **kwargs):
+        response = self.client.open(url, method=method, **kwargs)
+        if response.status_code >= 400:
+            raise RuntimeError(f'{method} {url} -> {response.status_code}: {response.get_data(as_text=True)[:200]}')
+        return response
+
+    def player(self) -> str:
+        """The last player: worst case for list scans"""
+        return self.players[-1]
+
+    def touch(self) -> None:
+        """Bump the room version so the next read is not served from cache"""
+        with ttx.room_lock(self.code):
+            ttx.touch_room(ttx.rooms[self.code])
+
+    def delete(self) -> None:
+        self.call('DELETE', self.base)
+
+
+def bench_get_room(room: Room):
+    room.touch()
+    room.call('GET', room.base)
+
+
+def bench_get_room_cached(room: Room):
+    room.call('GET', room.base)
+
+
+def bench_get_room_msgpack(room: Room):
+    room.touch()
+    room.call('GET', room.base, headers={'Accept': 'application/msgpack'})
+
+
+def bench_poll_unchanged(room: Room):
+    version = ttx.rooms[room.code]['version']
+    room.call('GET', f'{room.base}?player_name={room.player()}', headers={'If-None-Match': f'"v{version}"'})
+
+
+def bench_status(room: Room):
+    room.call('GET', f'{room.base}/status')
+
+
+def bench_participants(room: Room):
+    room.call('GET', f'{room.base}/participants')
+
+
+def bench_scores(room: Room):
+    room.call('GET', f'{room.base}/scores')
+
+
+def bench_current_question(room: Room):
+    room.touch()
+    room.call('GET', f'{room.base}/questions/current')
+
+
+def bench_presence(room: Room):
+    room.call('GET', f'{room.base}/presence')
+
+
+def bench_join_leave(room: Room):
+    name = f'Tamu {room.spare}'
+    room.spare += 1
+    room.call('POST', f'{room.base}/join', json={'player_name': name})
+    room.call('POST', f'{room.base}/leave', json={'player_name': name})
+
+
+def bench_heartbeat(room: Room):
+    room.call('POST', f'{room.base}/heartbeat', json={'player_name': room.player()})
+
+
+def bench_answer(room: Room):
+    room.call('POST', f'{room.base}/answer', json={'player_name': room.player(), 'answer': 'BANDUNG'})
+
+
+def bench_award_points(room: Room):
+    room.call('POST', f'{room.base}/points', json={'player_name': room.player(), 'points': 1})
+
+
+def bench_update_points(room: Room):
+    room.call('PUT', f'{room.base}/update-points', json={'player_name': room.player(), 'points': 5})
+
+
+def bench_set_current(room: Room):
+    room.call('PUT', f'{room.base}/current-question/{room.last_question}')
+
+
+def bench_reveal(room: Room):
+    room.call('PUT', f'{room.base}/questions/{room.last_question}/reveal')
+
+
+def bench_add_delete_question(room: Room):
+    response = room.call('POST', f'{room.base}/questions', json={'question': 'Sementara', 'answer': 'BOGOR'})
+    question_id = response.get_json()['data']['question_id']
+    room.call('DELETE', f'{room.base}/questions/{question_id}')
+
+
+def bench_commands(room: Room):
+    room.call('POST', f'{room.base}/commands', json={'commands': [
+        {'op': 'award_points', 'player_name': room.player(), 'points': 1},
+        {'op': 'set_current_question', 'question_id': room.last_question},
+    ]})
+
+
+BENCHES = {name[len('bench_'):]: fn for name, fn in globals().items() if name.startswith('bench_')}
+
+
+def timed(fn, room: Room, repeat: int) -> float:
+    """
+    Fastest call in microseconds.
+
+    Noise (other processes, the collector) only ever adds time, and the
+    curve's shape is what matters here, so the minimum is the steadiest
+    estimate. The collector is paused while timing.
+    """
+    fn(room)  # warm up caches and the code path
+    samples = []
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fn(room)
+            samples.append((time.perf_counter() - started) * 1e6)
+    finally:
+        gc.enable()
+    return min(samples)
+
+
+def fit(sizes, times):
+    """
+    Scaling class of the best t = a + b*f(n) fit with b >= 0.
+
+    A more complex class must halve the residual of the simpler one to win,
+    so one noisy point at the top of the sweep does not read as quadratic.
+    """
+    if max(times) < 1.5 * min(times):
+        return 'O(1)'
+    best = None
+    for name, f in CLASSES:
+        xs = [f(n) for n in sizes]
+        mean_x = statistics.fmean(xs)
+        mean_t = statistics.fmean(times)
+        var = sum((x - mean_x) ** 2 for x in xs)
+        b = sum((x - mean_x) * (t - mean_t) for x, t in zip(xs, times)) / var if var else 0.0
+        b = max(b, 0.0)
+        a = mean_t - b * mean_x
+        # Relative residuals, so the large sizes do not drown the small ones
+        residual = sum(((a + b * x) - t) ** 2 / t ** 2 for x, t in zip(xs, times))
+        if best is None or residual < best[1] * 0.5:
+            best = (name, residual)
+    return best[0]
+
+
+def sweep(axis: str, sizes, names, repeat: int) -> dict:
+    """{bench: {'times': [...], 'class': ...}} for one axis"""
+    times = {name: [] for name in names}
+    for size in sizes:
+        players, questions = (size, FIXED) if axis == 'participants' else (FIXED, size)
+        started = time.perf_counter()
+        room = Room(ttx.app.test_client(), players, questions)
+        setup = time.perf_counter() - started
+        for name in names:
+            times[name].append(timed(BENCHES[name], room, repeat))
+        room.delete()
+        print(f"  {axis}={size}: room built in {setup:.2f}s", flush=True)
+    return {name: {'times': [round(t, 1) for t in ts], 'class': fit(sizes, ts)} for name, ts in times.items()}
+
+
+def print_axis(axis: str, sizes, results: dict) -> None:
+    print(f"\n{axis} sweep (fastest us per call)")
+    print(f"{'endpoint':22}" + ''.join(f"{n:>10}" for n in sizes) + f"  {'class':>10}")
+    for name, result in results.items():
+        print(f"{name:22}" + ''.join(f"{t:10.1f}" for t in result['times']) + f"  {result['class']:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', default='10,100,1000,5000')
+    parser.add_argument('--repeat', type=int, default=15)
+    parser.add_argument('--only', default='', help='comma-separated endpoint names')
+    parser.add_argument('--save', help='write the results as JSON')
+    parser.add_argument('--compare', help='results JSON from an earlier commit')
+    parser.add_argument('--tolerance', type=float, default=2.0,
+                        help='slowdown at the largest size needed to confirm a worse class')
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(',')]
+    names = [n for n in args.only.split(',') if n] or list(BENCHES)
+    unknown = [n for n in names if n not in BENCHES]
+    if unknown:
+        parser.error(f"unknown endpoint(s): {', '.join(unknown)}; choose from {', '.join(BENCHES)}")
+
+    results = {'sizes': sizes}
+    for axis in ('participants', 'questions'):
+        print(f"sweeping {axis}...", flush=True)
+        results[axis] = sweep(axis, sizes, names, args.repeat)
+        print_axis(axis, sizes, results[axis])
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nsaved to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            before = json.load(f)
+        if before.get('sizes') != sizes:
+            parser.error(f"{args.compare} was measured at sizes {before.get('sizes')}; rerun with the same --sizes")
+        regressions = []
+        print(f"\nscaling classes versus {args.compare}")
+        for axis in ('participants', 'questions'):
+            for name, result in results[axis].items():
+                old = before.get(axis, {}).get(name)
+                if old is None:
+                    continue
+                slowdown = result['times'][-1] / old['times'][-1]
+                marker = ''
+                if FAMILY[result['class']] > FAMILY[old['class']]:
+                    if slowdown >= args.tolerance:
+                        marker = '  REGRESSED'
+                        regressions.append(f'{name} ({axis})')
+                    else:
+                        marker = '  (within noise)'
+                print(f"  {axis:12} {name:22} {old['class']:>10} -> {result['class']:<10} "
+                      f"{slowdown:5.2f}x at n={sizes[-1]}{marker}")
+        if regressions:
+            print(f"\nFAIL: scaling got worse for {', '.join(regressions)}")
+            sys.exit(1)
+        print("\nOK: no endpoint scales worse than before")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark the incremental tournament leaderboard against a full re-sort.
+
+Usage:
+    python benchmarks/bench_tournament.py [--rooms 100] [--players 50] [--updates 20000]
+
+Each update changes one player's score and pushes the room with
+sync_room(), the way touch_room() does after award_points/update_points.
+The baseline rebuilds the ranking from every room's scores, which is what
+a client had to do before tournaments existed.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tournament import Tournament  # noqa: E402
+
+
+def timed(fn, repeat: int) -> float:
+    """Median microseconds per call"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1e6)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rooms', type=int, default=100)
+    parser.add_argument('--players', type=int, default=50)
+    parser.add_argument('--updates', type=int, default=20000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    rooms = {f'R{r:05d}': {f'player{p}': 0 for p in range(args.players)} for r in range(args.rooms)}
+    codes = list(rooms)
+
+    tournament = Tournament('BENCH', 'bench')
+    started = time.perf_counter()
+    for code, scores in rooms.items():
+        tournament.sync_room(code, scores)
+    seed_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    for _ in range(args.updates):
+        code = rng.choice(codes)
+        player = f'player{rng.randrange(args.players)}'
+        rooms[code][player] += rng.randint(1, 100)
+        tournament.sync_room(code, rooms[code])
+    update_us = (time.perf_counter() - started) * 1e6 / args.updates
+
+    def full_sort():
+        board = sorted(((-s, code, p) for code, scores in rooms.items() for p, s in scores.items()))
+        return board[:10]
+
+    code = codes[0]
+    print(f"board: {args.rooms} rooms x {args.players} players = {args.rooms * args.players} entries")
+    print(f"  seed                      {seed_ms:10.1f} ms")
+    print(f"  sync_room after 1 change  {update_us:10.1f} us")
+    print(f"  top 10                    {timed(lambda: tournament.top(10), 200):10.1f} us")
+    print(f"  rank of one player        {timed(lambda: tournament.rank_of(code, 'player1'), 200):10.1f} us")
+    print(f"  baseline full re-sort     {timed(full_sort, 50):10.1f} us")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""
+Compare JSON and MessagePack responses: bytes on the wire and encode time.
+
+Usage:
+    python benchmarks/bench_wire.py [--players 40] [--questions 30] [--board 50]
+
+Payloads are shaped like what the app sends: a full room snapshot
+(GET /api/rooms/<code>, polled by every phone), the current-question view,
+a tournament leaderboard page and one streamed leaderboard delta. Sizes are
+shown raw and gzipped, since a proxy may compress either encoding.
+"""
+import argparse
+import gzip
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask  # noqa: E402
+
+import wire  # noqa: E402
+
+
+def timed(fn, repeat: int) -> float:
+    """Median microseconds per call"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1e6)
+    return statistics.median(samples)
+
+
+def room_snapshot(players: int, questions: int) -> dict:
+    names = [f'Pemain {i}' for i in range(players)]
+    now = datetime.now().isoformat()
+    return {
+        'success': True,
+        'data': {
+            'code': 'ABC123',
+            'name': 'Kelas 7B',
+            'created_at': now,
+            'participants': names,
+            'status': 'playing',
+            'host_id': '0d6f4c1e-2b55-4f0c-9f4a-5d1c7d2f1e11',
+            'questions': [
+                {
+                    'question_id': f'q{i}',
+                    'question': f'Pertanyaan nomor {i} tentang ibu kota',
+                    'answer': 'JAKARTA',
+                    'answer_normalized': 'JAKARTA',
+                    'answer_length': 7,
+                    'helping_letters': [{'position': 0, 'letter': 'J'}],
+                    'status': 'revealed' if i < questions // 2 else 'active',
+                    'revealed_at': now if i < questions // 2 else None,
+                    'shown_at': now,
+                    'media': [],
+                    'created_at': now
+                }
+                for i in range(questions)
+            ],
+            'current_question_id': f'q{questions // 2}',
+            'player_scores': {name: i * 10 for i, name in enumerate(names)},
+            'question_count': questions,
+            'crossword': None,
+            'version': 123456
+        }
+    }
+
+
+def current_question() -> dict:
+    return {
+        'success': True,
+        'data': {
+            'question_id': 'q15',
+            'question': 'Ibu Kota Indonesia',
+            'answer_length': 7,
+            'helping_letters': [{'position': 0, 'letter': 'J'}],
+            'status': 'active',
+            'media': [],
+            'answer': None
+        }
+    }
+
+
+def leaderboard(size: int) -> dict:
+    return {
+        'success': True,
+        'data': {
+            'tournament_id': '1A2B3C4D',
+            'name': 'Lomba Antar Kelas',
+            'seq': 81234,
+            'total_players': 5000,
+            'entries': [
+                {'rank': i + 1, 'room_code': f'R{i % 20:05d}', 'player_name': f'Pemain {i}', 'score': 10000 - i * 7}
+                for i in range(size)
+            ],
+            'rooms': [{'room_code': f'R{i:05d}', 'total_score': 12000 - i} for i in range(20)]
+        }
+    }
+
+
+def delta() -> dict:
+    return {'event': 'delta', 'id': 81235,
+            'data': {'seq': 81235, 'room_code': 'ABC123', 'player_name': 'Pemain 7', 'score': 450, 'delta': 50}}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--players', type=int, default=40)
+    parser.add_argument('--questions', type=int, default=30)
+    parser.add_argument('--board', type=int, default=50)
+    args = parser.parse_args()
+
+    provider = wire.WireJSONProvider(Flask(__name__))
+    payloads = [
+        ('room snapshot', room_snapshot(args.players, args.questions)),
+        ('current question', current_question()),
+        (f'leaderboard top {args.board}', leaderboard(args.board)),
+        ('stream delta', delta()),
+    ]
+
+    print(f"msgpack encoder: {'msgpack package' if wire._msgpack else 'pure Python'}")
+    print(f"{'payload':22} {'json B':>8} {'mpack B':>8} {'saved':>6} {'json gz':>8} {'mpack gz':>8} "
+          f"{'json us':>8} {'mpack us':>8}")
+    for label, payload in payloads:
+        as_json = provider.encode(payload)
+        as_msgpack = provider.encode(payload, binary=True)
+        assert wire.unpackb(as_msgpack) == provider.loads(as_json), label
+        repeat = 200 if len(as_json) > 4096 else 2000
+        print(f"{label:22} {len(as_json):8d} {len(as_msgpack):8d} "
+              f"{1 - len(as_msgpack) / len(as_json):6.0%} "
+              f"{len(gzip.compress(as_json)):8d} {len(gzip.compress(as_msgpack)):8d} "
+              f"{timed(lambda: provider.encode(payload), repeat):8.1f} "
+              f"{timed(lambda: provider.encode(payload, binary=True), repeat):8.1f}")
+
+
+if __name__ == '__main__':
+    main()
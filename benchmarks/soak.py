@@ -0,0 +1,281 @@
+"""
+Soak test: hours of simulated room churn, watching for memory that stays behind.
+
+Usage:
+    python benchmarks/soak.py [--hours 4] [--rooms-per-hour 60] [--concurrent 12]
+                              [--players 20] [--questions 10] [--speed 0]
+                              [--max-bytes-per-room 2048]
+
+Rooms go through a whole game against the real app (Flask test client):
+create, players join, questions are added, played, answered (right, near
+and wrong), revealed, scored, finished, analysed, and the room is deleted.
+Rooms run interleaved, all enrolled in one long-lived tournament, and some
+players drop out without leaving.
+
+Every room step stands for 30 simulated seconds. With --speed 0 (default)
+the simulation runs as fast as it can; --speed 60 paces it at one
+simulated hour per real minute. Time-based behaviour inside the app
+(presence eviction, export expiry) follows the real clock, so a compressed
+run exercises the request paths rather than the timers.
+
+A warm-up batch runs first so caches and interned strings settle. After
+that, tracemalloc and RSS are sampled every --sample-minutes of simulated
+time. The run is played in two halves that each end with every room
+deleted, so whatever Python memory grew over the second half is retained
+per deleted room (the first half lets bounded caches fill). The run exits
+with status 1 when that exceeds --max-bytes-per-room, and lists the
+allocation sites that grew most since the warm-up.
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The harness plays every phone from one process; keep the per-client read
+# limits out of the way
+os.environ.setdefault('TTX_READ_RATE', '1000000')
+os.environ.setdefault('TTX_READ_BURST', '1000000')
+# Joins come one at a time here; never hold one back for a batch
+os.environ.setdefault('TTX_JOIN_WINDOW_MS', '0')
+# Deleted rooms' replay journals are kept on purpose for
+# TTX_JOURNAL_RETENTION_HOURS (about 18 KB per room like these). A
+# compressed run never reaches that window, so the journals would read as
+# retention; expire them at once and measure what outlives them instead
+os.environ.setdefault('TTX_JOURNAL_RETENTION_HOURS', '0')
+
+import app as ttx  # noqa: E402
+from answer_matching import compile_answer  # noqa: E402
+
+STEP_SECONDS = 30
+SYLLABLES = ['ka', 'ra', 'ma', 'ta', 'sa', 'la', 'ba', 'na', 'ja', 'wa', 'gu', 'ni', 'ko', 'pe', 'si']
+DEVICES = 64  # X-Client-Id pool, like a classroom of phones reused across games
+
+
+def rss_bytes() -> int:
+    """Resident set size of this process, 0 where it cannot be read"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return 0
+
+
+def word(rng: random.Random) -> str:
+    return ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).upper()
+
+
+class Churn:
+    """Drives interleaved room lifecycles through the API and counts outcomes"""
+
+    def __init__(self, args, rng: random.Random):
+        self.args = args
+        self.rng = rng
+        self.client = ttx.app.test_client()
+        self.requests = 0
+        self.failures = {}
+        self.games = 0
+        self.created = 0
+        self.deleted = 0
+        self.tournament_id = None
+
+    def call(self, method: str, url: str, device: int = 0, **kwargs):
+        self.requests += 1
+        headers = {'X-Client-Id': f'device-{device % DEVICES}'}
+        response = self.client.open(url, method=method, headers=headers, **kwargs)
+        if response.status_code >= 400:
+            key = f'{method} {url.split("/")[-1]} -> {response.status_code}'
+            self.failures[key] = self.failures.get(key, 0) + 1
+        return response
+
+    def start_tournament(self) -> None:
+        response = self.call('POST', '/api/tournaments', json={'name': 'Soak', 'room_codes': []})
+        if response.status_code < 400:
+            self.tournament_id = response.get_json()['data']['tournament_id']
+
+    def game(self, index: int):
+        """One room from creation to deletion; yields once per simulated step"""
+        rng = self.rng
+        args = self.args
+        response = self.call('POST', '/api/rooms', json={'name': f'Soak {index}'})
+        if response.status_code >= 400:
+            return
+        code = response.get_json()['data']['code']
+        base = f'/api/rooms/{code}'
+        self.created += 1
+        if self.tournament_id:
+            self.call('POST', f'/api/tournaments/{self.tournament_id}/rooms', json={'room_code': code})
+        yield
+
+        players = [f'Pemain {index}-{i}' for i in range(args.players)]
+        devices = {name: rng.randrange(DEVICES) for name in players}
+        for name in players:
+            self.call('POST', f'{base}/join', devices[name], json={'player_name': name})
+        answers = [word(rng) for _ in range(args.questions)]
+        for i, answer in enumerate(answers):
+            self.call('POST', f'{base}/questions', json={
+                'question': f'Soal {i} untuk ruangan {index}',
+                'answer': answer,
+                'helping_letters': [{'position': 0, 'letter': answer[0]}]
+            })
+        yield
+
+        self.call('POST', f'{base}/start')
+        for i, answer in enumerate(answers):
+            if i == 0:
+                self.call('PUT', f'{base}/current-question/q1')
+            else:
+                self.call('POST', f'{base}/questions/next')
+            for name in players:
+                device = devices[name]
+                self.call('GET', f'{base}?player_name={name}', device)
+                self.call('GET', f'{base}/questions/current', device)
+                roll = rng.random()
+                guess = answer if roll < 0.5 else answer[:-1] + 'X' if roll < 0.7 else word(rng)
+                self.call('POST', f'{base}/answer', device, json={'player_name': name, 'answer': guess})
+            yield
+            self.call('PUT', f'{base}/questions/q{i + 1}/reveal')
+            self.call('GET', f'{base}/scores')
+            self.call('GET', f'{base}/status')
+            if self.tournament_id:
+                self.call('GET', f'/api/tournaments/{self.tournament_id}/leaderboard')
+            yield
+
+        self.call('POST', f'{base}/finish')
+        self.call('GET', f'{base}/analytics')
+        # Half the players leave properly; the rest just close the tab
+        for name in players[::2]:
+            self.call('POST', f'{base}/leave', devices[name], json={'player_name': name})
+        yield
+
+        self.call('DELETE', base)
+        self.deleted += 1
+
+    def run(self, rooms: int, on_step=None) -> None:
+        """Play `rooms` games, starting them at the configured rate"""
+        steps_per_room = 3600 / STEP_SECONDS / self.args.rooms_per_hour
+        live = []
+        started = 0
+        step = 0
+        next_start = 0.0
+        while started < rooms or live:
+            while started < rooms and step >= next_start and len(live) < self.args.concurrent:
+                live.append(self.game(self.games))
+                self.games += 1
+                started += 1
+                next_start += steps_per_room
+            for game in list(live):
+                try:
+                    next(game)
+                except StopIteration:
+                    live.remove(game)
+            step += 1
+            if on_step:
+                on_step(step)
+
+
+def collect() -> int:
+    """Traced bytes once garbage is gone and the matcher cache is empty"""
+    # compile_answer() is an LRU cache of up to 4096 matchers that outlive
+    # their rooms by design; empty it so it does not read as retention
+    compile_answer.cache_clear()
+    # Compaction otherwise runs once a minute of real time
+    ttx.room_journals.compact()
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--hours', type=float, default=4, help='simulated hours of churn')
+    parser.add_argument('--rooms-per-hour', type=float, default=60)
+    parser.add_argument('--concurrent', type=int, default=12, help='rooms playing at the same time')
+    parser.add_argument('--players', type=int, default=20)
+    parser.add_argument('--questions', type=int, default=10)
+    parser.add_argument('--warmup', type=int, default=20, help='rooms played before the baseline')
+    parser.add_argument('--speed', type=float, default=0,
+                        help='simulated seconds per real second (0 = unpaced)')
+    parser.add_argument('--sample-minutes', type=float, default=30)
+    parser.add_argument('--max-bytes-per-room', type=int, default=2048)
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    rooms = max(2, int(args.hours * args.rooms_per_hour))
+    churn = Churn(args, random.Random(args.seed))
+    tracemalloc.start()
+    churn.start_tournament()
+
+    print(f"warm-up: {args.warmup} rooms", flush=True)
+    churn.run(args.warmup)
+    baseline_traced = collect()
+    baseline_rss = rss_bytes()
+    baseline = tracemalloc.take_snapshot()
+    deleted_at_baseline = churn.deleted
+
+    sample_every = max(1, int(args.sample_minutes * 60 / STEP_SECONDS))
+    started = time.perf_counter()
+    steps = 0
+    print(f"soak: {rooms} rooms over {args.hours:g} simulated hours, "
+          f"{args.concurrent} at a time, {args.players} players x {args.questions} questions")
+    print(f"{'sim time':>9} {'deleted':>8} {'live':>5} {'requests':>9} {'traced MB':>10} "
+          f"{'growth KB':>10} {'RSS MB':>8}")
+
+    def on_step(_):
+        nonlocal steps
+        steps += 1
+        if args.speed:
+            lag = steps * STEP_SECONDS / args.speed - (time.perf_counter() - started)
+            if lag > 0:
+                time.sleep(lag)
+        if steps % sample_every == 0:
+            traced = collect()
+            print(f"{steps * STEP_SECONDS / 3600:8.2f}h {churn.deleted:8d} {len(ttx.rooms):5d} "
+                  f"{churn.requests:9d} {traced / 1e6:10.2f} {(traced - baseline_traced) / 1024:10.1f} "
+                  f"{rss_bytes() / 1e6:8.1f}", flush=True)
+
+    # Two halves, each drained to zero rooms. Bounded structures (the
+    # tournament change feed, the answer matcher cache, latency windows)
+    # are still filling during the first half, so the verdict is taken on
+    # the second: a real leak keeps growing there, a cache does not.
+    churn.run(rooms // 2, on_step)
+    midpoint_traced = collect()
+    deleted_at_midpoint = churn.deleted
+    churn.run(rooms - rooms // 2, on_step)
+    final_traced = collect()
+    final = tracemalloc.take_snapshot()
+    elapsed = time.perf_counter() - started
+
+    deleted = churn.deleted - deleted_at_baseline
+    growth = final_traced - baseline_traced
+    steady = final_traced - midpoint_traced
+    per_room = steady / max(1, churn.deleted - deleted_at_midpoint)
+    print(f"\n{deleted} rooms deleted, {churn.requests} requests in {elapsed:.1f}s real time; "
+          f"{len(ttx.rooms)} rooms left")
+    print(f"traced growth since warm-up {growth / 1024:.1f} KB ({growth / max(1, deleted):.0f} B per room), "
+          f"second half {steady / 1024:.1f} KB ({per_room:.0f} B per room)")
+    print(f"RSS {baseline_rss / 1e6:.1f} -> {rss_bytes() / 1e6:.1f} MB")
+    if churn.failures:
+        print("failed requests: " + ', '.join(f'{k} x{v}' for k, v in sorted(churn.failures.items())))
+
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+    diffs = [d for d in final.filter_traces(ignore).compare_to(baseline.filter_traces(ignore), 'lineno')
+             if d.size_diff > 0][:args.top]
+    print(f"\ntop {len(diffs)} allocation sites by growth since warm-up:")
+    for diff in diffs:
+        frame = diff.traceback[0]
+        print(f"  {diff.size_diff / 1024:+9.1f} KB {diff.count_diff:+7d} blocks  "
+              f"{os.path.relpath(frame.filename)}:{frame.lineno}")
+
+    if per_room > args.max_bytes_per_room:
+        print(f"\nFAIL: {per_room:.0f} B retained per deleted room (limit {args.max_bytes_per_room})")
+        sys.exit(1)
+    print(f"\nOK: {per_room:.0f} B retained per deleted room (limit {args.max_bytes_per_room})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Single-flight coalescing for room reads.
+
+When a question switches, every participant polls the same room within a
+few milliseconds. Reads are keyed by (room code, view, room version): the
+first request for a key computes and encodes the response, concurrent
+requests for the same key wait for that computation, and later requests for
+the same version reuse the finished buffer. A new room version always
+produces a new key, so no stale data can be served.
+"""
+import threading
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+class _Call:
+    __slots__ = ('event', 'result', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Share one computation between identical concurrent reads"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight: Dict[Tuple[Hashable, Hashable, Hashable], _Call] = {}
+        self._done: Dict[Hashable, Dict[Hashable, Tuple[Hashable, Any]]] = {}
+        self.misses = 0        # computed by this request
+        self.shared = 0        # waited on another request's computation
+        self.hits = 0          # reused a finished result for the same version
+
+    def do(self, group: Hashable, view: Hashable, version: Hashable, fn: Callable[[], Any]) -> Any:
+        """Return fn() for (group, view, version), computing it at most once"""
+        key = (group, view, version)
+        with self._lock:
+            done = self._done.get(group, {}).get(view)
+            if done is not None and done[0] == version:
+                self.hits += 1
+                return done[1]
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._inflight[key] = call
+                self.misses += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+                if call.error is None:
+                    self._done.setdefault(group, {})[view] = (version, call.result)
+            call.event.set()
+        return call.result
+
+    def forget(self, group: Hashable) -> None:
+        """Drop finished results for a group (e.g. a deleted room)"""
+        with self._lock:
+            self._done.pop(group, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.misses + self.shared + self.hits
+            return {
+                'misses': self.misses,
+                'shared_inflight': self.shared,
+                'hits': self.hits,
+                'hit_ratio': round((self.shared + self.hits) / total, 3) if total else 0.0,
+                'cached_rooms': len(self._done)
+            }
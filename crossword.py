@@ -0,0 +1,472 @@
+"""
+Crossword (TTS) layout engine.
+
+Takes the answers of a room's question bank and packs them into a dense,
+interlocking grid with standard clue numbering.
+
+The grid is kept as integer bitsets (one occupancy mask per row and per
+column, plus per-direction ownership masks) so every placement check is a
+handful of AND/OR operations instead of a cell-by-cell scan. The search is a
+depth-first backtracking over placements, choosing the most constrained word
+next (fewest legal placements) and trying the best-scoring placements first.
+It is an anytime search: the best layout found so far is returned when the
+deadline is hit.
+"""
+import math
+import random
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+ACROSS = 'across'
+DOWN = 'down'
+
+# Coordinates are shifted by this offset so bit indexes never go negative
+_ORIGIN = 512
+
+DEFAULT_TIMEOUT_MS = 250
+MAX_TIMEOUT_MS = 2000
+MAX_GRID_SIZE = 100
+
+# Search shape: how many words are examined for the MRV choice at each node,
+# how many placements are tried per word, and how deep branching goes
+# before the rest of a branch is completed greedily.
+_MRV_WINDOW = 8
+_BRANCH_WIDTH = 3
+_BRANCH_DEPTH = 6
+
+_CACHE_SIZE = 128
+
+
+def normalize_grid_word(answer: str) -> str:
+    """Reduce an answer to the A-Z letters that can be written into the grid"""
+    folded = unicodedata.normalize('NFKD', answer)
+    return ''.join(ch for ch in folded.upper() if 'A' <= ch <= 'Z')
+
+
+class _Grid:
+    """Bitset-backed crossword canvas with undoable placements"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.letters: Dict[Tuple[int, int], str] = {}
+        self.row_occ: Dict[int, int] = {}
+        self.col_occ: Dict[int, int] = {}
+        self.row_across: Dict[int, int] = {}
+        self.col_down: Dict[int, int] = {}
+        self.by_letter: Dict[str, List[Tuple[int, int]]] = {}
+        self.bbox: Optional[Tuple[int, int, int, int]] = None  # min_r, min_c, max_r, max_c
+        self.crossings = 0
+
+    # ---------- checks ----------
+
+    def _grown_bbox(self, r0: int, c0: int, r1: int, c1: int):
+        if self.bbox is None:
+            return (r0, c0, r1, c1)
+        min_r, min_c, max_r, max_c = self.bbox
+        return (min(min_r, r0), min(min_c, c0), max(max_r, r1), max(max_c, c1))
+
+    def check(self, word: str, direction: str, r: int, c: int) -> int:
+        """Return the number of crossings if `word` fits at (r, c), else -1"""
+        fit = self._fit(word, direction, r, c)
+        return fit[0] if fit else -1
+
+    def _fit(self, word: str, direction: str, r: int, c: int):
+        """
+        Test a placement; returns (crossings, height, width) or None.
+
+        A legal placement must not extend another word, must not run along
+        an existing word in the same direction, must only touch the grid at
+        crossings with matching letters, and must keep the grid within
+        `max_size` on both axes.
+        """
+        length = len(word)
+        if direction == ACROSS:
+            line, owned = self.row_occ, self.row_across
+            fixed, start = r, c
+            r1, c1 = r, c + length - 1
+        else:
+            line, owned = self.col_occ, self.col_down
+            fixed, start = c, r
+            r1, c1 = r + length - 1, c
+
+        if self.bbox is None:
+            height, width = r1 - r + 1, c1 - c + 1
+        else:
+            min_r, min_c, max_r, max_c = self.bbox
+            height = (max_r if max_r > r1 else r1) - (min_r if min_r < r else r) + 1
+            width = (max_c if max_c > c1 else c1) - (min_c if min_c < c else c) + 1
+        if height > self.max_size or width > self.max_size:
+            return None
+
+        span = ((1 << length) - 1) << start
+        occ = line.get(fixed, 0)
+        if occ & ((1 << (start - 1)) | (1 << (start + length))):
+            return None
+        if owned.get(fixed, 0) & span:
+            return None
+
+        crossed = occ & span
+        if (line.get(fixed - 1, 0) | line.get(fixed + 1, 0)) & (span ^ crossed):
+            return None
+
+        crossings = 0
+        letters = self.letters
+        while crossed:
+            low = crossed & -crossed
+            pos = low.bit_length() - 1
+            cell = (fixed, pos) if direction == ACROSS else (pos, fixed)
+            if letters[cell] != word[pos - start]:
+                return None
+            crossings += 1
+            crossed ^= low
+        return crossings, height, width
+
+    # ---------- mutation ----------
+
+    def place(self, word: str, direction: str, r: int, c: int, crossings: int):
+        """Write a word that passed `check`; returns an undo record"""
+        new_cells = []
+        prev_bbox = self.bbox
+        for i, ch in enumerate(word):
+            cell = (r, c + i) if direction == ACROSS else (r + i, c)
+            if cell not in self.letters:
+                self.letters[cell] = ch
+                self.by_letter.setdefault(ch, []).append(cell)
+                new_cells.append(cell)
+                cr, cc = cell
+                self.row_occ[cr] = self.row_occ.get(cr, 0) | (1 << cc)
+                self.col_occ[cc] = self.col_occ.get(cc, 0) | (1 << cr)
+
+        length = len(word)
+        if direction == ACROSS:
+            self.row_across[r] = self.row_across.get(r, 0) | (((1 << length) - 1) << c)
+            self.bbox = self._grown_bbox(r, c, r, c + length - 1)
+        else:
+            self.col_down[c] = self.col_down.get(c, 0) | (((1 << length) - 1) << r)
+            self.bbox = self._grown_bbox(r, c, r + length - 1, c)
+        self.crossings += crossings
+        return (word, direction, r, c, crossings, new_cells, prev_bbox)
+
+    def undo(self, record):
+        word, direction, r, c, crossings, new_cells, prev_bbox = record
+        length = len(word)
+        if direction == ACROSS:
+            self.row_across[r] &= ~(((1 << length) - 1) << c)
+        else:
+            self.col_down[c] &= ~(((1 << length) - 1) << r)
+        for cell in reversed(new_cells):
+            ch = self.letters.pop(cell)
+            self.by_letter[ch].pop()
+            cr, cc = cell
+            self.row_occ[cr] &= ~(1 << cc)
+            self.col_occ[cc] &= ~(1 << cr)
+        self.bbox = prev_bbox
+        self.crossings -= crossings
+
+    # ---------- candidates ----------
+
+    def area(self) -> int:
+        if self.bbox is None:
+            return 0
+        min_r, min_c, max_r, max_c = self.bbox
+        return (max_r - min_r + 1) * (max_c - min_c + 1)
+
+    def candidates(self, word: str, rng: random.Random) -> List[Tuple[float, str, int, int, int]]:
+        """All legal crossing placements of `word`, best first"""
+        seen = set()
+        found = []
+        for i, ch in enumerate(word):
+            for (r, c) in self.by_letter.get(ch, ()):
+                in_across = (self.row_across.get(r, 0) >> c) & 1
+                in_down = (self.col_down.get(c, 0) >> r) & 1
+                if in_across and in_down:
+                    continue
+                if in_across:
+                    direction, sr, sc = DOWN, r - i, c
+                else:
+                    direction, sr, sc = ACROSS, r, c - i
+                key = (direction, sr, sc)
+                if key in seen:
+                    continue
+                seen.add(key)
+                fit = self._fit(word, direction, sr, sc)
+                if fit is None:
+                    continue
+                crossings, height, width = fit
+                # Prefer many crossings, small and square-ish grids
+                score = (crossings * 10.0
+                         - (height * width) * 0.05
+                         - abs(height - width) * 0.5
+                         + rng.random() * 0.01)
+                found.append((score, direction, sr, sc, crossings))
+        found.sort(reverse=True)
+        return found
+
+
+class _Search:
+    """Anytime backtracking search over word placements"""
+
+    def __init__(self, words: List[str], max_size: int, deadline: float, seed: int):
+        self.words = words
+        self.grid = _Grid(max_size)
+        self.deadline = deadline
+        self.rng = random.Random(seed)
+        self.placements: List[tuple] = []
+        self.best: Optional[tuple] = None
+        self.best_key = None
+        self.nodes = 0
+        self.timed_out = False
+
+    def _record(self):
+        key = (len(self.placements), self.grid.crossings, -self.grid.area())
+        if self.best_key is None or key > self.best_key:
+            self.best_key = key
+            self.best = tuple(self.placements)
+
+    def _expired(self) -> bool:
+        if time.perf_counter() >= self.deadline:
+            self.timed_out = True
+        return self.timed_out
+
+    def run(self) -> None:
+        # Static order: long words first, rare letters break ties
+        freq: Dict[str, int] = {}
+        for w in self.words:
+            for ch in w:
+                freq[ch] = freq.get(ch, 0) + 1
+        order = sorted(range(len(self.words)),
+                       key=lambda i: (-len(self.words[i]),
+                                      sum(freq[ch] for ch in self.words[i]) / len(self.words[i]),
+                                      self.words[i]))
+        if not order:
+            self._record()
+            return
+
+        first = order[0]
+        word = self.words[first]
+        record = self.grid.place(word, ACROSS, _ORIGIN, _ORIGIN, 0)
+        self.placements.append((first, ACROSS, _ORIGIN, _ORIGIN))
+        self._dfs(order[1:], 0)
+        self.placements.pop()
+        self.grid.undo(record)
+
+    def _dfs(self, remaining: List[int], depth: int) -> None:
+        self.nodes += 1
+        if not remaining or self._expired():
+            self._record()
+            return
+        if depth >= _BRANCH_DEPTH:
+            self._complete_greedily(remaining)
+            return
+        self._record()
+
+        # Most-constrained-variable choice inside a window of the static order;
+        # fall back to scanning further when nothing in the window fits.
+        chosen = None
+        chosen_cands = None
+        for start in range(0, len(remaining), _MRV_WINDOW):
+            for idx in remaining[start:start + _MRV_WINDOW]:
+                cands = self.grid.candidates(self.words[idx], self.rng)
+                if not cands:
+                    continue
+                if chosen_cands is None or len(cands) < len(chosen_cands):
+                    chosen, chosen_cands = idx, cands
+                    if len(cands) == 1:
+                        break
+            if chosen is not None:
+                break
+        if chosen is None:
+            return
+
+        rest = [i for i in remaining if i != chosen]
+        word = self.words[chosen]
+        for _, direction, r, c, crossings in chosen_cands[:_BRANCH_WIDTH]:
+            record = self.grid.place(word, direction, r, c, crossings)
+            self.placements.append((chosen, direction, r, c))
+            self._dfs(rest, depth + 1)
+            self.placements.pop()
+            self.grid.undo(record)
+            if self.timed_out:
+                return
+
+    def _complete_greedily(self, remaining: List[int]) -> None:
+        """
+        Finish a branch by placing words in static order at their best spot.
+
+        Words that do not fit yet are deferred and retried after the grid has
+        grown, until a full pass places nothing.
+        """
+        records = []
+        queue = list(remaining)
+        progress = True
+        while queue and progress and not self._expired():
+            progress = False
+            deferred = []
+            for idx in queue:
+                if self.timed_out:
+                    deferred.append(idx)
+                    continue
+                word = self.words[idx]
+                cands = self.grid.candidates(word, self.rng)
+                if not cands:
+                    deferred.append(idx)
+                    continue
+                _, direction, r, c, crossings = cands[0]
+                records.append(self.grid.place(word, direction, r, c, crossings))
+                self.placements.append((idx, direction, r, c))
+                progress = True
+                self._expired()
+            queue = deferred
+        self._record()
+        for record in reversed(records):
+            self.placements.pop()
+            self.grid.undo(record)
+
+
+def _render(words: List[str], placements: tuple) -> dict:
+    """Turn raw placements into a normalized grid with clue numbering"""
+    if not placements:
+        return {'width': 0, 'height': 0, 'grid': [], 'entries': []}
+
+    cells: Dict[Tuple[int, int], str] = {}
+    for idx, direction, r, c in placements:
+        for i, ch in enumerate(words[idx]):
+            cells[(r, c + i) if direction == ACROSS else (r + i, c)] = ch
+    min_r = min(r for r, _ in cells)
+    min_c = min(c for _, c in cells)
+    height = max(r for r, _ in cells) - min_r + 1
+    width = max(c for _, c in cells) - min_c + 1
+
+    rows = [['#'] * width for _ in range(height)]
+    for (r, c), ch in cells.items():
+        rows[r - min_r][c - min_c] = ch
+
+    starts = {}
+    for idx, direction, r, c in placements:
+        starts.setdefault((r - min_r, c - min_c), []).append((idx, direction))
+
+    entries = []
+    number = 0
+    for pos in sorted(starts):
+        number += 1
+        for idx, direction in sorted(starts[pos], key=lambda x: x[1]):
+            entries.append({
+                'number': number,
+                'direction': direction,
+                'row': pos[0],
+                'col': pos[1],
+                'length': len(words[idx]),
+                'word_index': idx
+            })
+
+    return {
+        'width': width,
+        'height': height,
+        'grid': [''.join(row) for row in rows],
+        'entries': entries
+    }
+
+
+def auto_grid_size(words: List[str]) -> int:
+    """Side length that leaves room for a dense layout of `words`"""
+    if not words:
+        return 0
+    letters = sum(len(w) for w in words)
+    side = int(math.ceil(math.sqrt(letters * 2.2)))
+    return min(MAX_GRID_SIZE, max(side, max(len(w) for w in words)))
+
+
+def _solve(words: List[str], timeout_ms: int, max_size: int, seed: int) -> dict:
+    started = time.perf_counter()
+    search = _Search(words, max_size, started + timeout_ms / 1000.0, seed)
+    search.run()
+    layout = _render(words, search.best or ())
+    filled = sum(row.count('#') for row in layout['grid'])
+    total = layout['width'] * layout['height']
+    layout.update({
+        'placed_count': len(search.best or ()),
+        'crossings': search.best_key[1] if search.best_key else 0,
+        'density': round((total - filled) / total, 3) if total else 0.0,
+        'timed_out': search.timed_out,
+        'nodes': search.nodes,
+        'elapsed_ms': round((time.perf_counter() - started) * 1000, 2)
+    })
+    return layout
+
+
+_cache: 'OrderedDict[tuple, dict]' = OrderedDict()
+_cache_lock = threading.Lock()
+cache_stats = {'hits': 0, 'misses': 0}
+
+
+def generate_layout(answers: List[str], timeout_ms: int = DEFAULT_TIMEOUT_MS,
+                    max_size: Optional[int] = None, seed: int = 0,
+                    use_cache: bool = True) -> dict:
+    """
+    Generate a crossword layout for a list of answers.
+
+    Results are cached by the multiset of normalized answers plus the search
+    parameters, so the same bank laid out twice (in any order) is served from
+    memory. `max_size` bounds both grid sides and defaults to a size derived
+    from the bank (see `auto_grid_size`). Entries in the result carry `answer_index`, the position of the
+    answer in the `answers` argument; answers that could not be placed (or
+    that have fewer than two letters) are listed in `unplaced`.
+    """
+    normalized = [normalize_grid_word(a) for a in answers]
+    usable = sorted(i for i, w in enumerate(normalized) if len(w) >= 2)
+    words = sorted(normalized[i] for i in usable)
+    if max_size is None:
+        max_size = auto_grid_size(words)
+    key = (tuple(words), int(timeout_ms), int(max_size), int(seed))
+
+    cached = None
+    hit = False
+    if use_cache:
+        with _cache_lock:
+            cached = _cache.get(key)
+            if cached is not None:
+                hit = True
+                _cache.move_to_end(key)
+                cache_stats['hits'] += 1
+            else:
+                cache_stats['misses'] += 1
+
+    if cached is None:
+        cached = _solve(words, int(timeout_ms), int(max_size), int(seed))
+        if use_cache:
+            with _cache_lock:
+                _cache[key] = cached
+                while len(_cache) > _CACHE_SIZE:
+                    _cache.popitem(last=False)
+
+    # Map sorted-word slots back onto the caller's answer positions
+    slots: Dict[str, List[int]] = {}
+    for i in usable:
+        slots.setdefault(normalized[i], []).append(i)
+    owner = []
+    for w in words:
+        owner.append(slots[w].pop(0))
+
+    placed = set()
+    entries = []
+    for entry in cached['entries']:
+        answer_index = owner[entry['word_index']]
+        placed.add(answer_index)
+        mapped = {k: v for k, v in entry.items() if k != 'word_index'}
+        mapped['answer_index'] = answer_index
+        entries.append(mapped)
+
+    result = {k: v for k, v in cached.items() if k != 'entries'}
+    result['entries'] = entries
+    result['unplaced'] = [i for i in range(len(answers)) if i not in placed]
+    result['cached'] = hit
+    return result
+
+
+def clear_cache() -> None:
+    """Drop all cached layouts"""
+    with _cache_lock:
+        _cache.clear()
@@ -0,0 +1,154 @@
+"""
+Structured event log (JSON lines) that never blocks a request on I/O.
+
+`emit()` is the only call made on the request path. It takes a sequence
+number and appends one tuple to a bounded deque, both under one short
+lock so the buffer always stays in sequence order; there is no formatting
+and no file access. A background thread wakes every
+`flush_interval` seconds (or early, once the buffer is half full), turns
+everything buffered into JSON lines and writes them to disk in one batch,
+rotating the file when it passes `max_bytes`:
+
+    events.jsonl -> events.jsonl.1 -> ... -> events.jsonl.<backups>
+
+If the writer falls behind, the buffer acts as a ring: the oldest records
+are overwritten, and the gap in sequence numbers is counted as dropped
+rather than slowing the game down. The last few written records are kept
+in memory for the admin endpoint.
+"""
+import atexit
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, List, Optional, Tuple
+
+# Buffered records: (seq, unix time, event, fields)
+_Record = Tuple[int, float, str, dict]
+
+
+class EventLog:
+    """Buffered JSON-lines log with a background batch writer"""
+
+    def __init__(self, path: Optional[str], max_bytes: int = 10 * 1024 * 1024, backups: int = 5,
+                 capacity: int = 65536, flush_interval: float = 1.0, keep_recent: int = 500):
+        self.path = path or None
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.flush_interval = flush_interval
+        self._buffer: Deque[_Record] = deque(maxlen=capacity)
+        self._high_water = capacity // 2
+        self._seq = itertools.count()
+        self._emit_lock = threading.Lock()  # seq and append happen together
+        self._wake = threading.Event()
+        self._write_lock = threading.Lock()  # one drain at a time (writer or atexit)
+        self._start_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._recent: Deque[dict] = deque(maxlen=keep_recent)
+        self._file = None
+        self._size = 0
+        self._next_seq = 0
+        self.written = 0
+        self.dropped = 0
+        self.rotations = 0
+        self.errors = 0
+
+    def emit(self, event: str, **fields: Any) -> None:
+        """Record an event; safe to call from any thread, never blocks on I/O"""
+        buffer = self._buffer
+        with self._emit_lock:
+            buffer.append((next(self._seq), time.time(), event, fields))
+        if self._thread is None:
+            self._start()
+        elif len(buffer) >= self._high_water:
+            self._wake.set()
+
+    def _start(self) -> None:
+        # Started on first use, so a forked worker gets its own writer
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='event-log-writer', daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self) -> None:
+        """Write everything buffered so far (the writer thread calls this)"""
+        with self._write_lock:
+            lines: List[str] = []
+            buffer = self._buffer
+            while True:
+                try:
+                    seq, ts, event, fields = buffer.popleft()
+                except IndexError:
+                    break
+                if seq > self._next_seq:
+                    # Overwritten in the ring before the writer got to them
+                    self.dropped += seq - self._next_seq
+                self._next_seq = seq + 1
+                record = {'ts': round(ts, 3), 'event': event}
+                record.update(fields)
+                self._recent.append(record)
+                lines.append(json.dumps(record, ensure_ascii=False, separators=(',', ':'), default=str))
+            if lines:
+                self.written += len(lines)
+                if self.path is not None:
+                    self._write('\n'.join(lines) + '\n')
+
+    def _write(self, text: str) -> None:
+        data = text.encode('utf-8')
+        try:
+            if self._file is None:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                self._file = open(self.path, 'ab')
+                self._size = self._file.tell()
+            self._file.write(data)
+            self._file.flush()
+            self._size += len(data)
+            if self._size >= self.max_bytes:
+                self._rotate()
+        except OSError:
+            # Logging must not take the server down; the records stay in
+            # `recent` and the failure is counted
+            self.errors += 1
+            self._file = None
+
+    def _rotate(self) -> None:
+        self._file.close()
+        self._file = None
+        if self.backups <= 0:
+            os.remove(self.path)
+        else:
+            for i in range(self.backups - 1, 0, -1):
+                older = f'{self.path}.{i}'
+                if os.path.exists(older):
+                    os.replace(older, f'{self.path}.{i + 1}')
+            os.replace(self.path, f'{self.path}.1')
+        self.rotations += 1
+
+    def recent(self, limit: int = 100, event: Optional[str] = None) -> List[dict]:
+        """Most recently written records, newest first"""
+        result = []
+        for record in reversed(list(self._recent)):
+            if event is None or record['event'] == event:
+                result.append(record)
+                if len(result) >= limit:
+                    break
+        return result
+
+    def stats(self) -> dict:
+        return {
+            'path': self.path,
+            'buffered': len(self._buffer),
+            'written': self.written,
+            'dropped': self.dropped,
+            'rotations': self.rotations,
+            'errors': self.errors
+        }
@@ -0,0 +1,356 @@
+"""
+Replay journal: every change to a room, in order, with state checkpoints.
+
+Each finished room operation is appended as (time, op, fields), where the
+fields are the operation's result (e.g. award_points carries the new
+`total_score`), so replaying an entry only sets values and never depends
+on re-running game logic. Answers are journaled too; they change no state
+but show up in the replay timeline.
+
+Entries are stored as typed columns, the way the attempt log is: the time,
+a small code for the op and its field names (shared by every journal),
+and one index per field value into the journal's table of interned values.
+Player names and question ids repeat across entries but are stored once;
+an entry costs a few dozen bytes instead of a tuple and a dict. Closing a
+journal drops its interning dict and replay head, leaving only the columns
+and the value table for the retention period.
+
+Every `checkpoint_every` entries the replayed state is copied as a
+checkpoint. Reconstructing the room at time `t` bisects the timestamps for
+the last entry at or before `t`, starts from the nearest checkpoint below
+it and applies only the entries in between, so a seek costs at most
+`checkpoint_every` steps however long the game ran.
+
+Compaction drops whole journals of deleted rooms once they are older than
+the retention period. Live rooms keep their journal, but entries past
+retention are folded into a checkpoint; seeking before that point is no
+longer possible.
+"""
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, List, Optional, Tuple
+
+CHECKPOINT_EVERY = 256
+
+# Entry kinds: (op, field names) -> code, shared by every journal. Ops
+# record fixed field names, so this stays as small as the set of ops.
+_KINDS: List[Tuple[str, Tuple[str, ...]]] = []
+_KIND_CODES: Dict[Tuple[str, Tuple[str, ...]], int] = {}
+_kinds_lock = threading.Lock()
+
+
+def _kind_code(op: str, keys: Tuple[str, ...]) -> int:
+    code = _KIND_CODES.get((op, keys))
+    if code is None:
+        with _kinds_lock:
+            code = _KIND_CODES.get((op, keys))
+            if code is None:
+                code = _KIND_CODES[(op, keys)] = len(_KINDS)
+                _KINDS.append((op, keys))
+    return code
+
+
+class JournalCompacted(Exception):
+    """The requested time lies before the part of the journal still kept"""
+
+
+def empty_state() -> dict:
+    return {
+        'name': None,
+        'status': 'waiting',
+        'participants': [],
+        'current_question_id': None,
+        'questions': {},  # question_id -> {"question", "answer", "status"}
+        'player_scores': {}
+    }
+
+
+def copy_state(state: dict) -> dict:
+    return {
+        'name': state['name'],
+        'status': state['status'],
+        'participants': list(state['participants']),
+        'current_question_id': state['current_question_id'],
+        'questions': {qid: dict(q) for qid, q in state['questions'].items()},
+        'player_scores': dict(state['player_scores'])
+    }
+
+
+def _join(state: dict, fields: dict) -> None:
+    if fields['player_name'] not in state['participants']:
+        state['participants'].append(fields['player_name'])
+
+
+def _leave(state: dict, fields: dict) -> None:
+    if fields['player_name'] in state['participants']:
+        state['participants'].remove(fields['player_name'])
+
+
+def _remove_participant(state: dict, fields: dict) -> None:
+    _leave(state, fields)
+    state['player_scores'].pop(fields['player_name'], None)
+
+
+def _set_score(state: dict, fields: dict) -> None:
+    state['player_scores'][fields['player_name']] = fields['total_score']
+
+
+def _set_current(state: dict, fields: dict) -> None:
+    state['current_question_id'] = fields.get('current_question_id')
+
+
+def _create_question(state: dict, fields: dict) -> None:
+    state['questions'][fields['question_id']] = {
+        'question': fields['question'],
+        'answer': fields['answer'],
+        'status': 'active'
+    }
+    _set_current(state, fields)
+
+
+def _delete_question(state: dict, fields: dict) -> None:
+    state['questions'].pop(fields['question_id'], None)
+    _set_current(state, fields)
+
+
+def _reveal(state: dict, fields: dict) -> None:
+    question = state['questions'].get(fields['question_id'])
+    if question is not None:
+        question['status'] = 'revealed'
+
+
+def _set_status(state: dict, fields: dict) -> None:
+    state['status'] = fields['status']
+
+
+def _room_created(state: dict, fields: dict) -> None:
+    state['name'] = fields['name']
+
+
+# op -> how it changes the replayed state; other ops (answers) only appear
+# in the timeline
+APPLY = {
+    'room_created': _room_created,
+    'join': _join,
+    'leave': _leave,
+    'evict': _leave,
+    'remove_participant': _remove_participant,
+    'award_points': _set_score,
+    'update_points': _set_score,
+    'start_game': _set_status,
+    'finish_game': _set_status,
+    'set_current_question': _set_current,
+    'clear_current_question': _set_current,
+    'next_question': _set_current,
+    'create_question': _create_question,
+    'delete_question': _delete_question,
+    'reveal': _reveal,
+}
+
+
+def apply(state: dict, op: str, fields: dict) -> None:
+    handler = APPLY.get(op)
+    if handler is not None:
+        handler(state, fields)
+
+
+class Journal:
+    """Append-only change log of one room with periodic state checkpoints"""
+
+    def __init__(self, checkpoint_every: int = CHECKPOINT_EVERY):
+        self.checkpoint_every = max(1, checkpoint_every)
+        self._lock = threading.Lock()
+        self._ts = array('d')      # unix time of each entry, non-decreasing
+        self._kind = array('H')    # _KINDS code: op and field names
+        self._start = array('I')   # where each entry's values begin in _values
+        self._values = array('I')  # field values, as indexes into _names
+        self._names: List[Any] = []  # interned field values
+        self._name_index: Optional[Dict[tuple, int]] = {}  # None once closed
+        self._head: Optional[dict] = empty_state()
+        # _checkpoints[k] is the state before entry _checkpoint_at[k]
+        self._checkpoints: List[dict] = [empty_state()]
+        self._checkpoint_at: List[int] = [0]
+        self.started_at: Optional[float] = None  # time of the first entry ever
+        self.compacted = 0  # entries folded into the first checkpoint
+        self.horizon: Optional[float] = None  # time of the last folded entry
+        self.closed_at: Optional[float] = None  # set when the room is deleted
+
+    def __len__(self) -> int:
+        return len(self._kind)
+
+    def _intern(self, value: Any) -> int:
+        # Keyed with the type so that 1, 1.0 and True stay distinct
+        try:
+            key = (value.__class__, value)
+            code = self._name_index.get(key)
+        except TypeError:  # unhashable: stored as is
+            self._names.append(value)
+            return len(self._names) - 1
+        if code is None:
+            code = self._name_index[key] = len(self._names)
+            self._names.append(value)
+        return code
+
+    def _entry(self, i: int) -> Tuple[str, dict]:
+        op, keys = _KINDS[self._kind[i]]
+        start = self._start[i]
+        names = self._names
+        return op, dict(zip(keys, [names[j] for j in self._values[start:start + len(keys)]]))
+
+    def append(self, op: str, fields: dict, ts: Optional[float] = None) -> None:
+        with self._lock:
+            if self._name_index is None:
+                return  # closed
+            ts = time.time() if ts is None else ts
+            if self._ts and ts < self._ts[-1]:
+                # Entries recorded outside the room lock may race by a hair;
+                # keep the column sorted for bisection
+                ts = self._ts[-1]
+            if self.started_at is None:
+                self.started_at = ts
+            self._ts.append(ts)
+            self._kind.append(_kind_code(op, tuple(fields)))
+            self._start.append(len(self._values))
+            self._values.extend([self._intern(value) for value in fields.values()])
+            apply(self._head, op, fields)
+            if len(self._kind) - self._checkpoint_at[-1] >= self.checkpoint_every:
+                self._checkpoints.append(copy_state(self._head))
+                self._checkpoint_at.append(len(self._kind))
+
+    def close(self, ts: Optional[float] = None) -> None:
+        """No more entries: keep what replay needs, drop what appending needs"""
+        with self._lock:
+            self.closed_at = time.time() if ts is None else ts
+            self._name_index = None
+            self._head = None
+
+    def state_at(self, ts: float, events: int = 10) -> dict:
+        """
+        The room as it was at unix time `ts`, plus the last `events`
+        entries leading up to it. Raises JournalCompacted if `ts` is
+        before the retained part of the journal.
+        """
+        with self._lock:
+            if self.horizon is not None and ts < self.horizon:
+                raise JournalCompacted(f'Journal before {self.horizon:.3f} was compacted')
+            end = bisect_right(self._ts, ts)
+            k = bisect_right(self._checkpoint_at, end) - 1
+            start = self._checkpoint_at[k]
+            state = copy_state(self._checkpoints[k])
+            tail = [self._entry(i) for i in range(start, end)]
+            timeline = []
+            for i in range(max(0, end - events), end):
+                op, fields = self._entry(i)
+                timeline.append(dict(fields, op=op, ts=self._ts[i]))
+
+        for op, fields in tail:
+            apply(state, op, fields)
+        return {
+            'at': ts,
+            'started_at': self.started_at,
+            'applied': self.compacted + end,
+            'replayed': len(tail),
+            'state': state,
+            'events': timeline
+        }
+
+    def compact(self, before: float) -> int:
+        """Fold entries older than `before` into a checkpoint; returns how many"""
+        with self._lock:
+            end = bisect_left(self._ts, before)
+            k = bisect_right(self._checkpoint_at, end) - 1
+            cut = self._checkpoint_at[k]
+            if cut == 0:
+                return 0
+            self.horizon = self._ts[cut - 1]
+            kept = [self._entry(i) for i in range(cut, len(self._kind))]
+            del self._ts[:cut]
+            del self._kind[:cut]
+            # Rebuild the values so those only the folded entries used go too
+            self._start = array('I')
+            self._values = array('I')
+            self._names = []
+            closed = self._name_index is None
+            self._name_index = {}
+            for op, fields in kept:
+                self._start.append(len(self._values))
+                self._values.extend([self._intern(value) for value in fields.values()])
+            if closed:
+                self._name_index = None
+            self._checkpoints = self._checkpoints[k:]
+            self._checkpoint_at = [i - cut for i in self._checkpoint_at[k:]]
+            self.compacted += cut
+            return cut
+
+
+class JournalStore:
+    """Journals of every room, with retention-based compaction"""
+
+    def __init__(self, retention: float, checkpoint_every: int = CHECKPOINT_EVERY,
+                 compact_interval: float = 60.0):
+        self.retention = retention
+        self.checkpoint_every = checkpoint_every
+        self.compact_interval = compact_interval
+        self._lock = threading.Lock()
+        self._journals: Dict[str, Journal] = {}
+        self._next_compaction = time.monotonic() + compact_interval
+        self.dropped_journals = 0
+        self.compacted_entries = 0
+
+    def start(self, key: str) -> Journal:
+        """A fresh journal for a new room (replacing a deleted room's with the same code)"""
+        journal = Journal(self.checkpoint_every)
+        with self._lock:
+            self._journals[key] = journal
+        return journal
+
+    def get(self, key: str) -> Optional[Journal]:
+        return self._journals.get(key)
+
+    def append(self, key: str, op: str, fields: dict) -> None:
+        journal = self._journals.get(key)
+        if journal is not None and journal.closed_at is None:
+            journal.append(op, fields)
+        if time.monotonic() >= self._next_compaction:
+            self.compact()
+
+    def close(self, key: str) -> None:
+        """The room was deleted: keep its journal for replay until retention ends"""
+        journal = self._journals.get(key)
+        if journal is not None:
+            journal.close()
+
+    def compact(self, now: Optional[float] = None) -> dict:
+        """Drop deleted rooms' journals past retention and fold old entries of the rest"""
+        now = time.time() if now is None else now
+        cutoff = now - self.retention
+        dropped = folded = 0
+        with self._lock:
+            self._next_compaction = time.monotonic() + self.compact_interval
+            journals = list(self._journals.items())
+        for key, journal in journals:
+            if journal.closed_at is not None and journal.closed_at < cutoff:
+                with self._lock:
+                    if self._journals.get(key) is journal:
+                        del self._journals[key]
+                        dropped += 1
+            else:
+                folded += journal.compact(cutoff)
+        with self._lock:
+            self.dropped_journals += dropped
+            self.compacted_entries += folded
+        return {'dropped_journals': dropped, 'compacted_entries': folded}
+
+    def stats(self) -> dict:
+        with self._lock:
+            journals = list(self._journals.values())
+            return {
+                'journals': len(journals),
+                'entries': sum(len(j) for j in journals),
+                'retention_hours': round(self.retention / 3600, 2),
+                'checkpoint_every': self.checkpoint_every,
+                'dropped_journals': self.dropped_journals,
+                'compacted_entries': self.compacted_entries
+            }
@@ -0,0 +1,223 @@
+"""
+Content-addressed storage for image and audio clues.
+
+An upload is streamed to disk while it is hashed; the file is then named
+after its SHA-256, so the same picture uploaded to a hundred rooms is
+stored once. Rooms hold references, and a file is deleted when the
+last question using it goes away.
+
+Files are served straight from disk (see the /api/media routes in app.py):
+the WSGI server's file wrapper sends them with sendfile where it can, and
+the content hash doubles as an ETag for immutable caching. Media bytes are
+never held in Python memory, except a thumbnail while it is rendered.
+
+By default the files live in a fresh per-process temporary directory,
+removed again at exit. A configured `root` may be shared or hold files of
+an earlier run; it is never emptied.
+
+Thumbnails are generated with Pillow (in requirements.txt). Without it,
+images are served at full size as their own thumbnail.
+"""
+import atexit
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from typing import BinaryIO, Dict, Optional
+
+try:
+    from PIL import Image
+except ImportError:  # optional; thumbnails fall back to the original
+    Image = None
+
+CHUNK_SIZE = 1024 * 1024
+THUMBNAIL_SIZE = (320, 320)
+
+
+class MediaError(ValueError):
+    """Rejected upload; carries the HTTP status to answer with"""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def sniff_type(head: bytes) -> Optional[str]:
+    """MIME type from the first bytes of a file; None if not an allowed format"""
+    if head.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'image/png'
+    if head.startswith(b'\xff\xd8\xff'):
+        return 'image/jpeg'
+    if head[:6] in (b'GIF87a', b'GIF89a'):
+        return 'image/gif'
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'image/webp'
+    if head[:4] == b'RIFF' and head[8:12] == b'WAVE':
+        return 'audio/wav'
+    if head.startswith(b'ID3') or head[:2] in (b'\xff\xfb', b'\xff\xf3', b'\xff\xf2'):
+        return 'audio/mpeg'
+    if head.startswith(b'OggS'):
+        return 'audio/ogg'
+    if head[4:8] == b'ftyp' and head[8:11] in (b'M4A', b'mp4', b'iso'):
+        return 'audio/mp4'
+    return None
+
+
+def _remove_tree(path: str, owner: int) -> None:
+    # Forked workers inherit the exit hook; only the creating process removes
+    if os.getpid() == owner:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+class MediaStore:
+    """Deduplicated media files on local disk, reference counted by question"""
+
+    def __init__(self, root: Optional[str] = None, max_bytes: int = 10 * 1024 * 1024):
+        if root is None:
+            # Rooms live in memory, so media never outlives the process
+            root = tempfile.mkdtemp(prefix='ttx-media-')
+            atexit.register(_remove_tree, root, os.getpid())
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._refs: Dict[str, int] = {}
+        self._types: Dict[str, str] = {}
+        self.uploads = 0
+        self.deduplicated = 0
+        for sub in ('objects', 'thumbs', 'tmp'):
+            os.makedirs(os.path.join(self.root, sub), exist_ok=True)
+
+    # -------------------- paths --------------------
+
+    def path(self, media_id: str) -> str:
+        return os.path.join(self.root, 'objects', media_id[:2], media_id)
+
+    def thumbnail_path(self, media_id: str) -> str:
+        return os.path.join(self.root, 'thumbs', media_id[:2], media_id + '.jpg')
+
+    @staticmethod
+    def valid_id(media_id: str) -> bool:
+        return len(media_id) == 64 and all(c in '0123456789abcdef' for c in media_id)
+
+    # -------------------- writes --------------------
+
+    def put(self, stream: BinaryIO) -> dict:
+        """
+        Store an upload and take one reference to it.
+
+        Returns {'media_id', 'mime_type', 'kind', 'size', 'thumbnail'}.
+        """
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.join(self.root, 'tmp'))
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                head = b''
+                while True:
+                    chunk = stream.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    if len(head) < 16:
+                        head += chunk[:16]
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        raise MediaError(f'File exceeds {self.max_bytes // (1024 * 1024)} MB', 413)
+                    digest.update(chunk)
+                    out.write(chunk)
+
+            if size == 0:
+                raise MediaError('File is empty')
+            mime_type = sniff_type(head)
+            if mime_type is None:
+                raise MediaError('Unsupported file type (PNG, JPEG, GIF, WebP, MP3, OGG, WAV or M4A)', 415)
+
+            media_id = digest.hexdigest()
+            final_path = self.path(media_id)
+            with self._lock:
+                self.uploads += 1
+                if os.path.exists(final_path):
+                    self.deduplicated += 1
+                    os.unlink(tmp_path)
+                else:
+                    os.makedirs(os.path.dirname(final_path), exist_ok=True)
+                    os.replace(tmp_path, final_path)
+                self._refs[media_id] = self._refs.get(media_id, 0) + 1
+                self._types[media_id] = mime_type
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+        thumbnail = mime_type.startswith('image/') and self._make_thumbnail(media_id)
+        return {
+            'media_id': media_id,
+            'mime_type': mime_type,
+            'kind': mime_type.split('/')[0],
+            'size': size,
+            'thumbnail': bool(thumbnail)
+        }
+
+    def _make_thumbnail(self, media_id: str) -> bool:
+        if Image is None:
+            return False
+        thumb_path = self.thumbnail_path(media_id)
+        if os.path.exists(thumb_path):
+            return True
+        try:
+            with Image.open(self.path(media_id)) as img:
+                img.draft('RGB', THUMBNAIL_SIZE)  # JPEG: decode at reduced scale
+                img.thumbnail(THUMBNAIL_SIZE)
+                if img.mode != 'RGB':
+                    img = img.convert('RGBA')
+                    background = Image.new('RGB', img.size, (255, 255, 255))
+                    background.paste(img, mask=img.getchannel('A'))
+                    img = background
+                os.makedirs(os.path.dirname(thumb_path), exist_ok=True)
+                tmp_path = thumb_path + '.tmp'
+                img.save(tmp_path, 'JPEG', quality=80)
+                os.replace(tmp_path, thumb_path)
+            return True
+        except (OSError, ValueError, Image.DecompressionBombError):
+            return False
+
+    def release(self, media_id: str) -> None:
+        """Drop a reference; the files are deleted with the last one"""
+        with self._lock:
+            count = self._refs.get(media_id, 0) - 1
+            if count > 0:
+                self._refs[media_id] = count
+                return
+            self._refs.pop(media_id, None)
+            self._types.pop(media_id, None)
+            for path in (self.path(media_id), self.thumbnail_path(media_id)):
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+
+    # -------------------- reads --------------------
+
+    def lookup(self, media_id: str, thumbnail: bool = False):
+        """(path, mime_type) of a stored file, or None"""
+        if not self.valid_id(media_id):
+            return None
+        mime_type = self._types.get(media_id)
+        if mime_type is None:
+            return None
+        if thumbnail:
+            thumb_path = self.thumbnail_path(media_id)
+            if os.path.exists(thumb_path):
+                return thumb_path, 'image/jpeg'
+        return self.path(media_id), mime_type
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'files': len(self._refs),
+                'references': sum(self._refs.values()),
+                'uploads': self.uploads,
+                'deduplicated': self.deduplicated,
+                'thumbnails': Image is not None
+            }
@@ -0,0 +1,158 @@
+"""
+Heartbeat-based presence with timing-wheel expiry.
+
+Clients prove they are alive with cheap heartbeats (any request that names
+the player counts). A player is `online` until `away_after` seconds pass
+without a heartbeat, then `away`, and is reported for eviction once
+`evict_after` seconds have passed.
+
+Expiry never scans rooms. Each tracked player has at most one entry in a
+hashed timing wheel at the time its state could next change. Advancing the
+wheel only visits the slots whose time has come. An entry that fires for
+a player who has sent a heartbeat in the meantime is simply re-armed for
+the new deadline.
+"""
+import threading
+import time
+from typing import Dict, Hashable, List, Optional, Set, Tuple
+
+ONLINE = 'online'
+AWAY = 'away'
+
+Key = Tuple[str, str]  # (room_code, player_name)
+
+
+class TimingWheel:
+    """Hashed timing wheel: O(1) schedule, advance touches only due slots"""
+
+    def __init__(self, slots: int = 64, tick: float = 1.0):
+        self.slots = slots
+        self.tick = tick
+        self._wheel: List[Dict[Hashable, float]] = [{} for _ in range(slots)]
+        self._current: Optional[int] = None  # last tick fully processed
+
+    def schedule(self, key: Hashable, deadline: float) -> None:
+        tick = int(deadline // self.tick)
+        if self._current is not None and tick <= self._current:
+            tick = self._current + 1  # never schedule into a slot already passed
+        self._wheel[tick % self.slots][key] = deadline
+
+    def advance(self, now: float) -> List[Hashable]:
+        """Pop every key whose deadline is <= now"""
+        target = int(now // self.tick)
+        if self._current is not None and target < self._current:
+            return []
+
+        # On the first call or after a long gap every slot is due once;
+        # no need to go round twice
+        start = target - self.slots + 1
+        if self._current is not None:
+            start = max(start, self._current + 1)
+        expired = []
+        for tick in range(start, target + 1):
+            slot = self._wheel[tick % self.slots]
+            if not slot:
+                continue
+            # Entries for later rounds stay in the slot
+            due = [key for key, deadline in slot.items() if deadline <= now]
+            for key in due:
+                del slot[key]
+            expired.extend(due)
+        # The current tick is only partly over; look at its slot again next time
+        self._current = target - 1
+        return expired
+
+
+class Presence:
+    """Who is online in each room"""
+
+    def __init__(self, away_after: float = 15.0, evict_after: float = 90.0, tick: float = 1.0):
+        self.away_after = away_after
+        self.evict_after = max(evict_after, away_after)
+        self._lock = threading.Lock()
+        self._wheel = TimingWheel(slots=max(8, int(self.evict_after / tick) + 2), tick=tick)
+        self._last_seen: Dict[Key, float] = {}
+        self._rooms: Dict[str, Dict[str, str]] = {}  # room_code -> {player_name: state}
+        self._evicted: Dict[str, Set[str]] = {}  # room_code -> players dropped for inactivity
+        self._next_due = 0.0
+
+    def heartbeat(self, room_code: str, player_name: str, now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        key = (room_code, player_name)
+        with self._lock:
+            known = key in self._last_seen
+            self._last_seen[key] = now
+            self._rooms.setdefault(room_code, {})[player_name] = ONLINE
+            self._evicted.get(room_code, set()).discard(player_name)
+            if not known:
+                # Existing players already have exactly one wheel entry
+                self._wheel.schedule(key, now + self.away_after)
+
+    def forget(self, room_code: str, player_name: str) -> None:
+        """Stop tracking a player (left or removed); a stale wheel entry is ignored"""
+        with self._lock:
+            self._last_seen.pop((room_code, player_name), None)
+            players = self._rooms.get(room_code)
+            if players is not None:
+                players.pop(player_name, None)
+            self._evicted.get(room_code, set()).discard(player_name)
+
+    def forget_room(self, room_code: str) -> None:
+        with self._lock:
+            self._evicted.pop(room_code, None)
+            for player_name in self._rooms.pop(room_code, {}):
+                self._last_seen.pop((room_code, player_name), None)
+
+    def sweep(self, now: Optional[float] = None) -> List[Key]:
+        """
+        Advance the wheel; mark idle players away and return the players
+        that crossed `evict_after` (they are no longer tracked).
+        """
+        now = time.monotonic() if now is None else now
+        if now < self._next_due:
+            return []
+        evicted = []
+        with self._lock:
+            self._next_due = now + self._wheel.tick
+            for key in self._wheel.advance(now):
+                last_seen = self._last_seen.get(key)
+                if last_seen is None:
+                    continue  # forgotten
+                idle = now - last_seen
+                room_code, player_name = key
+                if idle >= self.evict_after:
+                    del self._last_seen[key]
+                    self._rooms[room_code].pop(player_name, None)
+                    self._evicted.setdefault(room_code, set()).add(player_name)
+                    evicted.append(key)
+                elif idle >= self.away_after:
+                    self._rooms[room_code][player_name] = AWAY
+                    self._wheel.schedule(key, last_seen + self.evict_after)
+                else:
+                    self._wheel.schedule(key, last_seen + self.away_after)
+        return evicted
+
+    def was_evicted(self, room_code: str, player_name: str) -> bool:
+        """True if the player was dropped for inactivity (not kicked, not left)"""
+        with self._lock:
+            return player_name in self._evicted.get(room_code, ())
+
+    def room(self, room_code: str, now: Optional[float] = None) -> dict:
+        """Online/away players of one room"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            players = dict(self._rooms.get(room_code, {}))
+            seen = {p: round(now - self._last_seen[(room_code, p)], 1) for p in players}
+        online = sorted(p for p, state in players.items() if state == ONLINE)
+        away = sorted(p for p, state in players.items() if state == AWAY)
+        return {
+            'online': online,
+            'away': away,
+            'online_count': len(online),
+            'idle_seconds': seen
+        }
+
+    def online_count(self, room_code: Optional[str] = None) -> int:
+        with self._lock:
+            rooms = [self._rooms.get(room_code, {})] if room_code else self._rooms.values()
+            return sum(1 for players in rooms for state in players.values() if state == ONLINE)
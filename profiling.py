@@ -0,0 +1,261 @@
+"""
+On-demand profiling and request tracing.
+
+Both facilities are switched on at runtime from the admin endpoints and
+cost nothing while they are off:
+
+- The sampling profiler is a loop that runs inside the admin request for N
+  seconds, reading `sys._current_frames()` at a fixed interval. Only stacks
+  that pass through Flask's `wsgi_app` (i.e. threads serving a request) are
+  kept, and they are returned in the collapsed format flamegraph tools read.
+
+- Request tracing installs its hooks only while enabled: a WSGI middleware
+  that owns the per-request trace and writes the `Server-Timing` header, a
+  JSON provider that times serialization, and a lookup hook on the room
+  store. Disabling it puts the original objects back.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Dict, List, Tuple
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+_WSGI_CODE = Flask.wsgi_app.__code__
+
+_local = threading.local()
+
+
+# ==================== REQUEST TRACING ====================
+
+class RequestTrace:
+    """Span timings for one request; spans are measured between boundaries"""
+
+    __slots__ = ('start', 'last', 'spans', 'looked_up')
+
+    def __init__(self):
+        self.start = self.last = time.perf_counter()
+        self.spans: List[Tuple[str, float]] = []
+        self.looked_up = False
+
+    def mark(self, name: str) -> None:
+        """Attribute the time since the previous boundary to `name`"""
+        now = time.perf_counter()
+        self.spans.append((name, now - self.last))
+        self.last = now
+
+    def totals(self) -> Dict[str, float]:
+        out: Dict[str, float] = {}
+        for name, dur in self.spans:
+            out[name] = out.get(name, 0.0) + dur
+        return out
+
+    def header(self) -> str:
+        parts = [f'{name};dur={dur * 1000:.3f}' for name, dur in self.totals().items()]
+        parts.append(f'app;dur={(time.perf_counter() - self.start) * 1000:.3f}')
+        return ', '.join(parts)
+
+
+def mark(name: str) -> None:
+    """Record a span boundary on the current request, if it is being traced"""
+    trace = getattr(_local, 'trace', None)
+    if trace is not None:
+        trace.mark(name)
+
+
+def mark_lookup() -> None:
+    """Record the end of the room lookup (first one per request only)"""
+    trace = getattr(_local, 'trace', None)
+    if trace is not None and not trace.looked_up:
+        trace.looked_up = True
+        trace.mark('lookup')
+
+
+class _TimingJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider that records each encode as a `serialization` span.
+
+    Mixed in over the class of the app's own provider (see `_timing_provider`)
+    so its response negotiation keeps working while tracing is on.
+    """
+
+    def dumps(self, obj, **kwargs):
+        trace = getattr(_local, 'trace', None)
+        if trace is None:
+            return super().dumps(obj, **kwargs)
+        trace.mark('handler')
+        try:
+            return super().dumps(obj, **kwargs)
+        finally:
+            trace.mark('serialization')
+
+
+def _timing_provider(app: Flask, provider: DefaultJSONProvider) -> DefaultJSONProvider:
+    """Instance of `provider`'s class with `_TimingJSONProvider.dumps` in front"""
+    base = type(provider)
+    if base is DefaultJSONProvider:
+        return _TimingJSONProvider(app)
+    timing = type('Timing' + base.__name__, (_TimingJSONProvider, base), {})
+    return timing(app)
+
+
+class _TimedBody:
+    """Wrap a WSGI body to time how long the server takes to write it out"""
+
+    def __init__(self, body, trace: RequestTrace, record):
+        self._body = body
+        self._trace = trace
+        self._record = record
+        self._write = 0.0
+
+    def __iter__(self):
+        for chunk in self._body:
+            started = time.perf_counter()
+            yield chunk
+            self._write += time.perf_counter() - started
+
+    def close(self):
+        if hasattr(self._body, 'close'):
+            self._body.close()
+        self._record(self._trace, self._write)
+
+
+class _TracingMiddleware:
+    def __init__(self, wsgi_app, tracer: 'Tracer'):
+        self.wsgi_app = wsgi_app
+        self.tracer = tracer
+
+    def __call__(self, environ, start_response):
+        trace = RequestTrace()
+        info = {'method': environ.get('REQUEST_METHOD'), 'path': environ.get('PATH_INFO')}
+
+        def traced_start_response(status, headers, exc_info=None):
+            info['status'] = int(status.split(' ', 1)[0])
+            headers.append(('Server-Timing', trace.header()))
+            return start_response(status, headers, exc_info)
+
+        _local.trace = trace
+        try:
+            body = self.wsgi_app(environ, traced_start_response)
+        finally:
+            _local.trace = None
+
+        def record(t, write):
+            self.tracer.record(info, t, write)
+
+        return _TimedBody(body, trace, record)
+
+
+def _traced_getitem(self, key):
+    value = dict.__getitem__(self, key)
+    mark_lookup()
+    return value
+
+
+class Tracer:
+    """
+    Switches per-request span tracing on and off for a Flask app.
+
+    `lookup_type` is the dict subclass used as the room store. While tracing
+    is on its `__getitem__` is overridden to mark the end of the lookup span;
+    while off the subclass inherits dict's C implementation untouched.
+    """
+
+    def __init__(self, app: Flask, lookup_type: type, history: int = 200):
+        self.app = app
+        self.lookup_type = lookup_type
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=history)
+        self._original_wsgi = None
+        self._original_json = None
+
+    def enable(self) -> None:
+        with self._lock:
+            if self.enabled:
+                return
+            self._original_wsgi = self.app.wsgi_app
+            self._original_json = self.app.json
+            self.app.json = _timing_provider(self.app, self._original_json)
+            self.app.wsgi_app = _TracingMiddleware(self.app.wsgi_app, self)
+            self.lookup_type.__getitem__ = _traced_getitem
+            self.enabled = True
+
+    def disable(self) -> None:
+        with self._lock:
+            if not self.enabled:
+                return
+            del self.lookup_type.__getitem__
+            self.app.wsgi_app = self._original_wsgi
+            self.app.json = self._original_json
+            self.enabled = False
+
+    def record(self, info: dict, trace: RequestTrace, write: float) -> None:
+        spans = {name: round(dur * 1000, 3) for name, dur in trace.totals().items()}
+        spans['write'] = round(write * 1000, 3)
+        entry = dict(info)
+        entry['spans_ms'] = spans
+        entry['total_ms'] = round((time.perf_counter() - trace.start) * 1000, 3)
+        with self._lock:
+            self._recent.append(entry)
+
+    def recent(self) -> List[dict]:
+        with self._lock:
+            return list(self._recent)
+
+
+# ==================== SAMPLING PROFILER ====================
+
+_profile_lock = threading.Lock()
+
+
+def _label(code, cache: dict) -> str:
+    label = cache.get(code)
+    if label is None:
+        label = f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'
+        cache[code] = label
+    return label
+
+
+def sample_request_stacks(seconds: float, interval: float) -> Tuple[Counter, int]:
+    """
+    Sample the stacks of request-handling threads for `seconds`.
+
+    Returns (collapsed stack -> sample count, number of sampling ticks).
+    Raises RuntimeError if another profile is already running.
+    """
+    if not _profile_lock.acquire(blocking=False):
+        raise RuntimeError('A profile is already running')
+    try:
+        own = threading.get_ident()
+        labels: dict = {}
+        stacks: Counter = Counter()
+        ticks = 0
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            ticks += 1
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                codes = []
+                f = frame
+                while f is not None:
+                    codes.append(f.f_code)
+                    if f.f_code is _WSGI_CODE:
+                        break
+                    f = f.f_back
+                if f is None:
+                    continue  # not inside a request
+                stacks[';'.join(_label(c, labels) for c in reversed(codes))] += 1
+            time.sleep(interval)
+        return stacks, ticks
+    finally:
+        _profile_lock.release()
+
+
+def collapsed(stacks: Counter) -> str:
+    """Render samples in the `frame;frame;frame count` flamegraph format"""
+    return ''.join(f'{stack} {count}\n' for stack, count in stacks.most_common())
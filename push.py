@@ -0,0 +1,174 @@
+"""
+Server push for room snapshots.
+
+`ChangeNotifier` keeps one condition variable per room so a mutation wakes
+only the streams following that room. `StreamSlots` caps how many streams
+may be open at once: every open stream holds a server thread, so the
+server only offers push (see the X-Room-Stream header on GET
+/api/rooms/<code>) while slots are free, and clients poll otherwise.
+
+`BroadcastScheduler` decides when a room change is published at all. A
+burst of awards or joins is merged into at most one published change per
+tick, so every poller and stream refetches once per tick instead of once
+per mutation.
+"""
+import threading
+import time
+from typing import Callable, Dict, Hashable, Optional
+
+
+class ChangeNotifier:
+    """Per-key wakeups for readers waiting on a version to move"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._conditions: Dict[Hashable, threading.Condition] = {}
+
+    def notify(self, key: Hashable) -> None:
+        """Wake the readers of `key`; call after the new version is visible"""
+        condition = self._conditions.get(key)
+        if condition is not None:
+            with condition:
+                condition.notify_all()
+
+    def wait(self, key: Hashable, predicate: Callable[[], bool], timeout: float) -> bool:
+        """Block until predicate() holds or the timeout passes; returns predicate()"""
+        with self._lock:
+            condition = self._conditions.setdefault(key, threading.Condition())
+        with condition:
+            return condition.wait_for(predicate, timeout)
+
+    def forget(self, key: Hashable) -> None:
+        """Drop a key (e.g. a deleted room), waking anyone still waiting on it"""
+        with self._lock:
+            condition = self._conditions.pop(key, None)
+        if condition is not None:
+            with condition:
+                condition.notify_all()
+
+
+class StreamSlots:
+    """Counting limit on concurrently open streams"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.open = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> bool:
+        with self._lock:
+            if self.open >= self.limit:
+                self.rejected += 1
+                return False
+            self.open += 1
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            self.open -= 1
+
+    def available(self) -> bool:
+        return self.open < self.limit
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'open': self.open, 'limit': self.limit, 'rejected': self.rejected}
+
+
+class BroadcastScheduler:
+    """
+    Leading/trailing-edge throttle of published changes, per key.
+
+    `changed(key)` returns True when the caller should publish right away:
+    the change is urgent, or the key has been quiet for a full tick.
+    Otherwise the change is held, and `publish(key)` is called once from
+    the scheduler's thread when the tick ends, covering every change held
+    meanwhile. A tick of 0 publishes every change immediately.
+    """
+
+    def __init__(self, tick: float, publish: Callable[[Hashable], None]):
+        self.tick = tick
+        self._publish = publish
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._last: Dict[Hashable, float] = {}  # key -> last publish time
+        self._due: Dict[Hashable, float] = {}  # key -> when its held changes publish
+        self._thread: Optional[threading.Thread] = None
+        self.changes = 0
+        self.immediate = 0
+        self.deferred = 0
+
+    def changed(self, key: Hashable, urgent: bool = False) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            self.changes += 1
+            if key in self._due:
+                if not urgent:
+                    return False
+                # Published now, so the held changes go out with it
+                del self._due[key]
+            elif not urgent and self.tick > 0 and now - self._last.get(key, float('-inf')) < self.tick:
+                self._due[key] = self._last[key] + self.tick
+                self._start_locked()
+                self._wakeup.notify()
+                return False
+            self._last[key] = now
+            self.immediate += 1
+            return True
+
+    def flush(self, key: Hashable) -> bool:
+        """Take a key's held changes to publish now; False if none were held"""
+        with self._lock:
+            if self._due.pop(key, None) is None:
+                return False
+            self._last[key] = time.monotonic()
+            self.immediate += 1
+            return True
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._due)
+
+    def forget(self, key: Hashable) -> None:
+        with self._lock:
+            self._due.pop(key, None)
+            self._last.pop(key, None)
+
+    def _start_locked(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='broadcast-scheduler', daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                while not self._due:
+                    self._wakeup.wait()
+                key, due = min(self._due.items(), key=lambda item: item[1])
+                delay = due - time.monotonic()
+                if delay > 0:
+                    self._wakeup.wait(delay)
+                    continue
+                del self._due[key]
+                self._last[key] = time.monotonic()
+                self.deferred += 1
+            try:
+                self._publish(key)
+            except Exception:
+                # A failed publish (e.g. the room was deleted meanwhile)
+                # must not stop the other keys' ticks
+                pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            published = self.immediate + self.deferred
+            return {
+                'tick_ms': round(self.tick * 1000, 1),
+                'changes': self.changes,
+                'published': published,
+                'immediate': self.immediate,
+                'deferred': self.deferred,
+                'pending': len(self._due),
+                'changes_per_publish': round(self.changes / published, 2) if published else 0.0
+            }
@@ -0,0 +1,170 @@
+"""
+Inverted index over a room's question bank for the host's question list.
+
+Question text and answers are folded (lowercase, accents stripped) and
+split into terms; each term maps to the set of questions containing it.
+The answer is also indexed as one run-together term, so `newy` finds
+NEW YORK. The vocabulary is kept sorted with `bisect`, so every query term
+is a prefix match: a bounded range of the vocabulary, not a scan of every
+question.
+
+The index also holds each question (by reference) in creation order, and
+the question numbers of each status, so a page of results is sliced
+straight out of it: an empty query costs a bisection plus the page (with
+or without a status filter), and a search costs its matches, never the
+whole bank. The index is updated as questions are added and deleted, and
+status changes go through `set_status` so the per-status lists follow.
+"""
+import re
+import threading
+import unicodedata
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from room_index import InvalidCursor
+
+_TERM = re.compile(r'[a-z0-9]+')
+
+
+def fold(text: str) -> str:
+    """Lowercase with accents stripped"""
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
+
+
+def terms(text: str) -> List[str]:
+    return _TERM.findall(fold(text))
+
+
+def question_number(question_id: str) -> int:
+    """Creation order of a question id ("q12" -> 12)"""
+    try:
+        return int(question_id.lower().lstrip('q'))
+    except ValueError:
+        raise InvalidCursor('Invalid cursor')
+
+
+def _remove(lst: list, item) -> None:
+    i = bisect_left(lst, item)
+    if i < len(lst) and lst[i] == item:
+        del lst[i]
+
+
+class QuestionIndex:
+    """Term -> question postings for one room, with prefix lookup"""
+
+    def __init__(self, questions: Iterable[dict] = ()):
+        self._lock = threading.Lock()
+        self._postings: Dict[str, Set[int]] = {}
+        self._vocabulary: List[str] = []  # sorted keys of _postings
+        self._terms: Dict[int, Tuple[str, ...]] = {}  # question number -> its terms
+        self._questions: Dict[int, dict] = {}  # question number -> the question itself
+        self._numbers: List[int] = []  # sorted keys of _questions
+        self._status: Dict[int, str] = {}  # question number -> status it is filed under
+        self._by_status: Dict[str, List[int]] = {}  # status -> sorted question numbers
+        for question in questions:
+            self.add(question)
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    @staticmethod
+    def _question_terms(question: dict) -> Tuple[str, ...]:
+        words = terms(question.get('question', '')) + terms(question.get('answer', ''))
+        whole = ''.join(terms(question.get('answer', '')))
+        if whole:
+            words.append(whole)
+        return tuple(dict.fromkeys(words))
+
+    def add(self, question: dict) -> None:
+        number = question_number(question['question_id'])
+        words = self._question_terms(question)
+        with self._lock:
+            if number in self._terms:
+                self._remove_locked(number)
+            self._terms[number] = words
+            self._questions[number] = question
+            insort(self._numbers, number)
+            self._status[number] = question['status']
+            insort(self._by_status.setdefault(question['status'], []), number)
+            for word in words:
+                posting = self._postings.get(word)
+                if posting is None:
+                    posting = self._postings[word] = set()
+                    insort(self._vocabulary, word)
+                posting.add(number)
+
+    def remove(self, question_id: str) -> None:
+        number = question_number(question_id)
+        with self._lock:
+            self._remove_locked(number)
+
+    def _remove_locked(self, number: int) -> None:
+        if self._questions.pop(number, None) is not None:
+            _remove(self._numbers, number)
+            _remove(self._by_status[self._status.pop(number)], number)
+        for word in self._terms.pop(number, ()):
+            posting = self._postings[word]
+            posting.discard(number)
+            if not posting:
+                del self._postings[word]
+                _remove(self._vocabulary, word)
+
+    def set_status(self, question: dict, status: str) -> None:
+        """Change a question's status and refile it under the new one"""
+        number = question_number(question['question_id'])
+        with self._lock:
+            question['status'] = status
+            old = self._status.get(number)
+            if old is not None and old != status:
+                _remove(self._by_status[old], number)
+                insort(self._by_status.setdefault(status, []), number)
+                self._status[number] = status
+
+    def _prefix_matches(self, prefix: str) -> Set[int]:
+        lo = bisect_left(self._vocabulary, prefix)
+        hi = bisect_left(self._vocabulary, prefix + '\uffff')
+        if hi - lo == 1:
+            return self._postings[self._vocabulary[lo]]
+        matched: Set[int] = set()
+        for word in self._vocabulary[lo:hi]:
+            matched.update(self._postings[word])
+        return matched
+
+    def _match_locked(self, query: str) -> Optional[List[int]]:
+        """Sorted numbers matching every term of `query`; None for an empty query"""
+        wanted = list(dict.fromkeys(terms(query)))
+        if not wanted:
+            return None
+        # Longest terms first: they usually have the fewest matches
+        wanted.sort(key=len, reverse=True)
+        result: Optional[Set[int]] = None
+        for word in wanted:
+            matched = self._prefix_matches(word)
+            result = set(matched) if result is None else result & matched
+            if not result:
+                return []
+        return sorted(result)
+
+    def search(self, query: str = '', status: Optional[str] = None, after: Optional[int] = None,
+               limit: int = 20) -> Tuple[List[dict], int, bool]:
+        """
+        One page of questions matching every term of `query` as a prefix,
+        in creation order, after question number `after`.
+
+        Returns (page, total, more): `total` counts every match and `more`
+        tells whether questions follow the page. An empty query matches
+        every question.
+        """
+        with self._lock:
+            numbers = self._match_locked(query)
+            if status is not None:
+                if numbers is None:
+                    numbers = self._by_status.get(status, [])
+                else:
+                    numbers = [n for n in numbers if self._status[n] == status]
+            elif numbers is None:
+                numbers = self._numbers
+            start = 0 if after is None else bisect_right(numbers, after)
+            page = [self._questions[n] for n in numbers[start:start + limit]]
+            return page, len(numbers), start + limit < len(numbers)
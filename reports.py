@@ -0,0 +1,327 @@
+"""
+Post-game result sheets (CSV, XLSX, PDF) rendered off the request path.
+
+`ExportJobs` owns a small process pool. A job is submitted with a plain-dict
+snapshot of the room taken under the room lock; the worker process renders
+the file straight into the cache directory, so the web process never holds
+the rendered bytes. Finished files are kept for a TTL and swept
+opportunistically whenever jobs are submitted or looked up.
+
+All three formats are written with the standard library only: XLSX is a
+zip of SpreadsheetML parts with inline strings, PDF is a minimal document
+set in the built-in Courier font so table columns line up.
+"""
+import csv
+import io
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+import uuid
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+from xml.sax.saxutils import escape
+
+FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx'),
+    'pdf': ('application/pdf', 'pdf'),
+}
+
+STATUS_QUEUED = 'queued'
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+
+
+# ==================== TABLES ====================
+
+def report_tables(snapshot: dict) -> List[tuple]:
+    """Return [(title, header, rows), ...] for a room snapshot"""
+    scores = [
+        (rank, p['player_name'], p['score'], p['attempts'], p['correct'], p['longest_streak'])
+        for rank, p in enumerate(snapshot['players'], start=1)
+    ]
+    questions = [
+        (i, q['question_id'], q['question'], q['answer'], q['status'], q['attempts'],
+         '' if q['accuracy'] is None else f"{q['accuracy'] * 100:.1f}%",
+         '' if q['median_time_to_correct'] is None else q['median_time_to_correct'])
+        for i, q in enumerate(snapshot['questions'], start=1)
+    ]
+    return [
+        ('Scores', ('Rank', 'Player', 'Score', 'Attempts', 'Correct', 'Longest streak'), scores),
+        ('Questions', ('#', 'Question ID', 'Question', 'Answer', 'Status', 'Attempts',
+                       'Accuracy', 'Median time to correct (s)'), questions),
+    ]
+
+
+def _title(snapshot: dict) -> str:
+    return f"TTX - {snapshot['name']} ({snapshot['code']})"
+
+
+# ==================== RENDERERS ====================
+
+def render_csv(snapshot: dict) -> bytes:
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow([_title(snapshot)])
+    writer.writerow(['Generated at', snapshot['generated_at']])
+    for title, header, rows in report_tables(snapshot):
+        writer.writerow([])
+        writer.writerow([title])
+        writer.writerow(header)
+        writer.writerows(rows)
+    # BOM so Excel opens the UTF-8 file with the right encoding
+    return out.getvalue().encode('utf-8-sig')
+
+
+def _column_name(index: int) -> str:
+    name = ''
+    index += 1
+    while index:
+        index, rem = divmod(index - 1, 26)
+        name = chr(65 + rem) + name
+    return name
+
+
+def _sheet_xml(header: tuple, rows: List[tuple]) -> str:
+    lines = []
+    for r, row in enumerate([header] + list(rows), start=1):
+        cells = []
+        for c, value in enumerate(row):
+            ref = f'{_column_name(c)}{r}'
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                cells.append(f'<c r="{ref}"><v>{value}</v></c>')
+            else:
+                cells.append(f'<c r="{ref}" t="inlineStr"><is><t>{escape(str(value))}</t></is></c>')
+        lines.append(f'<row r="{r}">{"".join(cells)}</row>')
+    return ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+            f'<sheetData>{"".join(lines)}</sheetData></worksheet>')
+
+
+def render_xlsx(snapshot: dict) -> bytes:
+    tables = report_tables(snapshot)
+    ns = 'http://schemas.openxmlformats.org/'
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, 'w', zipfile.ZIP_DEFLATED) as z:
+        z.writestr('[Content_Types].xml',
+                   '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                   f'<Types xmlns="{ns}package/2006/content-types">'
+                   '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+                   '<Default Extension="xml" ContentType="application/xml"/>'
+                   '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+                   + ''.join(f'<Override PartName="/xl/worksheets/sheet{i}.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+                             for i in range(1, len(tables) + 1))
+                   + '</Types>')
+        z.writestr('_rels/.rels',
+                   '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                   f'<Relationships xmlns="{ns}package/2006/relationships">'
+                   f'<Relationship Id="rId1" Type="{ns}officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+                   '</Relationships>')
+        z.writestr('xl/workbook.xml',
+                   '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                   f'<workbook xmlns="{ns}spreadsheetml/2006/main" xmlns:r="{ns}officeDocument/2006/relationships"><sheets>'
+                   + ''.join(f'<sheet name="{escape(title)}" sheetId="{i}" r:id="rId{i}"/>'
+                             for i, (title, _, _) in enumerate(tables, start=1))
+                   + '</sheets></workbook>')
+        z.writestr('xl/_rels/workbook.xml.rels',
+                   '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                   f'<Relationships xmlns="{ns}package/2006/relationships">'
+                   + ''.join(f'<Relationship Id="rId{i}" Type="{ns}officeDocument/2006/relationships/worksheet" Target="worksheets/sheet{i}.xml"/>'
+                             for i in range(1, len(tables) + 1))
+                   + '</Relationships>')
+        for i, (_, header, rows) in enumerate(tables, start=1):
+            z.writestr(f'xl/worksheets/sheet{i}.xml', _sheet_xml(header, rows))
+    return out.getvalue()
+
+
+_PDF_LINES_PER_PAGE = 60
+_PDF_LINE_WIDTH = 96  # characters of 9pt Courier that fit an A4 page
+
+
+def _pdf_text(text: str) -> str:
+    # Built-in fonts only cover Latin-1
+    text = text.encode('latin-1', 'replace').decode('latin-1')
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def _pdf_lines(snapshot: dict) -> List[str]:
+    lines = [_title(snapshot), f"Generated at {snapshot['generated_at']}", '']
+    for title, header, rows in report_tables(snapshot):
+        widths = [max(len(str(v)) for v in col) for col in zip(header, *rows)] if rows else \
+            [len(h) for h in header]
+        widths = [min(w, 40) for w in widths]
+        lines.append(title)
+        for row in [header] + list(rows):
+            line = '  '.join(str(v)[:w].ljust(w) for v, w in zip(row, widths))
+            lines.append(line[:_PDF_LINE_WIDTH].rstrip())
+        lines.append('')
+    return lines
+
+
+def render_pdf(snapshot: dict) -> bytes:
+    lines = _pdf_lines(snapshot)
+    pages = [lines[i:i + _PDF_LINES_PER_PAGE] for i in range(0, len(lines), _PDF_LINES_PER_PAGE)] or [[]]
+
+    # Objects: 1 catalog, 2 page tree, 3 font, then (page, content) per page
+    objects: Dict[int, bytes] = {
+        1: b'<< /Type /Catalog /Pages 2 0 R >>',
+        3: b'<< /Type /Font /Subtype /Type1 /BaseFont /Courier /Encoding /WinAnsiEncoding >>',
+    }
+    kids = []
+    for n, page in enumerate(pages):
+        page_id, content_id = 4 + 2 * n, 5 + 2 * n
+        kids.append(f'{page_id} 0 R')
+        stream = ['BT', '/F1 9 Tf', '11 TL', '36 806 Td']
+        stream += [f'({_pdf_text(line)}) Tj T*' for line in page]
+        stream.append('ET')
+        data = '\n'.join(stream).encode('latin-1')
+        objects[page_id] = (f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] '
+                            f'/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>').encode()
+        objects[content_id] = b'<< /Length %d >>\nstream\n' % len(data) + data + b'\nendstream'
+    objects[2] = f'<< /Type /Pages /Kids [{" ".join(kids)}] /Count {len(pages)} >>'.encode()
+
+    out = io.BytesIO()
+    out.write(b'%PDF-1.4\n')
+    offsets = {}
+    for obj_id in sorted(objects):
+        offsets[obj_id] = out.tell()
+        out.write(b'%d 0 obj\n' % obj_id + objects[obj_id] + b'\nendobj\n')
+    xref = out.tell()
+    count = max(objects) + 1
+    out.write(b'xref\n0 %d\n0000000000 65535 f \n' % count)
+    for obj_id in range(1, count):
+        out.write(b'%010d 00000 n \n' % offsets[obj_id])
+    out.write(b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (count, xref))
+    return out.getvalue()
+
+
+RENDERERS = {'csv': render_csv, 'xlsx': render_xlsx, 'pdf': render_pdf}
+
+
+def render_to_file(snapshot: dict, fmt: str, path: str) -> int:
+    """Render a report into `path` (atomically); runs in a worker process"""
+    data = RENDERERS[fmt](snapshot)
+    tmp = f'{path}.part'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+    return len(data)
+
+
+# ==================== JOBS ====================
+
+class ExportJobs:
+    """Export jobs, their process pool and the on-disk cache of finished files"""
+
+    def __init__(self, cache_dir: Optional[str] = None, ttl: int = 3600, workers: int = 2):
+        self.cache_dir = cache_dir or os.path.join(tempfile.gettempdir(), 'ttx-exports')
+        self.ttl = ttl
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._jobs: Dict[str, dict] = {}
+        self._by_key: Dict[tuple, str] = {}
+        self._last_sweep = 0.0
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self._sweep_dir()
+            # spawn, not fork: forking a threaded server process can copy
+            # held locks into the child
+            self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                             mp_context=multiprocessing.get_context('spawn'))
+        return self._pool
+
+    def submit(self, room_code: str, version: int, fmt: str, snapshot: dict) -> dict:
+        """Queue a render; an identical request for the same room version reuses its job"""
+        self.sweep()
+        key = (room_code, version, fmt)
+        with self._lock:
+            job_id = self._by_key.get(key)
+            if job_id is not None and self._jobs[job_id]['status'] != STATUS_FAILED:
+                return self.public(self._jobs[job_id])
+
+            job_id = uuid.uuid4().hex
+            mimetype, ext = FORMATS[fmt]
+            job = {
+                'job_id': job_id,
+                'room_code': room_code,
+                'room_version': version,
+                'format': fmt,
+                'status': STATUS_QUEUED,
+                'created_at': time.time(),
+                'finished_at': None,
+                'size': None,
+                'error': None,
+                'path': os.path.join(self.cache_dir, f'{job_id}.{ext}'),
+                'mimetype': mimetype,
+                'filename': f"ttx-{room_code}-results.{ext}",
+                '_key': key,
+            }
+            self._jobs[job_id] = job
+            self._by_key[key] = job_id
+            future = self._executor().submit(render_to_file, snapshot, fmt, job['path'])
+
+        future.add_done_callback(lambda f: self._finish(job, f))
+        return self.public(job)
+
+    def _finish(self, job: dict, future) -> None:
+        with self._lock:
+            job['finished_at'] = time.time()
+            try:
+                job['size'] = future.result()
+                job['status'] = STATUS_DONE
+            except Exception as e:
+                job['status'] = STATUS_FAILED
+                job['error'] = str(e) or e.__class__.__name__
+
+    def get(self, job_id: str) -> Optional[dict]:
+        self.sweep()
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    @staticmethod
+    def public(job: dict) -> dict:
+        """Job fields safe to return to clients"""
+        return {k: v for k, v in job.items() if k not in ('path', '_key')}
+
+    def sweep(self, force: bool = False) -> None:
+        """Forget finished jobs older than the TTL and delete their files"""
+        now = time.time()
+        if not force and now - self._last_sweep < 60:
+            return
+        self._last_sweep = now
+        expired = []
+        with self._lock:
+            for job_id, job in list(self._jobs.items()):
+                if job['finished_at'] is not None and now - job['finished_at'] > self.ttl:
+                    expired.append(job['path'])
+                    del self._jobs[job_id]
+                    if self._by_key.get(job['_key']) == job_id:
+                        del self._by_key[job['_key']]
+        for path in expired:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _sweep_dir(self) -> None:
+        # Files left behind by an earlier process are not tracked as jobs
+        now = time.time()
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            try:
+                if now - os.path.getmtime(path) > self.ttl:
+                    os.remove(path)
+            except OSError:
+                pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            statuses = [job['status'] for job in self._jobs.values()]
+        return {status: statuses.count(status) for status in (STATUS_QUEUED, STATUS_DONE, STATUS_FAILED)}
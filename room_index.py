@@ -0,0 +1,165 @@
+"""
+Secondary indexes over the room store for listing and dashboard queries.
+
+Rooms are ordered by (created_at, code). The index keeps that order for all
+rooms and separately for each status, plus a list sorted by lowercased name
+for prefix search and running totals for the statistics endpoint. All
+lists are kept sorted with `bisect`, so a page of results is a bounded walk
+from the cursor position instead of a scan of every room.
+
+`update()` is cheap when nothing indexed changed, which lets the app call
+it after every mutation.
+"""
+import base64
+import json
+import threading
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, List, Optional, Tuple
+
+Key = Tuple[str, str]  # (created_at, code)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(key: Key) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Key:
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, code = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return str(created_at), str(code)
+    except (ValueError, TypeError):
+        raise InvalidCursor('Invalid cursor')
+
+
+class _Entry:
+    __slots__ = ('key', 'name', 'status', 'participants')
+
+    def __init__(self, key: Key, name: str, status: str, participants: int):
+        self.key = key
+        self.name = name
+        self.status = status
+        self.participants = participants
+
+
+def _remove(lst: list, item) -> None:
+    i = bisect_left(lst, item)
+    if i < len(lst) and lst[i] == item:
+        del lst[i]
+
+
+class RoomIndex:
+    """Sorted secondary indexes and totals, kept in step with the room store"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[str, _Entry] = {}
+        self._all: List[Key] = []
+        self._by_status: Dict[str, List[Key]] = {}
+        self._by_name: List[Tuple[str, str, str]] = []  # (name lower, created_at, code)
+        self.total_participants = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, room: dict) -> None:
+        key = (room['created_at'], room['code'])
+        entry = _Entry(key, room['name'].lower(), room['status'], len(room['participants']))
+        with self._lock:
+            self._entries[room['code']] = entry
+            insort(self._all, key)
+            insort(self._by_status.setdefault(entry.status, []), key)
+            insort(self._by_name, (entry.name, key[0], key[1]))
+            self.total_participants += entry.participants
+
+    def update(self, room: dict) -> None:
+        """Re-index a room's status and participant count if they changed"""
+        status = room['status']
+        participants = len(room['participants'])
+        entry = self._entries.get(room['code'])
+        if entry is None or (entry.status == status and entry.participants == participants):
+            return
+        with self._lock:
+            if entry.status != status:
+                _remove(self._by_status[entry.status], entry.key)
+                insort(self._by_status.setdefault(status, []), entry.key)
+                entry.status = status
+            self.total_participants += participants - entry.participants
+            entry.participants = participants
+
+    def remove(self, code: str) -> None:
+        with self._lock:
+            entry = self._entries.pop(code, None)
+            if entry is None:
+                return
+            _remove(self._all, entry.key)
+            _remove(self._by_status[entry.status], entry.key)
+            _remove(self._by_name, (entry.name, entry.key[0], entry.key[1]))
+            self.total_participants -= entry.participants
+
+    def status_counts(self) -> Dict[str, int]:
+        with self._lock:
+            return {status: len(keys) for status, keys in self._by_status.items() if keys}
+
+    def query(self, status: Optional[str] = None, created_from: Optional[str] = None,
+              created_to: Optional[str] = None, name_prefix: Optional[str] = None,
+              min_participants: Optional[int] = None, max_participants: Optional[int] = None,
+              cursor: Optional[str] = None, limit: int = 50, descending: bool = True
+              ) -> Tuple[List[str], Optional[str]]:
+        """
+        Room codes matching all filters, one page at a time.
+
+        Results are ordered by (created_at, code), newest first unless
+        `descending` is False. Returns (codes, next_cursor); next_cursor is
+        None on the last page.
+        """
+        after = decode_cursor(cursor) if cursor else None
+        prefix = name_prefix.lower() if name_prefix else None
+
+        with self._lock:
+            # Drive the walk from the narrowest ordered index available
+            ordered = self._by_status.get(status, []) if status else self._all
+            lo = bisect_left(ordered, (created_from,)) if created_from else 0
+            hi = bisect_right(ordered, (created_to + '\uffff',)) if created_to else len(ordered)
+
+            if prefix is not None:
+                p_lo = bisect_left(self._by_name, (prefix,))
+                p_hi = bisect_left(self._by_name, (prefix + '\uffff',))
+                if p_hi - p_lo < hi - lo:
+                    ordered = sorted((created_at, code) for _, created_at, code in self._by_name[p_lo:p_hi])
+                    lo, hi = 0, len(ordered)
+                    if created_from:
+                        lo = bisect_left(ordered, (created_from,))
+                    if created_to:
+                        hi = bisect_right(ordered, (created_to + '\uffff',))
+
+            if after is not None:
+                if descending:
+                    hi = min(hi, bisect_left(ordered, after))
+                else:
+                    lo = max(lo, bisect_right(ordered, after))
+
+            indices = range(hi - 1, lo - 1, -1) if descending else range(lo, hi)
+            codes: List[str] = []
+            last: Optional[Key] = None
+            for i in indices:
+                key = ordered[i]
+                entry = self._entries[key[1]]
+                if status and entry.status != status:
+                    continue
+                if prefix is not None and not entry.name.startswith(prefix):
+                    continue
+                if min_participants is not None and entry.participants < min_participants:
+                    continue
+                if max_participants is not None and entry.participants > max_participants:
+                    continue
+                if len(codes) == limit:
+                    # There is at least one more match: hand out a cursor
+                    return codes, encode_cursor(last)
+                codes.append(key[1])
+                last = key
+            return codes, None
@@ -0,0 +1,215 @@
+"""
+Room membership under join storms.
+
+When a class is told the room code, a few hundred phones join within
+seconds. Three pieces keep that cheap:
+
+- Roster: the room's participants as an insertion-ordered dict, so
+  membership checks, joins and leaves are O(1) instead of list scans.
+  It encodes as a plain array (see wire.WireJSONProvider.default), so
+  clients see the same `participants` list as before.
+- JoinBatcher: group commit for joins. A join that arrives while the
+  room's previous join batch is still being applied waits for it (at most
+  `window` seconds), and everything that piled up meanwhile is applied in
+  one state change (one version bump, so one broadcast to pollers and
+  streams). A join with nothing in flight ahead of it is applied at once,
+  so back-to-back sequential joins never wait.
+- WaitList: when a room is at capacity, joiners queue in arrival order
+  and are admitted first-come first-served as seats free up. Entries that
+  stop checking in are skipped, so ghosts do not hold the line. Positions
+  come from arrival numbers, so a check-in is a bisection, not a walk of
+  the queue.
+"""
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional
+
+
+class Roster:
+    """Insertion-ordered set of player names with list-like mutators"""
+
+    __slots__ = ('_names',)
+
+    def __init__(self, names: Iterable[str] = ()):
+        self._names: Dict[str, None] = dict.fromkeys(names)
+
+    def __contains__(self, name) -> bool:
+        return name in self._names
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._names)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Roster):
+            return list(self._names) == list(other._names)
+        if isinstance(other, list):
+            return list(self._names) == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f'Roster({list(self._names)!r})'
+
+    def append(self, name: str) -> None:
+        self._names[name] = None
+
+    def remove(self, name: str) -> None:
+        """Remove a name; ValueError if absent, like list.remove"""
+        try:
+            del self._names[name]
+        except KeyError:
+            raise ValueError(f'{name!r} not in roster') from None
+
+
+class WaitList:
+    """First-come first-served queue of players waiting for a seat"""
+
+    def __init__(self, stale_after: float = 90.0):
+        self.stale_after = stale_after
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[str, float]' = OrderedDict()  # name -> last check-in
+        self._arrival: Dict[str, int] = {}  # name -> arrival number
+        self._queued: List[int] = []  # arrival numbers still queued, ascending
+        self._next_arrival = 0
+        self.admitted = 0
+        self.expired = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._entries
+
+    def enqueue(self, name: str) -> int:
+        """Queue a player (or refresh their check-in); returns their 1-based position"""
+        with self._lock:
+            if name not in self._arrival:
+                self._arrival[name] = self._next_arrival
+                self._queued.append(self._next_arrival)
+                self._next_arrival += 1
+            self._entries[name] = time.monotonic()
+            return self._position(name)
+
+    def position(self, name: str) -> Optional[int]:
+        """1-based position of a queued player (checking them in), or None"""
+        with self._lock:
+            if name not in self._entries:
+                return None
+            self._entries[name] = time.monotonic()
+            return self._position(name)
+
+    def _position(self, name: str) -> int:
+        return bisect_left(self._queued, self._arrival[name]) + 1
+
+    def _forget(self, name: str) -> None:
+        arrival = self._arrival.pop(name)
+        del self._queued[bisect_left(self._queued, arrival)]
+
+    def names(self) -> List[str]:
+        with self._lock:
+            return list(self._entries)
+
+    def discard(self, name: str) -> None:
+        with self._lock:
+            if self._entries.pop(name, None) is not None:
+                self._forget(name)
+
+    def pop(self, count: int) -> List[str]:
+        """Up to `count` players from the head, skipping stale entries"""
+        cutoff = time.monotonic() - self.stale_after
+        admitted: List[str] = []
+        with self._lock:
+            while self._entries and len(admitted) < count:
+                name, seen = self._entries.popitem(last=False)
+                self._forget(name)
+                if seen < cutoff:
+                    self.expired += 1
+                    continue
+                admitted.append(name)
+            self.admitted += len(admitted)
+        return admitted
+
+
+class _Batch:
+    __slots__ = ('items', 'results', 'error', 'done')
+
+    def __init__(self):
+        self.items: List[Any] = []
+        self.results: List[Any] = []
+        self.error: Optional[BaseException] = None
+        self.done = threading.Event()
+
+
+class JoinBatcher:
+    """Group commit: concurrent submissions for one key share one flush"""
+
+    def __init__(self, window: float = 0.05):
+        self.window = window
+        self._lock = threading.Lock()
+        self._open: Dict[Hashable, _Batch] = {}
+        self._flushing: Dict[Hashable, _Batch] = {}
+        self.submitted = 0
+        self.batches = 0
+        self.largest = 0
+
+    def submit(self, key: Hashable, item: Any, flush: Callable[[List[Any]], List[Any]]) -> Any:
+        """
+        Add `item` to the key's open batch and return its result.
+
+        `flush(items)` runs once per batch, in the thread that opened it,
+        and returns one result per item (in order).
+        """
+        with self._lock:
+            self.submitted += 1
+            batch = self._open.get(key)
+            leader = batch is None
+            if leader:
+                batch = self._open[key] = _Batch()
+                ahead = self._flushing.get(key)
+            index = len(batch.items)
+            batch.items.append(item)
+
+        if not leader:
+            batch.done.wait()
+            if batch.error is not None:
+                raise batch.error
+            return batch.results[index]
+
+        if ahead is not None and self.window > 0:
+            # Joins are arriving faster than they are applied: the ones that
+            # come in while the previous batch finishes go in with this one
+            ahead.done.wait(self.window)
+        with self._lock:
+            del self._open[key]
+            self._flushing[key] = batch
+            self.batches += 1
+            self.largest = max(self.largest, len(batch.items))
+        try:
+            batch.results = flush(batch.items)
+        except BaseException as e:
+            batch.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._flushing.get(key) is batch:
+                    del self._flushing[key]
+            batch.done.set()
+        return batch.results[index]
+
+    def forget(self, key: Hashable) -> None:
+        with self._lock:
+            self._flushing.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'window_ms': round(self.window * 1000, 1),
+                'joins': self.submitted,
+                'batches': self.batches,
+                'largest_batch': self.largest,
+                'joins_per_batch': round(self.submitted / self.batches, 2) if self.batches else 0.0
+            }
@@ -0,0 +1,175 @@
+"""
+Production entry point for the TTX backend.
+
+    python run.py
+
+Picks a production WSGI server (Gunicorn on Linux/macOS, Waitress on
+Windows), sizes it from the machine, and prints the resulting configuration
+before serving. Every setting can be overridden with an environment
+variable:
+
+    PORT / TTX_PORT         port to listen on (default 5000)
+    TTX_HOST                interface to bind (default 0.0.0.0)
+    TTX_SERVER              force "gunicorn" or "waitress"
+    TTX_WORKERS             worker processes (default 1, see below)
+    TTX_THREADS             threads per worker (default: from CPU count)
+    TTX_KEEPALIVE           keep-alive seconds (default 5)
+    TTX_BACKLOG             listen backlog (default 2048)
+    TTX_GRACEFUL_TIMEOUT    seconds to drain requests on SIGTERM (default 30)
+
+Rooms live in process memory (see app.py), so every request for a room must
+reach the same process. The launcher therefore runs a single worker process
+and scales with threads; raising TTX_WORKERS above 1 only makes sense once
+room state moves to a shared store.
+"""
+import os
+import signal
+import sys
+import threading
+
+DEFAULT_PORT = 5000
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    if value is None or value.strip() == '':
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        sys.exit(f'{name} must be an integer, got {value!r}')
+
+
+def build_config() -> dict:
+    """Resolve the server configuration from the machine and environment"""
+    cpus = os.cpu_count() or 1
+    # Handlers are short and mostly wait on the network (polling clients),
+    # so several threads per core keep the single process busy.
+    default_threads = max(8, min(64, cpus * 8))
+
+    server = os.environ.get('TTX_SERVER', '').strip().lower()
+    if not server:
+        server = 'waitress' if os.name == 'nt' else 'gunicorn'
+
+    # Waitress is a single-process server
+    workers = 1 if server == 'waitress' else max(1, _env_int('TTX_WORKERS', 1))
+
+    return {
+        'server': server,
+        'host': os.environ.get('TTX_HOST', '0.0.0.0'),
+        'port': _env_int('TTX_PORT', _env_int('PORT', DEFAULT_PORT)),
+        'cpus': cpus,
+        'workers': workers,
+        'threads': max(1, _env_int('TTX_THREADS', default_threads)),
+        'keepalive': max(0, _env_int('TTX_KEEPALIVE', 5)),
+        'backlog': max(64, _env_int('TTX_BACKLOG', 2048)),
+        'graceful_timeout': max(1, _env_int('TTX_GRACEFUL_TIMEOUT', 30)),
+    }
+
+
+def print_summary(config: dict) -> None:
+    print("=" * 50)
+    print("TTX (Teka-Teki Extreme) - Production Server")
+    print("=" * 50)
+    print(f"  Server           : {config['server']}")
+    print(f"  Listening on     : http://{config['host']}:{config['port']}")
+    print(f"  CPUs detected    : {config['cpus']}")
+    print(f"  Workers          : {config['workers']}")
+    print(f"  Threads/worker   : {config['threads']}")
+    print(f"  Keep-alive       : {config['keepalive']}s")
+    print(f"  Backlog          : {config['backlog']}")
+    print(f"  Graceful drain   : {config['graceful_timeout']}s on SIGTERM")
+    if config['workers'] > 1:
+        print("  WARNING: rooms are kept in process memory; with more than one")
+        print("           worker, players of the same room may hit different processes.")
+    print("=" * 50 + "\n", flush=True)
+
+
+def run_gunicorn(config: dict) -> None:
+    from gunicorn.app.base import BaseApplication
+
+    class TTXApplication(BaseApplication):
+        def __init__(self, options: dict):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from app import app
+            return app
+
+    # Gunicorn already treats SIGTERM as a graceful shutdown: workers stop
+    # accepting and finish in-flight requests within graceful_timeout.
+    TTXApplication({
+        'bind': f"{config['host']}:{config['port']}",
+        'workers': config['workers'],
+        'worker_class': 'gthread',
+        'threads': config['threads'],
+        'preload_app': True,
+        'keepalive': config['keepalive'],
+        'backlog': config['backlog'],
+        'graceful_timeout': config['graceful_timeout'],
+        'timeout': 60,
+        'accesslog': '-',
+        'errorlog': '-',
+    }).run()
+
+
+def run_waitress(config: dict) -> None:
+    from waitress.server import create_server
+    from app import app
+
+    server = create_server(
+        app,
+        host=config['host'],
+        port=config['port'],
+        threads=config['threads'],
+        backlog=config['backlog'],
+        channel_timeout=max(config['keepalive'], 30),
+    )
+
+    def drain(signum, frame):
+        # Stop accepting new connections, then give in-flight requests
+        # up to graceful_timeout seconds before the process exits.
+        print(f"\nSignal {signum} received, draining connections...", flush=True)
+
+        def stop():
+            server.task_dispatcher.shutdown(timeout=config['graceful_timeout'])
+            server.close()
+
+        threading.Thread(target=stop, daemon=True).start()
+        server.accepting = False
+
+    signal.signal(signal.SIGTERM, drain)
+    signal.signal(signal.SIGINT, drain)
+    try:
+        server.run()
+    except (OSError, ValueError):
+        # asyncore raises when the listening socket is closed under it
+        pass
+
+
+def main() -> None:
+    config = build_config()
+
+    runners = {'gunicorn': run_gunicorn, 'waitress': run_waitress}
+    if config['server'] not in runners:
+        sys.exit(f"TTX_SERVER must be one of {', '.join(runners)}, got {config['server']!r}")
+
+    try:
+        __import__(config['server'])
+    except ImportError:
+        sys.exit(f"{config['server']} is not installed. Run: pip install -r requirements.txt")
+
+    # app.py sizes its read admission limit from the thread count
+    os.environ['TTX_THREADS'] = str(config['threads'])
+
+    print_summary(config)
+    runners[config['server']](config)
+
+
+if __name__ == '__main__':
+    main()
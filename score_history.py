@@ -0,0 +1,177 @@
+"""
+Append-only score history per room, with downsampling for charts.
+
+Every score change is stored as one point (wall-clock time, total after
+the change) in a per-player pair of typed `array` columns, so a session
+with thousands of awards costs 16 bytes per change and no per-point
+Python objects. Player names are interned to small integers on the way in.
+
+Charts rarely need every point: `series()` reduces each player's history
+to at most `points` points with either
+
+- LTTB (largest triangle three buckets): keeps the points that shape the
+  curve, good for line charts, or
+- bucketed max: splits the time range into equal buckets and keeps each
+  bucket's highest score, good for bar or step charts.
+
+Both keep each player's last point, so the current total is always shown.
+"""
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+
+MODES = ('lttb', 'max')
+
+# Points kept per room; later changes are counted but not stored
+MAX_POINTS = 500_000
+
+
+class _Series:
+    __slots__ = ('ts', 'score')
+
+    def __init__(self):
+        self.ts = array('d')       # unix time of the change
+        self.score = array('q')    # total score after the change
+
+
+def lttb(ts, values, threshold: int) -> Tuple[List[float], List[int]]:
+    """Largest-triangle-three-buckets downsampling to `threshold` (at least 3) points"""
+    n = len(ts)
+    threshold = max(3, threshold)
+    if threshold >= n:
+        return list(ts), list(values)
+
+    out_t = [ts[0]]
+    out_v = [values[0]]
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        # Average of the next bucket is the third triangle corner
+        next_start = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        span = next_end - next_start
+        avg_t = sum(ts[next_start:next_end]) / span
+        avg_v = sum(values[next_start:next_end]) / span
+
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        at, av = ts[a], values[a]
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((at - avg_t) * (values[j] - av) - (at - ts[j]) * (avg_v - av))
+            if area > best_area:
+                best, best_area = j, area
+        out_t.append(ts[best])
+        out_v.append(values[best])
+        a = best
+
+    out_t.append(ts[n - 1])
+    out_v.append(values[n - 1])
+    return out_t, out_v
+
+
+def bucket_max(ts, values, buckets: int) -> Tuple[List[float], List[int]]:
+    """Highest score per equal-width time bucket, plus the last point (at least 3 in all)"""
+    n = len(ts)
+    buckets = max(3, buckets)
+    if buckets >= n:
+        return list(ts), list(values)
+
+    start, width = ts[0], (ts[n - 1] - ts[0]) / (buckets - 1)
+    if width <= 0:
+        return [ts[n - 1]], [values[n - 1]]
+    out_t: List[float] = []
+    out_v: List[int] = []
+    current = -1
+    for t, v in zip(ts, values):
+        bucket = min(int((t - start) / width), buckets - 2)
+        if bucket != current:
+            out_t.append(t)
+            out_v.append(v)
+            current = bucket
+        elif v > out_v[-1]:
+            out_t[-1] = t
+            out_v[-1] = v
+    if out_t[-1] != ts[n - 1]:
+        out_t.append(ts[n - 1])
+        out_v.append(values[n - 1])
+    return out_t, out_v
+
+
+class ScoreHistory:
+    """Score changes of one room, per player"""
+
+    def __init__(self, max_points: int = MAX_POINTS):
+        self._lock = threading.Lock()
+        self.max_points = max_points
+        self.dropped = 0
+        self.total = 0
+        self.players: List[str] = []
+        self._player_index: Dict[str, int] = {}
+        self._series: List[_Series] = []
+
+    def __len__(self) -> int:
+        return self.total
+
+    def record(self, player_name: str, score: int, ts: Optional[float] = None) -> None:
+        """Record a player's total after a change"""
+        with self._lock:
+            if self.total >= self.max_points:
+                self.dropped += 1
+                return
+            pi = self._player_index.get(player_name)
+            if pi is None:
+                pi = self._player_index[player_name] = len(self.players)
+                self.players.append(player_name)
+                self._series.append(_Series())
+            series = self._series[pi]
+            series.ts.append(time.time() if ts is None else ts)
+            series.score.append(score)
+            self.total += 1
+
+    def series(self, points: int = 100, mode: str = 'lttb', players: Optional[Iterable[str]] = None,
+               since: Optional[float] = None) -> dict:
+        """
+        Each player's history reduced to at most `points` points.
+
+        `players` limits the result to those names, `since` to changes at
+        or after that unix time. Times are returned as seconds since
+        `started_at`, the first recorded change in the room.
+        """
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of: {', '.join(MODES)}")
+        reduce = lttb if mode == 'lttb' else bucket_max
+
+        # Columns only ever grow, so copies taken under the lock are a
+        # consistent view to downsample without holding it
+        with self._lock:
+            wanted = None if players is None else set(players)
+            picked = [(name, s.ts[:], s.score[:]) for name, s in zip(self.players, self._series)
+                      if wanted is None or name in wanted]
+            started_at = min((s.ts[0] for s in self._series if s.ts), default=None)
+            total, dropped = self.total, self.dropped
+
+        result = []
+        for name, ts, scores in picked:
+            if since is not None:
+                # Timestamps are appended in order, so the cut is a bisection
+                cut = bisect_left(ts, since)
+                ts, scores = ts[cut:], scores[cut:]
+            out_t, out_v = reduce(ts, scores, points)
+            result.append({
+                'player_name': name,
+                'changes': len(ts),
+                't': [round(t - started_at, 3) for t in out_t],
+                'score': out_v
+            })
+
+        return {
+            'started_at': started_at,
+            'mode': mode,
+            'points': points,
+            'changes': total,
+            'dropped': dropped,
+            'players': result
+        }
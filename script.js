@@ -16,6 +16,145 @@ function goToPeserta() {
 // Automatically use HTTPS or HTTP based on frontend protocol
 const API_BASE = `${window.location.protocol}//${window.location.host}/api`;
 
+// Identifies this tab to the server's read rate limiter, so phones sharing
+// one classroom IP each get their own allowance
+const CLIENT_ID = sessionStorage.getItem('ttx_clientId') || (() => {
+    const id = Math.random().toString(36).slice(2) + Date.now().toString(36);
+    sessionStorage.setItem('ttx_clientId', id);
+    return id;
+})();
+
+// Seconds a 429 response asks us to wait (see Retry-After)
+function retryAfterMs(response) {
+    const seconds = parseInt(response.headers.get('Retry-After'), 10);
+    return (isNaN(seconds) ? 1 : seconds) * 1000;
+}
+
+// ==================== WIRE FORMAT (MessagePack) ====================
+// The API answers in MessagePack instead of JSON when asked with
+// `Accept: application/msgpack` (smaller payloads on busy classroom Wi-Fi).
+
+const MSGPACK_TYPE = 'application/msgpack';
+const utf8Decoder = new TextDecoder('utf-8');
+
+// Thrown when a buffer ends in the middle of a value (streams wait for more bytes)
+class MsgpackIncomplete extends Error {}
+
+function decodeMsgpackAt(bytes, view, pos) {
+    if (pos >= bytes.length) throw new MsgpackIncomplete();
+    const b = bytes[pos++];
+    const need = (n) => { if (pos + n > bytes.length) throw new MsgpackIncomplete(); };
+    const str = (n) => { need(n); const s = utf8Decoder.decode(bytes.subarray(pos, pos + n)); return [s, pos + n]; };
+    const arr = (n) => {
+        const items = new Array(n);
+        for (let i = 0; i < n; i++) [items[i], pos] = decodeMsgpackAt(bytes, view, pos);
+        return [items, pos];
+    };
+    const map = (n) => {
+        const obj = {};
+        for (let i = 0; i < n; i++) {
+            let key;
+            [key, pos] = decodeMsgpackAt(bytes, view, pos);
+            [obj[key], pos] = decodeMsgpackAt(bytes, view, pos);
+        }
+        return [obj, pos];
+    };
+    const u = (n) => {
+        need(n);
+        const v = n === 1 ? view.getUint8(pos) : n === 2 ? view.getUint16(pos) : view.getUint32(pos);
+        pos += n;
+        return v;
+    };
+
+    if (b < 0x80) return [b, pos];
+    if (b >= 0xe0) return [b - 0x100, pos];
+    if (b >= 0xa0 && b <= 0xbf) return str(b & 0x1f);
+    if (b >= 0x90 && b <= 0x9f) return arr(b & 0x0f);
+    if (b >= 0x80 && b <= 0x8f) return map(b & 0x0f);
+    switch (b) {
+        case 0xc0: return [null, pos];
+        case 0xc2: return [false, pos];
+        case 0xc3: return [true, pos];
+        case 0xc4: case 0xc5: case 0xc6: {
+            const n = u(b === 0xc4 ? 1 : b === 0xc5 ? 2 : 4);
+            need(n);
+            return [bytes.slice(pos, pos + n), pos + n];
+        }
+        case 0xca: need(4); return [view.getFloat32(pos), pos + 4];
+        case 0xcb: need(8); return [view.getFloat64(pos), pos + 8];
+        case 0xcc: return [u(1), pos];
+        case 0xcd: return [u(2), pos];
+        case 0xce: return [u(4), pos];
+        case 0xcf: need(8); return [Number(view.getBigUint64(pos)), pos + 8];
+        case 0xd0: need(1); return [view.getInt8(pos), pos + 1];
+        case 0xd1: need(2); return [view.getInt16(pos), pos + 2];
+        case 0xd2: need(4); return [view.getInt32(pos), pos + 4];
+        case 0xd3: need(8); return [Number(view.getBigInt64(pos)), pos + 8];
+        case 0xd9: return str(u(1));
+        case 0xda: return str(u(2));
+        case 0xdb: return str(u(4));
+        case 0xdc: return arr(u(2));
+        case 0xdd: return arr(u(4));
+        case 0xde: return map(u(2));
+        case 0xdf: return map(u(4));
+    }
+    throw new Error('Unsupported MessagePack type 0x' + b.toString(16));
+}
+
+function decodeMsgpack(buffer) {
+    const bytes = buffer instanceof Uint8Array ? buffer : new Uint8Array(buffer);
+    const view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+    return decodeMsgpackAt(bytes, view, 0)[0];
+}
+
+// Decode a response body in whichever format the server chose
+async function readApiResponse(response) {
+    const type = response.headers.get('Content-Type') || '';
+    if (type.startsWith(MSGPACK_TYPE)) {
+        return decodeMsgpack(await response.arrayBuffer());
+    }
+    return response.json();
+}
+
+// GET an API URL preferring the compact encoding; returns {response, data}
+async function fetchCompact(url, options = {}) {
+    const headers = Object.assign({ 'Accept': `${MSGPACK_TYPE}, application/json;q=0.9`, 'X-Client-Id': CLIENT_ID },
+                                  options.headers || {});
+    const response = await fetch(url, Object.assign({}, options, { headers: headers }));
+    return { response: response, data: await readApiResponse(response) };
+}
+
+// Follow a MessagePack event stream (e.g. the tournament stream with
+// Accept: application/msgpack); calls onMessage({event, id, data}) per frame
+async function followMsgpackStream(url, onMessage, signal) {
+    const response = await fetch(url, { headers: { 'Accept': MSGPACK_TYPE }, signal: signal });
+    if (!response.ok) {
+        throw new Error(`Stream refused (HTTP ${response.status})`);
+    }
+    const reader = response.body.getReader();
+    let pending = new Uint8Array(0);
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) return;
+        const joined = new Uint8Array(pending.length + value.length);
+        joined.set(pending);
+        joined.set(value, pending.length);
+        const view = new DataView(joined.buffer);
+        let pos = 0;
+        while (pos < joined.length) {
+            let message;
+            try {
+                [message, pos] = decodeMsgpackAt(joined, view, pos);
+            } catch (error) {
+                if (error instanceof MsgpackIncomplete) break;
+                throw error;
+            }
+            onMessage(message);
+        }
+        pending = joined.slice(pos);
+    }
+}
+
 // ==================== API WRAPPER FUNCTIONS ====================
 
 async function createNewRoom(roomName) {
@@ -44,22 +183,66 @@ async function createNewRoom(roomName) {
     }
 }
 
-async function getRoom(roomCode) {
+const roomRequests = {};  // roomCode -> in-flight getRoom promise
+
+// Room snapshot the server inlined into this page (see serve_page in
+// app.py). It answers getRoom during page start-up and is dropped once
+// RoomSync has heard back from the server.
+let inlineRoom = (() => {
+    const element = document.getElementById('roomSnapshot');
+    if (!element) return null;
     try {
-        const response = await fetch(`${API_BASE}/rooms/${roomCode.toUpperCase()}`);
+        return JSON.parse(element.textContent);
+    } catch (error) {
+        return null;
+    }
+})();
+
+function getRoom(roomCode) {
+    // Callers asking at the same moment share one request
+    const code = roomCode.toUpperCase();
+    if (inlineRoom && inlineRoom.code === code) {
+        return Promise.resolve(inlineRoom);
+    }
+    if (!roomRequests[code]) {
+        roomRequests[code] = fetchRoom(code).finally(() => { delete roomRequests[code]; });
+    }
+    return roomRequests[code];
+}
+
+async function fetchRoom(roomCode) {
+    try {
+        const { response, data } = await fetchCompact(`${API_BASE}/rooms/${roomCode}`);
         
         if (!response.ok) {
             return null;
         }
         
-        const data = await response.json();
-        return data.success ? data.data : null;
+        const room = data.success ? data.data : null;
+        if (room) RoomSync.observe(room);
+        return room;
     } catch (error) {
         console.error('Error getting room:', error);
         return null;
     }
 }
 
+// Apply several host commands in one atomic request (see POST /commands)
+async function runHostCommands(roomCode, commands) {
+    const response = await fetch(`${API_BASE}/rooms/${roomCode.toUpperCase()}/commands`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ commands: commands })
+    });
+    
+    const data = await response.json();
+    if (!response.ok || !data.success) {
+        throw new Error(data.message || 'Perintah gagal dijalankan');
+    }
+    
+    return data.data;
+}
+
 async function deleteRoom(roomCode) {
     try {
         const response = await fetch(`${API_BASE}/rooms/${roomCode.toUpperCase()}`, {
@@ -74,17 +257,25 @@ async function deleteRoom(roomCode) {
     }
 }
 
-async function addParticipantToRoom(roomCode, playerName) {
+// onQueued(position) is called while a full room keeps the player in line
+async function addParticipantToRoom(roomCode, playerName, onQueued) {
     try {
-        const response = await fetch(`${API_BASE}/rooms/${roomCode.toUpperCase()}/join`, {
+        const code = roomCode.toUpperCase();
+        const response = await fetch(`${API_BASE}/rooms/${code}/join`, {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({ player_name: playerName })
         });
         
+        const data = await response.json();
+        if (response.status === 404) {
+            throw new Error('Kode ruangan tidak ditemukan!');
+        }
         if (!response.ok) {
-            const errorData = await response.json();
-            throw new Error(errorData.message || 'Gagal bergabung');
+            throw new Error(data.message || 'Gagal bergabung');
+        }
+        if (response.status === 202) {
+            await waitForSeat(code, playerName, data.data.position, onQueued);
         }
         
         return true;
@@ -94,6 +285,26 @@ async function addParticipantToRoom(roomCode, playerName) {
     }
 }
 
+// The room is full: check in every 2 seconds (keeping our place in line)
+// until the server has given us a seat
+async function waitForSeat(roomCode, playerName, position, onQueued) {
+    const url = `${API_BASE}/rooms/${roomCode}/waitlist?player_name=${encodeURIComponent(playerName)}`;
+    while (true) {
+        if (onQueued) onQueued(position);
+        await new Promise(resolve => setTimeout(resolve, 2000));
+        const { response, data } = await fetchCompact(url);
+        if (response.status === 429) {
+            await new Promise(resolve => setTimeout(resolve, retryAfterMs(response)));
+            continue;
+        }
+        if (!response.ok) {
+            throw new Error(data.message || 'Gagal menunggu kursi di ruangan');
+        }
+        if (data.data.status === 'joined') return;
+        position = data.data.position;
+    }
+}
+
 async function removeParticipantFromRoom(roomCode, playerName) {
     try {
         const response = await fetch(`${API_BASE}/rooms/${roomCode.toUpperCase()}/leave`, {
@@ -110,6 +321,48 @@ async function removeParticipantFromRoom(roomCode, playerName) {
     }
 }
 
+// Attach an image/audio clue to a question (file from an <input type="file">)
+async function uploadQuestionMedia(roomCode, questionId, file) {
+    const form = new FormData();
+    form.append('file', file);
+    const response = await fetch(`${API_BASE}/rooms/${roomCode.toUpperCase()}/questions/${questionId}/media`, {
+        method: 'POST',
+        body: form
+    });
+    
+    const data = await response.json();
+    if (!response.ok || !data.success) {
+        throw new Error(data.message || 'Gagal mengunggah media');
+    }
+    
+    return data.data;
+}
+
+// Mark this player online; if the server dropped us for inactivity (not a
+// kick by the host), join again. Returns true when the player is in the room.
+async function sendHeartbeat(roomCode, playerName) {
+    try {
+        const response = await fetch(`${API_BASE}/rooms/${roomCode.toUpperCase()}/heartbeat`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ player_name: playerName })
+        });
+        
+        if (response.status === 404) {
+            const data = await response.json();
+            if (data.message !== 'Player was disconnected for inactivity') {
+                return false;
+            }
+            await addParticipantToRoom(roomCode, playerName);
+            RoomSync.refresh();
+        }
+        return response.ok || response.status === 404;
+    } catch (error) {
+        console.error('Error sending heartbeat:', error);
+        return false;
+    }
+}
+
 // ==================== OLD LOCAL STORAGE FUNCTIONS (kept for reference) ====================
 
 function generateRoomCode() {
@@ -135,9 +388,24 @@ function saveRooms(rooms) {
 // ==================== SESSION MANAGEMENT ==================== 
 // Safely manage localStorage data for persistent sessions
 
+// The server only sees cookies, so the session is mirrored into them; the
+// /host and /peserta pages then arrive with the room already inlined
+function setSessionCookie(name, value) {
+    document.cookie = value
+        ? `${name}=${encodeURIComponent(value)}; path=/; max-age=86400; SameSite=Lax`
+        : `${name}=; path=/; max-age=0; SameSite=Lax`;
+}
+
+function syncSessionCookies() {
+    setSessionCookie('ttx_host_room', localStorage.getItem('ttx_currentHostRoom'));
+    setSessionCookie('ttx_player_room', localStorage.getItem('ttx_playerRoomCode'));
+    setSessionCookie('ttx_player_name', localStorage.getItem('ttx_playerName'));
+}
+
 function saveHostSession(roomCode) {
     if (roomCode) {
         localStorage.setItem('ttx_currentHostRoom', roomCode);
+        syncSessionCookies();
     }
 }
 
@@ -145,18 +413,24 @@ function savePesertaSession(playerName, roomCode) {
     if (playerName && roomCode) {
         localStorage.setItem('ttx_playerName', playerName);
         localStorage.setItem('ttx_playerRoomCode', roomCode);
+        syncSessionCookies();
     }
 }
 
 function clearHostSession() {
     localStorage.removeItem('ttx_currentHostRoom');
+    syncSessionCookies();
 }
 
 function clearPesertaSession() {
     localStorage.removeItem('ttx_playerName');
     localStorage.removeItem('ttx_playerRoomCode');
+    syncSessionCookies();
 }
 
+// Sessions saved before the cookies existed
+syncSessionCookies();
+
 async function validateHostSession() {
     const roomCode = localStorage.getItem('ttx_currentHostRoom');
     if (!roomCode) return null;
@@ -195,8 +469,11 @@ async function validatePesertaSession() {
         return null;
     }
     
-    // Check if player still in room
+    // Check if player still in room (or only dropped for inactivity)
     if (!room.participants || !room.participants.includes(playerName)) {
+        if (await sendHeartbeat(roomCode, playerName)) {
+            return { playerName, roomCode };
+        }
         // Player was removed by host - remove participant and clear session
         await removeParticipantFromRoom(roomCode, playerName);
         clearPesertaSession();
@@ -520,15 +797,11 @@ async function joinRoom() {
     }
     
     try {
-        // First check if room exists
-        const room = await getRoom(roomCode);
-        if (!room) {
-            showErrorMessage(errorMessage, 'Kode ruangan tidak ditemukan!');
-            return;
-        }
-        
-        // Try to join the room (API will check for duplicate names)
-        await addParticipantToRoom(roomCode, playerName);
+        // Join directly: the API answers 404 for an unknown room and checks
+        // duplicate names, so no room fetch is needed first
+        await addParticipantToRoom(roomCode, playerName, position => {
+            showErrorMessage(errorMessage, `Ruangan penuh. Anda di antrean ke-${position}, mohon tunggu...`);
+        });
         
         // Save to localStorage
         savePesertaSession(playerName, roomCode);
@@ -1036,8 +1309,8 @@ function createQuestion() {
                 })
             });
             
+            const data = await response.json();
             if (!response.ok) {
-                const data = await response.json();
                 throw new Error(data.message || 'Gagal membuat soal');
             }
             
@@ -1048,48 +1321,104 @@ function createQuestion() {
             
             // Refresh display - soal langsung tampil di layar
             loadCurrentQuestion();
+            displayQuestionsList();
             
-            showSuccess('Soal baru berhasil ditambahkan ke permainan!');
+            let message = 'Soal baru berhasil ditambahkan ke permainan!';
+            if (data.spelling && !data.spelling.known) {
+                // Only a hint: the question is created either way
+                message += ' Jawaban tidak ada di kamus';
+                message += data.spelling.similar.length
+                    ? ` (mungkin maksudnya: ${data.spelling.similar.join(', ')}).`
+                    : '.';
+            }
+            showSuccess(message);
         } catch (error) {
             showErrorMessage(errorDiv, error.message);
         }
     }
 function displayQuestionsList() {
+    renderQuestionsList('questionsList', 'questionsSearch');
+}
+
+// Search the room's question bank on the server (GET /questions), so the
+// list never needs the whole room; resolves to {questions, total, next_cursor}
+async function searchQuestions(roomCode, { q = '', status = '', cursor = '', limit = 50 } = {}) {
+    const params = new URLSearchParams({ limit: limit });
+    if (q) params.set('q', q);
+    if (status) params.set('status', status);
+    if (cursor) params.set('cursor', cursor);
+    try {
+        const { response, data } = await fetchCompact(`${API_BASE}/rooms/${roomCode.toUpperCase()}/questions?${params}`);
+        return response.ok && data.success ? data.data : null;
+    } catch (error) {
+        console.error('Error searching questions:', error);
+        return null;
+    }
+}
+
+// Render a question list filtered by its search box (when the page has
+// one; typing re-renders after a short pause). The first page replaces the
+// list; "Muat lebih banyak" follows next_cursor and appends the next page.
+async function renderQuestionsList(listId, searchId, cursor = '') {
     const currentHostRoom = localStorage.getItem('ttx_currentHostRoom');
-    if (!currentHostRoom) return;
+    const list = document.getElementById(listId);
+    if (!currentHostRoom || !list) return;
+    
+    const search = document.getElementById(searchId);
+    if (search && !search.dataset.bound) {
+        search.dataset.bound = '1';
+        let timer = null;
+        search.addEventListener('input', () => {
+            clearTimeout(timer);
+            timer = setTimeout(() => renderQuestionsList(listId, searchId), 200);
+        });
+    }
+    const query = search ? search.value.trim() : '';
     
-    // Use async approach
-    getRoom(currentHostRoom).then(room => {
-        if (!room || !room.questions) {
-            const list = document.getElementById('questionsList');
-            if (list) list.innerHTML = '<p class="empty-message">Belum ada soal yang dibuat</p>';
-            return;
-        }
-        
-        const listHtml = room.questions.map((q, idx) => `
-            <div class="question-item">
-                <div class="question-item-text">${idx + 1}. ${q.question}</div>
-                <div class="question-item-answer">Jawaban: ${q.answer}</div>
-                <div class="question-item-points">Poin: ${q.points || 100}</div>
-                <div class="question-item-status ${q.status === 'revealed' ? 'status-revealed' : 'status-aktif'}">${q.status === 'revealed' ? 'TERBUKA' : 'AKTIF'}</div>
-                <div class="question-item-actions">
-                    <button class="btn btn-select" onclick="selectQuestion('${q.question_id}')">Pilih</button>
-                    <button class="btn btn-danger" onclick="deleteQuestion('${q.question_id}')">Hapus</button>
-                </div>
+    const result = await searchQuestions(currentHostRoom, { q: query, cursor: cursor });
+    // Drop the page if the search box changed while it was loading
+    if (search && search.value.trim() !== query) return;
+    if (!cursor && (!result || result.questions.length === 0)) {
+        list.innerHTML = `<p class="empty-message">${query ? 'Tidak ada soal yang cocok' : 'Belum ada soal yang dibuat'}</p>`;
+        return;
+    }
+    if (!result) return;
+    
+    const listHtml = result.questions.map(q => `
+        <div class="question-item">
+            <div class="question-item-text">${q.question_id.slice(1)}. ${q.question}</div>
+            <div class="question-item-answer">Jawaban: ${q.answer}</div>
+            <div class="question-item-points">Poin: ${q.points || 100}</div>
+            <div class="question-item-status ${q.status === 'revealed' ? 'status-revealed' : 'status-aktif'}">${q.status === 'revealed' ? 'TERBUKA' : 'AKTIF'}</div>
+            <div class="question-item-actions">
+                <button class="btn btn-select" onclick="selectQuestion('${q.question_id}')">Pilih</button>
+                <button class="btn btn-danger" onclick="deleteQuestion('${q.question_id}')">Hapus</button>
             </div>
-        `).join('');
-        
-        const list = document.getElementById('questionsList');
-        if (list) list.innerHTML = listHtml;
-    });
+        </div>
+    `).join('');
+    const shown = (cursor ? list.querySelectorAll('.question-item').length : 0) + result.questions.length;
+    const more = result.next_cursor
+        ? `<div class="questions-more">
+            <p class="empty-message">Menampilkan ${shown} dari ${result.total} soal</p>
+            <button class="btn" onclick="renderQuestionsList('${listId}', '${searchId}', '${result.next_cursor}')">Muat lebih banyak</button>
+        </div>`
+        : '';
+    
+    if (cursor) {
+        const previous = list.querySelector('.questions-more');
+        if (previous) previous.remove();
+        list.insertAdjacentHTML('beforeend', listHtml + more);
+    } else {
+        list.innerHTML = listHtml + more;
+    }
 }
 
-function loadCurrentQuestion() {
+function loadCurrentQuestion(snapshot) {
     const currentHostRoom = localStorage.getItem('ttx_currentHostRoom');
     if (!currentHostRoom) return;
     
-    // Use async approach
-    getRoom(currentHostRoom).then(room => {
+    // Use the sync engine's snapshot when given one, otherwise fetch
+    (snapshot ? Promise.resolve(snapshot) : getRoom(currentHostRoom)).then(room => {
         if (!room || !room.questions || !room.current_question_id) {
             const questionBox = document.getElementById('questionBox');
             if (questionBox) questionBox.style.display = 'none';
@@ -1202,6 +1531,8 @@ async function deleteQuestion(questionId) {
         
         // Refresh display
         loadCurrentQuestion();
+        displayQuestionsList();
+        displayGameQuestionsList();
         
         showSuccess('Soal berhasil dihapus');
     } catch (error) {
@@ -1312,47 +1643,54 @@ async function revealAnswer() {
         return;
     }
     
-    const room = await getRoom(currentHostRoom);
-    
-    if (!room) {
-        showError('Room tidak ditemukan');
-        return;
-    }
-    
-    if (!room.questions || !Array.isArray(room.questions)) {
-        showError('Pertanyaan tidak tersedia');
-        return;
-    }
-    
-    if (!room.current_question_id) {
-        showError('Tidak ada pertanyaan yang dipilih');
-        return;
+    try {
+        // Reveal the current question server-side; no room fetch needed first
+        await runHostCommands(currentHostRoom, [{ op: 'reveal' }]);
+        
+        showSuccess('Jawaban telah dibuka!');
+        loadCurrentQuestion();
+    } catch (error) {
+        console.error('Error revealing answer:', error);
+        showError('Gagal membuka jawaban: ' + error.message);
     }
+}
+
+// Render a result sheet on the server, wait for it, then download it
+async function exportResults(format) {
+    const currentHostRoom = localStorage.getItem('ttx_currentHostRoom');
+    if (!currentHostRoom) return;
     
-    const currentQ = room.questions.find(q => q.question_id === room.current_question_id);
-    
-    if (!currentQ) {
-        showError('Pertanyaan saat ini tidak ditemukan');
-        return;
-    }
+    const base = `${API_BASE}/rooms/${currentHostRoom.toUpperCase()}/exports`;
     
     try {
-        // Call API to reveal the answer
-        const response = await fetch(`${API_BASE}/rooms/${currentHostRoom.toUpperCase()}/questions/${currentQ.question_id}/reveal`, {
-            method: 'PUT',
-            headers: { 'Content-Type': 'application/json' }
+        const response = await fetch(base, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ format: format })
         });
-        
+        let data = await response.json();
         if (!response.ok) {
-            const data = await response.json();
-            throw new Error(data.message || 'Gagal membuka jawaban');
+            throw new Error(data.message || 'Gagal membuat file hasil');
         }
         
-        showSuccess('Jawaban telah dibuka!');
-        loadCurrentQuestion();
+        let job = data.data;
+        while (job.status === 'queued') {
+            await new Promise(resolve => setTimeout(resolve, 500));
+            const poll = await fetchCompact(`${base}/${job.job_id}`);
+            if (poll.response.status === 429) continue;
+            data = poll.data;
+            if (!data.success) throw new Error(data.message);
+            job = data.data;
+        }
+        
+        if (job.status !== 'done') {
+            throw new Error(job.error || 'Gagal membuat file hasil');
+        }
+        
+        window.location.href = `${base}/${job.job_id}/download`;
     } catch (error) {
-        console.error('Error revealing answer:', error);
-        showError('Gagal membuka jawaban: ' + error.message);
+        console.error('Error exporting results:', error);
+        showError('Gagal mengunduh hasil: ' + error.message);
     }
 }
 
@@ -1406,33 +1744,7 @@ function markAnswerWrong() {
 }
 
 function displayGameQuestionsList() {
-    const currentHostRoom = localStorage.getItem('ttx_currentHostRoom');
-    if (!currentHostRoom) return;
-    
-    // Use async approach
-    getRoom(currentHostRoom).then(room => {
-        if (!room || !room.questions) {
-            const list = document.getElementById('gameQuestionsList');
-            if (list) list.innerHTML = '<p class="empty-message">Belum ada soal yang dibuat</p>';
-            return;
-        }
-        
-        const listHtml = room.questions.map((q, idx) => `
-            <div class="question-item">
-                <div class="question-item-text">${idx + 1}. ${q.question}</div>
-                <div class="question-item-answer">Jawaban: ${q.answer}</div>
-                <div class="question-item-points">Poin: ${q.points || 100}</div>
-                <div class="question-item-status ${q.status === 'revealed' ? 'status-revealed' : 'status-aktif'}">${q.status === 'revealed' ? 'TERBUKA' : 'AKTIF'}</div>
-                <div class="question-item-actions">
-                    <button class="btn btn-select" onclick="selectQuestion('${q.question_id}')">Pilih</button>
-                    <button class="btn btn-danger" onclick="deleteQuestion('${q.question_id}')">Hapus</button>
-                </div>
-            </div>
-        `).join('');
-        
-        const list = document.getElementById('gameQuestionsList');
-        if (list) list.innerHTML = listHtml;
-    });
+    renderQuestionsList('gameQuestionsList', 'gameQuestionsSearch');
 }
 
 // Open inline tabs for create / daftar (no modals)
@@ -1608,7 +1920,7 @@ function nextQuestion() {
     }
 }
 
-function loadScores() {
+function loadScores(snapshot) {
     // Determine which room we're loading scores for
     const currentHostRoom = localStorage.getItem('ttx_currentHostRoom');
     const playerRoomCode = localStorage.getItem('ttx_playerRoomCode');
@@ -1617,8 +1929,8 @@ function loadScores() {
     
     if (!roomCode) return;
     
-    // Use async approach
-    getRoom(roomCode).then(room => {
+    // Use the sync engine's snapshot when given one, otherwise fetch
+    (snapshot ? Promise.resolve(snapshot) : getRoom(roomCode)).then(room => {
         if (!room || !room.participants || room.participants.length === 0) {
             // No participants at all - show empty message
             const scoresBoard = document.getElementById('scoresBoard');
@@ -1675,13 +1987,13 @@ function loadScores() {
 }
 
 // ==================== PESERTA GAME FUNCTIONS ====================
-async function updateGameDisplay() {
+async function updateGameDisplay(snapshot) {
     const playerName = localStorage.getItem('ttx_playerName');
     const roomCode = localStorage.getItem('ttx_playerRoomCode');
     
     if (!playerName || !roomCode) return;
     
-    const room = await getRoom(roomCode);
+    const room = snapshot || await getRoom(roomCode);
     if (!room) return;
     
     const displayRoomCodePesertaGame = document.getElementById('displayRoomCodePesertaGame');
@@ -1701,6 +2013,7 @@ async function updateGameDisplay() {
             const waitingQuestionEl = document.getElementById('waitingQuestionMessage');
             if (waitingQuestionEl) waitingQuestionEl.style.display = 'none';
             renderAnswerBoxes(currentQ, 'peserta');
+            renderQuestionMedia(currentQ);
             const playerAnswerEl = document.getElementById('playerAnswer');
             if (playerAnswerEl) playerAnswerEl.value = '';
             const answerResultEl = document.getElementById('answerResult');
@@ -1715,6 +2028,37 @@ async function updateGameDisplay() {
     }
 }
 
+// Show a question's image/audio clues; only rebuilt when the media change
+// so audio does not restart on every poll
+function renderQuestionMedia(question) {
+    const container = document.getElementById('questionMedia');
+    if (!container) return;
+    
+    const media = question.media || [];
+    const key = question.question_id + ':' + media.map(m => m.media_id).join(',');
+    if (container.dataset.key === key) return;
+    container.dataset.key = key;
+    container.innerHTML = '';
+    
+    for (const item of media) {
+        let el;
+        if (item.kind === 'image') {
+            el = document.createElement('img');
+            el.src = item.thumbnail_url;
+            el.alt = 'Petunjuk gambar';
+            el.style.cursor = 'zoom-in';
+            el.onclick = () => window.open(item.url, '_blank');
+        } else {
+            el = document.createElement('audio');
+            el.src = item.url;
+            el.controls = true;
+            el.preload = 'none';
+        }
+        el.className = 'question-media-item';
+        container.appendChild(el);
+    }
+}
+
 function submitPesertaAnswer() {
     const playerName = localStorage.getItem('ttx_playerName');
     const roomCode = localStorage.getItem('ttx_playerRoomCode');
@@ -1753,11 +2097,7 @@ function submitPesertaAnswer() {
 
 // ==================== POLLING FUNCTIONS ==================== 
 
-async function pollHostPage() {
-    const currentHostRoom = localStorage.getItem('ttx_currentHostRoom');
-    if (!currentHostRoom) return;
-    
-    const room = await getRoom(currentHostRoom);
+function pollHostPage(room) {
     if (!room) return;
     
     // Update participant count and list in Setup tab
@@ -1777,24 +2117,22 @@ async function pollHostPage() {
     updateParticipantsListInGame(room.participants);
     
     // ALWAYS update scores (real-time sync)
-    loadScores();
+    loadScores(room);
     
     // Refresh game display if on Bermain tab
     const activeTab = document.querySelector('.tab-btn.active');
     if (activeTab && activeTab.textContent.includes('Bermain')) {
         if (room.current_question_id !== undefined) {
-            loadCurrentQuestion();
+            loadCurrentQuestion(room);
         }
     }
 }
 
-async function pollPesertaPage() {
+async function pollPesertaPage(room) {
     const playerName = localStorage.getItem('ttx_playerName');
     const roomCode = localStorage.getItem('ttx_playerRoomCode');
     if (!playerName || !roomCode) return;
     
-    const room = await getRoom(roomCode);
-    
     // If room has been deleted on host, inform peserta and clean up
     if (!room) {
         alert('Ruangan telah dihapus oleh host. Anda akan kembali ke beranda.');
@@ -1816,8 +2154,13 @@ async function pollPesertaPage() {
     if (gamePlay) gamePlay.style.display = 'block';
     if (waitingRoom) waitingRoom.style.display = 'none';
 
+    // Dropped for inactivity (e.g. the phone slept): join again
+    if (!(room.participants || []).includes(playerName)) {
+        sendHeartbeat(roomCode, playerName);
+    }
+
     // Update question display and answer boxes
-    await updateGameDisplay();
+    await updateGameDisplay(room);
 
     // If there is an active question, ensure answer grid is rendered
     if (room.current_question_id && room.questions && room.questions.length > 0) {
@@ -1826,7 +2169,7 @@ async function pollPesertaPage() {
     }
 
     // Load and update scoreboard in real-time
-    loadScores();
+    loadScores(room);
 
     // Trigger wrong-answer flash if flagged (once) - CHECK REGULARLY
     if (room.current_question_id && room.questions) {
@@ -1851,46 +2194,169 @@ document.addEventListener('DOMContentLoaded', function() {
     
     if (pathname === '/host') {
         initHostPage();
+        RoomSync.start('host');
     } else if (pathname === '/peserta') {
         initPesertaPage();
+        RoomSync.start('peserta');
     }
 });
 
-// Optional: Auto-refresh data periodically (for real-time updates)
-setInterval(function() {
-    const pathname = window.location.pathname;
-    
-    if (pathname === '/host') {
-        pollHostPage();
-    } else if (pathname === '/peserta') {
-        pollPesertaPage();
-    }
-}, 1000); // Refresh every 1 second for better real-time feel
+// ==================== ROOM SYNC ENGINE ====================
+// One fetch (or one push stream) per page feeds every UI update. Polling
+// backs off while the room is unchanged, pauses in background tabs, is
+// jittered so a classroom of phones does not fire in lockstep, and gives
+// way to the server's room stream whenever the server offers one.
+
+const RoomSync = {
+    mode: null,           // 'host' | 'peserta'
+    roomCode: null,
+    version: null,
+    delay: 1000,
+    minDelay: 1000,
+    maxDelay: 8000,
+    timer: null,
+    stream: null,         // AbortController of the open push stream
+    pushRetryAt: 0,
+
+    start(mode) {
+        this.mode = mode;
+        // Peserta polls carry a presence heartbeat, so stay well inside the
+        // server's away threshold (15 s)
+        this.maxDelay = mode === 'host' ? 4000 : 8000;
+        document.addEventListener('visibilitychange', () => {
+            if (document.hidden) {
+                this.pause();
+            } else {
+                this.refresh();
+            }
+        });
+        this.schedule(0);
+    },
 
-// Peserta gets additional faster polling for wrong-answer flash responsiveness
-setInterval(function() {
-    const pathname = window.location.pathname;
-    if (pathname === '/peserta') {
+    session() {
+        if (this.mode === 'host') {
+            return { roomCode: localStorage.getItem('ttx_currentHostRoom'), playerName: null };
+        }
         const playerName = localStorage.getItem('ttx_playerName');
         const roomCode = localStorage.getItem('ttx_playerRoomCode');
-        if (!playerName || !roomCode) return;
-        
-        // Quick check for wrong flash flag (more responsive)
-        getRoom(roomCode).then(room => {
-            if (room && room.current_question_id && room.questions) {
-                const currentQ = room.questions.find(q => q.question_id === room.current_question_id);
-                if (currentQ && currentQ.wrong_flash_time) {
-                    const lastWrongTime = currentQ.wrong_flash_time;
-                    const lastProcessedTime = localStorage.getItem('ttx_lastWrongFlashTime_' + currentQ.question_id);
-                    if (!lastProcessedTime || parseInt(lastProcessedTime) < lastWrongTime) {
-                        showPesertaWrongFlash();
-                        localStorage.setItem('ttx_lastWrongFlashTime_' + currentQ.question_id, lastWrongTime.toString());
-                    }
-                }
+        return playerName && roomCode ? { roomCode, playerName } : { roomCode: null, playerName: null };
+    },
+
+    schedule(ms) {
+        clearTimeout(this.timer);
+        // +/-20% jitter
+        this.timer = setTimeout(() => this.tick(), ms * (0.8 + Math.random() * 0.4));
+    },
+
+    pause() {
+        clearTimeout(this.timer);
+        this.timer = null;
+        if (this.stream) this.stream.abort();
+    },
+
+    // Something changed (user action, tab visible again): sync right away
+    refresh() {
+        this.delay = this.minDelay;
+        if (!document.hidden && !this.stream) this.schedule(0);
+    },
+
+    // A room fetched outside the engine; a new version means activity
+    observe(room) {
+        if (room.code === this.roomCode && room.version !== this.version) {
+            this.refresh();
+        }
+    },
+
+    deliver(room) {
+        if (room) this.version = room.version;
+        if (this.mode === 'host') {
+            pollHostPage(room);
+        } else {
+            pollPesertaPage(room);
+        }
+    },
+
+    async tick() {
+        if (document.hidden) return;
+        const { roomCode, playerName } = this.session();
+        if (!roomCode) {
+            this.schedule(this.minDelay);
+            return;
+        }
+        if (roomCode.toUpperCase() !== this.roomCode) {
+            this.roomCode = roomCode.toUpperCase();
+            this.version = null;
+            // First paint from the page's inlined snapshot; the request
+            // below then only confirms it (304) or brings what changed
+            if (inlineRoom && inlineRoom.code === this.roomCode) {
+                this.deliver(inlineRoom);
+            }
+        }
+
+        let streamPath = null;
+        try {
+            const query = playerName ? `?player_name=${encodeURIComponent(playerName)}` : '';
+            const headers = this.version !== null ? { 'If-None-Match': `"v${this.version}"` } : {};
+            const response = await fetch(`${API_BASE}/rooms/${this.roomCode}${query}`, {
+                headers: Object.assign({ 'Accept': `${MSGPACK_TYPE}, application/json;q=0.9`, 'X-Client-Id': CLIENT_ID },
+                                       headers)
+            });
+            inlineRoom = null;
+            streamPath = response.headers.get('X-Room-Stream');
+
+            if (response.status === 304) {
+                this.delay = Math.min(this.maxDelay, this.delay * 1.5);
+            } else if (response.status === 429) {
+                // Shed by the server's admission control; wait as asked
+                this.delay = Math.max(this.delay, retryAfterMs(response));
+            } else if (response.status === 404) {
+                this.delay = this.maxDelay;
+                this.deliver(null);
+            } else if (response.ok) {
+                const data = await readApiResponse(response);
+                const changed = data.data.version !== this.version;
+                this.delay = changed ? this.minDelay : Math.min(this.maxDelay, this.delay * 1.5);
+                if (changed) this.deliver(data.data);
+            }
+        } catch (error) {
+            console.error('Error syncing room:', error);
+            this.delay = this.maxDelay;
+        }
+
+        if (streamPath && window.ReadableStream && Date.now() >= this.pushRetryAt) {
+            this.openStream(streamPath, playerName);
+        } else {
+            this.schedule(this.delay);
+        }
+    },
+
+    openStream(path, playerName) {
+        const controller = new AbortController();
+        this.stream = controller;
+        const params = new URLSearchParams();
+        if (this.version !== null) params.set('since', this.version);
+        if (playerName) params.set('player_name', playerName);
+        const roomCode = this.roomCode;
+
+        followMsgpackStream(`${window.location.protocol}//${window.location.host}${path}?${params}`, message => {
+            if (roomCode !== this.roomCode) return;
+            if (message.event === 'room') {
+                this.deliver(message.data);
+            } else if (message.event === 'deleted') {
+                this.deliver(null);
             }
+        }, controller.signal).catch(error => {
+            if (error.name === 'AbortError') return;  // paused (tab hidden)
+            console.error('Room stream closed:', error);
+            // Refused or dropped: poll for a while before trying push again
+            this.pushRetryAt = Date.now() + 30000;
+        }).finally(() => {
+            if (this.stream === controller) this.stream = null;
+            // The server ends streams every few minutes; resume via a poll
+            if (!document.hidden) this.schedule(this.minDelay);
         });
     }
-}, 300); // Check for wrong-answer flash every 300ms
+};
 
 function showPesertaWrongFlash() {
     const answerGrid = document.getElementById('answerGrid');
@@ -0,0 +1,176 @@
+"""
+Cross-room tournament leaderboards, maintained incrementally.
+
+A tournament groups room codes. Every (room, player) score lives in one
+sorted board of `(-score, room_code, player_name)` tuples, so a score change
+is a remove + insert by bisection instead of a re-sort, top-N is a slice
+and a player's rank is one bisect. Room totals are kept alongside.
+
+A room is loaded with `sync_room()`, which diffs all its scores against
+what the board holds; afterwards it pushes only the players whose score
+or membership changed with `update_players()`.
+Each applied delta gets a sequence number and is kept in a short change
+feed that streaming readers follow with `changes_since()` /
+`wait_for_change()`.
+"""
+import threading
+from bisect import bisect_left, insort
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+# Deltas kept for streaming readers that fall behind
+CHANGE_FEED_SIZE = 2048
+
+
+class Tournament:
+    """Global ranking over the players of several rooms"""
+
+    def __init__(self, tournament_id: str, name: str):
+        self.tournament_id = tournament_id
+        self.name = name
+        self.rooms: List[str] = []
+        self.seq = 0
+
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._room_scores: Dict[str, Dict[str, int]] = {}
+        self._board: List[Tuple[int, str, str]] = []
+        self._room_totals: Dict[str, int] = {}
+        self._feed = deque(maxlen=CHANGE_FEED_SIZE)
+
+    # -------------------- updates --------------------
+
+    def _set(self, room_code: str, player_name: str, score: Optional[int]) -> None:
+        # Caller holds the lock; score None removes the entry
+        room_scores = self._room_scores[room_code]
+        old = room_scores.get(player_name)
+        if old == score:
+            return
+        if old is not None:
+            i = bisect_left(self._board, (-old, room_code, player_name))
+            del self._board[i]
+            self._room_totals[room_code] -= old
+        if score is None:
+            del room_scores[player_name]
+        else:
+            room_scores[player_name] = score
+            insort(self._board, (-score, room_code, player_name))
+            self._room_totals[room_code] += score
+
+        self.seq += 1
+        self._feed.append({
+            'seq': self.seq,
+            'room_code': room_code,
+            'player_name': player_name,
+            'score': score,
+            'delta': (score or 0) - (old or 0)
+        })
+
+    def sync_room(self, room_code: str, scores: Dict[str, int]) -> int:
+        """Bring a room's entries in line with `scores`; returns the number of deltas"""
+        with self._lock:
+            before = self.seq
+            if room_code not in self._room_scores:
+                self.rooms.append(room_code)
+                self._room_scores[room_code] = {}
+                self._room_totals[room_code] = 0
+            for player_name, score in scores.items():
+                self._set(room_code, player_name, int(score))
+            # Players that left the room drop off the board
+            if len(self._room_scores[room_code]) > len(scores):
+                for player_name in [p for p in self._room_scores[room_code] if p not in scores]:
+                    self._set(room_code, player_name, None)
+            applied = self.seq - before
+            if applied:
+                self._changed.notify_all()
+            return applied
+
+    def update_players(self, room_code: str, scores: Dict[str, Optional[int]]) -> int:
+        """
+        Apply only the given players' scores (None takes a player off the
+        board); returns the number of deltas. Unlike `sync_room`, the cost
+        is independent of the room's size.
+        """
+        with self._lock:
+            if room_code not in self._room_scores:
+                return 0
+            before = self.seq
+            for player_name, score in scores.items():
+                self._set(room_code, player_name, None if score is None else int(score))
+            applied = self.seq - before
+            if applied:
+                self._changed.notify_all()
+            return applied
+
+    def remove_room(self, room_code: str) -> None:
+        with self._lock:
+            if room_code not in self._room_scores:
+                return
+            for player_name in list(self._room_scores[room_code]):
+                self._set(room_code, player_name, None)
+            del self._room_scores[room_code]
+            del self._room_totals[room_code]
+            self.rooms.remove(room_code)
+            self.seq += 1
+            self._feed.append({'seq': self.seq, 'room_code': room_code, 'removed': True})
+            self._changed.notify_all()
+
+    # -------------------- queries --------------------
+
+    def _rank(self, neg_score: int) -> int:
+        # Competition ranking: 1 + number of strictly higher scores
+        return bisect_left(self._board, (neg_score,)) + 1
+
+    def top(self, limit: int = 10, offset: int = 0) -> dict:
+        with self._lock:
+            entries = [
+                {
+                    'rank': self._rank(neg),
+                    'room_code': room_code,
+                    'player_name': player_name,
+                    'score': -neg
+                }
+                for neg, room_code, player_name in self._board[offset:offset + limit]
+            ]
+            rooms = sorted(self._room_totals.items(), key=lambda item: (-item[1], item[0]))
+            return {
+                'tournament_id': self.tournament_id,
+                'name': self.name,
+                'seq': self.seq,
+                'total_players': len(self._board),
+                'entries': entries,
+                'rooms': [{'room_code': code, 'total_score': total} for code, total in rooms]
+            }
+
+    def rank_of(self, room_code: str, player_name: str) -> Optional[dict]:
+        with self._lock:
+            score = self._room_scores.get(room_code, {}).get(player_name)
+            if score is None:
+                return None
+            return {
+                'rank': self._rank(-score),
+                'room_code': room_code,
+                'player_name': player_name,
+                'score': score,
+                'total_players': len(self._board)
+            }
+
+    # -------------------- change feed --------------------
+
+    def changes_since(self, seq: int) -> Tuple[List[dict], bool]:
+        """
+        Deltas after `seq`, oldest first.
+
+        The flag is False when the feed no longer reaches back to `seq`; the
+        reader then has to reload the board.
+        """
+        with self._lock:
+            if seq >= self.seq:
+                return [], True
+            complete = bool(self._feed) and self._feed[0]['seq'] <= seq + 1
+            return [c for c in self._feed if c['seq'] > seq], complete
+
+    def wait_for_change(self, seq: int, timeout: float) -> bool:
+        """Block until the board moves past `seq`; False on timeout"""
+        with self._changed:
+            return self._changed.wait_for(lambda: self.seq > seq, timeout)
@@ -0,0 +1,239 @@
+"""
+Compact binary encoding (MessagePack) as an opt-in alternative to JSON.
+
+Clients that send `Accept: application/msgpack` get every API response
+encoded as MessagePack instead of JSON; everyone else keeps getting JSON.
+The payload is the same structure, envelope included. Key names are still
+sent, but the framing, numbers and booleans are smaller and nothing needs
+escaping. script.js carries the matching decoder.
+
+The `msgpack` package is used when installed. Otherwise a pure-Python
+encoder is used, which covers the types the API produces: dict, list,
+tuple, str, bytes, int, float, bool and None. Anything else goes through
+the JSON provider's `default` (datetime, UUID, ...), so both encodings
+serialize the same values.
+
+The fallback trades CPU for bytes: it encodes a room snapshot about 2x
+slower than the C json encoder (see benchmarks/bench_wire.py), while the
+`msgpack` package (in requirements.txt) is faster than json. Room and
+leaderboard reads are encoded once per version and shared (see
+coalescing.py), so the fallback costs one slower encode per change, not
+per request.
+"""
+import struct
+from collections.abc import Collection, Mapping
+from typing import Any, Callable, Optional
+
+from flask import has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import msgpack as _msgpack
+except ImportError:  # optional accelerator
+    _msgpack = None
+
+MSGPACK_MIMETYPE = 'application/msgpack'
+_ACCEPTED = (MSGPACK_MIMETYPE, 'application/x-msgpack')
+
+_pack_double = struct.Struct('>Bd').pack
+_pack_u8 = struct.Struct('>BB').pack
+_pack_u16 = struct.Struct('>BH').pack
+_pack_u32 = struct.Struct('>BI').pack
+_pack_u64 = struct.Struct('>BQ').pack
+_pack_i8 = struct.Struct('>Bb').pack
+_pack_i16 = struct.Struct('>Bh').pack
+_pack_i32 = struct.Struct('>Bi').pack
+_pack_i64 = struct.Struct('>Bq').pack
+
+
+def _pack_int(n: int, out: bytearray) -> None:
+    if 0 <= n < 0x80:
+        out.append(n)
+    elif -0x20 <= n < 0:
+        out.append(n & 0xff)
+    elif n >= 0:
+        if n <= 0xff:
+            out += _pack_u8(0xcc, n)
+        elif n <= 0xffff:
+            out += _pack_u16(0xcd, n)
+        elif n <= 0xffffffff:
+            out += _pack_u32(0xce, n)
+        elif n <= 0xffffffffffffffff:
+            out += _pack_u64(0xcf, n)
+        else:
+            raise OverflowError('Integer too large for MessagePack')
+    elif n >= -0x80:
+        out += _pack_i8(0xd0, n)
+    elif n >= -0x8000:
+        out += _pack_i16(0xd1, n)
+    elif n >= -0x80000000:
+        out += _pack_i32(0xd2, n)
+    elif n >= -0x8000000000000000:
+        out += _pack_i64(0xd3, n)
+    else:
+        raise OverflowError('Integer too large for MessagePack')
+
+
+def _pack_header(n: int, fix: int, fix_max: int, c16: int, c32: int, out: bytearray, c8: int = 0) -> None:
+    if n <= fix_max:
+        out.append(fix | n)
+    elif c8 and n <= 0xff:
+        out += _pack_u8(c8, n)
+    elif n <= 0xffff:
+        out += _pack_u16(c16, n)
+    else:
+        out += _pack_u32(c32, n)
+
+
+def _pack(obj: Any, out: bytearray, default: Optional[Callable]) -> None:
+    t = type(obj)
+    if t is str:
+        data = obj.encode('utf-8')
+        _pack_header(len(data), 0xa0, 31, 0xda, 0xdb, out, c8=0xd9)
+        out += data
+    elif t is int:
+        _pack_int(obj, out)
+    elif t is dict:
+        _pack_header(len(obj), 0x80, 15, 0xde, 0xdf, out)
+        for key, value in obj.items():
+            _pack(key, out, default)
+            _pack(value, out, default)
+    elif t is list or t is tuple:
+        _pack_header(len(obj), 0x90, 15, 0xdc, 0xdd, out)
+        for value in obj:
+            _pack(value, out, default)
+    elif obj is None:
+        out.append(0xc0)
+    elif t is bool:
+        out.append(0xc3 if obj else 0xc2)
+    elif t is float:
+        out += _pack_double(0xcb, obj)
+    elif t is bytes or t is bytearray:
+        _pack_header(len(obj), 0, -1, 0xc5, 0xc6, out, c8=0xc4)
+        out += obj
+    elif isinstance(obj, (str, int, float, dict, list, tuple)):
+        # Subclasses (IntEnum, RoomTable, ...) encode as their base type
+        for base in (bool, int, float, str, dict, list, tuple):
+            if isinstance(obj, base):
+                _pack(base(obj), out, default)
+                return
+    elif default is not None:
+        _pack(default(obj), out, None)
+    else:
+        raise TypeError(f'Object of type {t.__name__} is not MessagePack serializable')
+
+
+def packb(obj: Any, default: Optional[Callable] = None) -> bytes:
+    """Encode `obj` as MessagePack"""
+    if _msgpack is not None:
+        return _msgpack.packb(obj, default=default, use_bin_type=True)
+    out = bytearray()
+    _pack(obj, out, default)
+    return bytes(out)
+
+
+def unpackb(data: bytes) -> Any:
+    """Decode one MessagePack value (used by tests and benchmarks)"""
+    if _msgpack is not None:
+        return _msgpack.unpackb(data, raw=False, strict_map_key=False)
+    value, end = _unpack(memoryview(data), 0)
+    if end != len(data):
+        raise ValueError('Extra data after MessagePack value')
+    return value
+
+
+_FIXED = {
+    0xcc: ('>B', 1), 0xcd: ('>H', 2), 0xce: ('>I', 4), 0xcf: ('>Q', 8),
+    0xd0: ('>b', 1), 0xd1: ('>h', 2), 0xd2: ('>i', 4), 0xd3: ('>q', 8),
+    0xca: ('>f', 4), 0xcb: ('>d', 8),
+}
+_LENGTHS = {0xd9: ('>B', 1), 0xda: ('>H', 2), 0xdb: ('>I', 4),
+            0xc4: ('>B', 1), 0xc5: ('>H', 2), 0xc6: ('>I', 4),
+            0xdc: ('>H', 2), 0xdd: ('>I', 4), 0xde: ('>H', 2), 0xdf: ('>I', 4)}
+
+
+def _unpack(buf: memoryview, pos: int):
+    b = buf[pos]
+    pos += 1
+    if b < 0x80:
+        return b, pos
+    if b >= 0xe0:
+        return b - 0x100, pos
+    if 0xa0 <= b <= 0xbf:
+        n = b & 0x1f
+        return str(buf[pos:pos + n], 'utf-8'), pos + n
+    if 0x90 <= b <= 0x9f:
+        return _unpack_array(buf, pos, b & 0x0f)
+    if 0x80 <= b <= 0x8f:
+        return _unpack_map(buf, pos, b & 0x0f)
+    if b == 0xc0:
+        return None, pos
+    if b == 0xc2:
+        return False, pos
+    if b == 0xc3:
+        return True, pos
+    if b in _FIXED:
+        fmt, size = _FIXED[b]
+        return struct.unpack_from(fmt, buf, pos)[0], pos + size
+    if b in _LENGTHS:
+        fmt, size = _LENGTHS[b]
+        n = struct.unpack_from(fmt, buf, pos)[0]
+        pos += size
+        if b in (0xd9, 0xda, 0xdb):
+            return str(buf[pos:pos + n], 'utf-8'), pos + n
+        if b in (0xc4, 0xc5, 0xc6):
+            return bytes(buf[pos:pos + n]), pos + n
+        if b in (0xdc, 0xdd):
+            return _unpack_array(buf, pos, n)
+        return _unpack_map(buf, pos, n)
+    raise ValueError(f'Unsupported MessagePack type 0x{b:02x}')
+
+
+def _unpack_array(buf: memoryview, pos: int, n: int):
+    items = []
+    for _ in range(n):
+        value, pos = _unpack(buf, pos)
+        items.append(value)
+    return items, pos
+
+
+def _unpack_map(buf: memoryview, pos: int, n: int):
+    items = {}
+    for _ in range(n):
+        key, pos = _unpack(buf, pos)
+        items[key], pos = _unpack(buf, pos)
+    return items, pos
+
+
+def wants_msgpack() -> bool:
+    """True when the current request prefers MessagePack over JSON"""
+    accept = request.accept_mimetypes
+    best = accept.best_match(('application/json',) + _ACCEPTED)
+    return best in _ACCEPTED
+
+
+class WireJSONProvider(DefaultJSONProvider):
+    """JSON provider whose `jsonify()` responses honour `Accept: application/msgpack`"""
+
+    @staticmethod
+    def default(o: Any) -> Any:
+        # Containers other than list/tuple (e.g. roster.Roster) encode as arrays
+        if isinstance(o, Collection) and not isinstance(o, (str, bytes, bytearray, Mapping)):
+            return list(o)
+        return DefaultJSONProvider.default(o)
+
+    def response(self, *args, **kwargs):
+        if has_request_context() and wants_msgpack():
+            obj = self._prepare_response_obj(args, kwargs)
+            response = self._app.response_class(packb(obj, default=self.default),
+                                                mimetype=MSGPACK_MIMETYPE)
+        else:
+            response = super().response(*args, **kwargs)
+        response.vary.add('Accept')
+        return response
+
+    def encode(self, obj: Any, binary: bool = False) -> bytes:
+        """Encode a payload as response bytes in either format"""
+        if binary:
+            return packb(obj, default=self.default)
+        return self.dumps(obj).encode('utf-8') + b'\n'
@@ -0,0 +1,406 @@
+"""
+Compact Indonesian word index for answer checks and clue suggestions.
+
+The word list (data/words_id.txt) is compiled offline into a minimal
+acyclic automaton (a DAWG: shared prefixes and shared suffixes), written
+as flat arrays in one file:
+
+    header   magic, node/edge/word counts, root node, longest word
+    nodes    per node: first edge, edge count, final flag, the
+             shortest/longest word still reachable and a bitmask of the
+             letters below it (for pruning searches)
+    labels   one byte per edge, edges of a node contiguous and sorted
+    targets  one u32 node number per edge
+
+`WordIndex` memory-maps that file and walks it in place with
+`struct.unpack_from`, so the dictionary never lands on the Python heap:
+every worker process shares the same page-cache copy, and a lookup only
+touches the few nodes on its path.
+
+Words are stored normalized like answers (see answer_matching): upper
+case A-Z and 0-9, no spaces or punctuation.
+
+Build or rebuild the bundled index with:
+
+    python wordindex.py build data/words_id.txt data/words_id.idx
+
+and try queries with `python wordindex.py query data/words_id.idx J_K_RTA`.
+"""
+import mmap
+import os
+import struct
+import sys
+from typing import Iterable, List, Optional
+
+from answer_matching import normalize_answer
+
+MAGIC = b'TTXDAWG1'
+_HEADER = struct.Struct('<8sIIIII4x')  # magic, nodes, edges, words, root, max length
+_NODE = struct.Struct('<IBBBBQ')       # first edge, edge count, final, min rest, max rest, letters below
+_TARGET = struct.Struct('<I')
+ALPHABET = frozenset(b'ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789')
+_BIT = {label: 1 << i for i, label in enumerate(sorted(ALPHABET))}
+WILDCARDS = frozenset('_?.')
+MAX_WORD_LENGTH = 64
+
+
+def normalize_word(text: str) -> Optional[str]:
+    """Index form of a word, or None if it cannot be stored"""
+    word = normalize_answer(text)
+    if not word or len(word) > MAX_WORD_LENGTH or not set(word.encode('ascii', 'replace')) <= ALPHABET:
+        return None
+    return word
+
+
+# ==================== BUILD ====================
+
+class _BuildNode:
+    __slots__ = ('edges', 'final')
+
+    def __init__(self):
+        self.edges = {}
+        self.final = False
+
+    def signature(self):
+        # Children are already canonical, so their identity is their content
+        return self.final, tuple((label, id(child)) for label, child in sorted(self.edges.items()))
+
+
+def build(words: Iterable[str]) -> bytes:
+    """
+    Compile words into the index format.
+
+    Uses incremental construction over sorted input (Daciuk et al.): after
+    each word, the part of the previous word that is no longer shared is
+    merged with an equivalent registered node if one exists.
+    """
+    ordered = sorted({w for w in (normalize_word(word) for word in words) if w})
+    register = {}
+    root = _BuildNode()
+    unchecked = []  # (parent, label, child) along the previous word
+    previous = ''
+
+    def minimize(down_to: int) -> None:
+        while len(unchecked) > down_to:
+            parent, label, child = unchecked.pop()
+            key = child.signature()
+            existing = register.get(key)
+            if existing is not None:
+                parent.edges[label] = existing
+            else:
+                register[key] = child
+
+    for word in ordered:
+        common = 0
+        while common < min(len(word), len(previous)) and word[common] == previous[common]:
+            common += 1
+        minimize(common)
+        node = unchecked[-1][2] if unchecked else root
+        for ch in word[common:]:
+            child = _BuildNode()
+            node.edges[ord(ch)] = child
+            unchecked.append((node, ord(ch), child))
+            node = child
+        node.final = True
+        previous = word
+    minimize(0)
+
+    # Number nodes breadth-first so the root is 0 and edges of one node are
+    # written contiguously
+    numbers = {id(root): 0}
+    order = [root]
+    for node in order:
+        for _, child in sorted(node.edges.items()):
+            if id(child) not in numbers:
+                numbers[id(child)] = len(order)
+                order.append(child)
+
+    # Shortest and longest remaining word and the letters below each node
+    # (depth-first; words are short, so the recursion stays shallow)
+    rest = {}
+
+    def measure(node: _BuildNode):
+        if id(node) not in rest:
+            below = [(label, measure(child)) for label, child in node.edges.items()]
+            mask = 0
+            for label, (_, _, child_mask) in below:
+                mask |= _BIT[label] | child_mask
+            rest[id(node)] = (0 if node.final else min((low for _, (low, _, _) in below), default=-1) + 1,
+                              max((high for _, (_, high, _) in below), default=-1) + 1,
+                              mask)
+        return rest[id(node)]
+
+    measure(root)
+
+    nodes = bytearray()
+    labels = bytearray()
+    targets = bytearray()
+    for node in order:
+        low, high, mask = rest[id(node)]
+        nodes += _NODE.pack(len(labels), len(node.edges), node.final, low, high, mask)
+        for label, child in sorted(node.edges.items()):
+            labels.append(label)
+            targets += _TARGET.pack(numbers[id(child)])
+
+    longest = max((len(w) for w in ordered), default=0)
+    header = _HEADER.pack(MAGIC, len(order), len(labels), len(ordered), 0, longest)
+    return header + bytes(nodes) + bytes(labels) + bytes(targets)
+
+
+def build_file(source: str, target: str) -> dict:
+    """Compile a word list file (one word per line, '#' comments) into an index file"""
+    with open(source, encoding='utf-8') as f:
+        words = [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+    data = build(words)
+    tmp_path = target + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, target)
+    with WordIndex(target) as index:
+        return index.stats()
+
+
+# ==================== QUERIES ====================
+
+class WordIndex:
+    """Read-only view over a memory-mapped index file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.node_count, self.edge_count, self.word_count, self.root, self.max_length = \
+            _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self._map.close()
+            raise ValueError(f'{path} is not a word index')
+        self._nodes = _HEADER.size
+        self._labels = self._nodes + self.node_count * _NODE.size
+        self._targets = self._labels + self.edge_count
+        if self._targets + self.edge_count * _TARGET.size != len(self._map):
+            self._map.close()
+            raise ValueError(f'{path} is truncated or corrupt')
+
+    def close(self) -> None:
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.word_count
+
+    # -------------------- traversal --------------------
+
+    def _node(self, node: int):
+        return _NODE.unpack_from(self._map, self._nodes + node * _NODE.size)
+
+    def _step(self, node: int, label: int) -> Optional[int]:
+        first, count = self._node(node)[:2]
+        start = self._labels + first
+        i = self._map.find(bytes((label,)), start, start + count)
+        if i < 0:
+            return None
+        return _TARGET.unpack_from(self._map, self._targets + (i - self._labels) * _TARGET.size)[0]
+
+    def _edges(self, node: int, first: int, count: int):
+        start = self._labels + first
+        labels = self._map[start:start + count]
+        targets = struct.unpack_from(f'<{count}I', self._map, self._targets + first * _TARGET.size)
+        return zip(labels, targets)
+
+    def _walk(self, word: str) -> Optional[int]:
+        node = self.root
+        for ch in word.encode('ascii', 'replace'):
+            node = self._step(node, ch)
+            if node is None:
+                return None
+        return node
+
+    # -------------------- public queries --------------------
+
+    def contains(self, word: str) -> bool:
+        """True if the (normalized) word is in the index"""
+        normalized = normalize_word(word)
+        if normalized is None:
+            return False
+        node = self._walk(normalized)
+        return node is not None and self._node(node)[2] == 1
+
+    __contains__ = contains
+
+    def match(self, pattern: str, limit: int = 20) -> List[str]:
+        """
+        Words fitting a crossword pattern, in alphabetical order.
+
+        Letters are fixed, `_`, `?` or `.` stand for any one letter:
+        `J_K_RTA` matches JAKARTA.
+        """
+        pattern = ''.join(ch if ch in WILDCARDS else ch.upper() for ch in pattern if not ch.isspace())
+        if not pattern or len(pattern) > self.max_length:
+            return []
+        wanted = [None if ch in WILDCARDS else ord(ch) for ch in pattern]
+        out: List[str] = []
+        self._match(self.root, wanted, 0, bytearray(), out, limit)
+        return out
+
+    def _match(self, node: int, wanted, depth: int, prefix: bytearray, out: List[str], limit: int) -> None:
+        first, count, final, low, high, _ = self._node(node)
+        remaining = len(wanted) - depth
+        if remaining < low or remaining > high:
+            return
+        if remaining == 0:
+            if final:
+                out.append(prefix.decode('ascii'))
+            return
+        label = wanted[depth]
+        if label is not None:
+            child = self._step(node, label)
+            if child is not None:
+                prefix.append(label)
+                self._match(child, wanted, depth + 1, prefix, out, limit)
+                prefix.pop()
+            return
+        for label, child in self._edges(node, first, count):
+            prefix.append(label)
+            self._match(child, wanted, depth + 1, prefix, out, limit)
+            prefix.pop()
+            if len(out) >= limit:
+                return
+
+    def suggest(self, length: Optional[int] = None, prefix: str = '', contains: str = '',
+                limit: int = 20) -> List[str]:
+        """
+        Words by shape: an exact length, a prefix, and letters that must
+        all appear (each as often as given), in alphabetical order.
+        """
+        start = normalize_word(prefix) if prefix else ''
+        if start is None:
+            return []
+        node = self._walk(start)
+        if node is None:
+            return []
+        need = {}
+        for ch in (normalize_answer(contains) if contains else ''):
+            need[ord(ch)] = need.get(ord(ch), 0) + 1
+        if any(label not in _BIT for label in need):
+            return []
+        for label in start.encode('ascii'):
+            if label in need:
+                need[label] -= 1
+        out: List[str] = []
+        rest = None if length is None else length - len(start)
+        if rest is not None and rest < 0:
+            return out
+        self._suggest(node, rest, need, bytearray(start.encode('ascii')), out, limit)
+        return out
+
+    def _suggest(self, node: int, rest: Optional[int], need: dict, prefix: bytearray,
+                 out: List[str], limit: int) -> None:
+        first, count, final, low, high, below = self._node(node)
+        missing = 0
+        letters = 0
+        for label, n in need.items():
+            if n > 0:
+                missing += n
+                letters |= _BIT[label]
+        if missing > high or letters & ~below:
+            return
+        if rest is not None and (rest < low or rest > high or missing > rest):
+            return
+        if final and missing == 0 and (rest is None or rest == 0):
+            out.append(prefix.decode('ascii'))
+            if len(out) >= limit:
+                return
+        if rest == 0:
+            return
+        for label, child in self._edges(node, first, count):
+            if label in need:
+                need[label] -= 1
+            prefix.append(label)
+            self._suggest(child, None if rest is None else rest - 1, need, prefix, out, limit)
+            prefix.pop()
+            if label in need:
+                need[label] += 1
+            if len(out) >= limit:
+                return
+
+    def similar(self, word: str, limit: int = 10) -> List[str]:
+        """Indexed words one edit (substitution, insertion, deletion) away"""
+        normalized = normalize_word(word)
+        if normalized is None:
+            return []
+        target = normalized.encode('ascii')
+        found = set()
+        self._similar(self.root, target, 0, 1, bytearray(), found, limit * 4)
+        found.discard(normalized)
+        return sorted(found)[:limit]
+
+    def _similar(self, node: int, target: bytes, i: int, budget: int, prefix: bytearray,
+                 found: set, cap: int) -> None:
+        if len(found) >= cap:
+            return
+        first, count, final, low, high, _ = self._node(node)
+        left = len(target) - i
+        if left - budget > high or left + budget < low:
+            return
+        if final and left <= budget:
+            found.add(prefix.decode('ascii'))
+        if budget and i < len(target):
+            # Deletion: skip a letter of the word
+            self._similar(node, target, i + 1, budget - 1, prefix, found, cap)
+        for label, child in self._edges(node, first, count):
+            prefix.append(label)
+            if i < len(target) and label == target[i]:
+                self._similar(child, target, i + 1, budget, prefix, found, cap)
+            elif budget:
+                if i < len(target):
+                    self._similar(child, target, i + 1, budget - 1, prefix, found, cap)  # substitution
+                self._similar(child, target, i, budget - 1, prefix, found, cap)  # insertion
+            prefix.pop()
+
+    def stats(self) -> dict:
+        return {
+            'words': self.word_count,
+            'nodes': self.node_count,
+            'edges': self.edge_count,
+            'bytes': len(self._map),
+            'max_length': self.max_length
+        }
+
+
+def open_index(path: str) -> Optional[WordIndex]:
+    """Open an index file, or None when it is missing or unreadable"""
+    try:
+        return WordIndex(path)
+    except (OSError, ValueError):
+        return None
+
+
+def main(argv: List[str]) -> int:
+    if len(argv) == 3 and argv[0] == 'build':
+        stats = build_file(argv[1], argv[2])
+        print(f"{argv[2]}: {stats['words']} words, {stats['nodes']} nodes, "
+              f"{stats['edges']} edges, {stats['bytes']} bytes")
+        return 0
+    if len(argv) == 3 and argv[0] == 'query':
+        with WordIndex(argv[1]) as index:
+            query = argv[2]
+            if any(ch in WILDCARDS for ch in query):
+                print(' '.join(index.match(query, limit=50)) or '(no match)')
+            elif index.contains(query):
+                print(f'{normalize_word(query)}: known')
+            else:
+                print(f"{query}: unknown; similar: {' '.join(index.similar(query)) or '-'}")
+        return 0
+    print(__doc__.strip().splitlines()[0])
+    print('usage: python wordindex.py build <words.txt> <index>')
+    print('       python wordindex.py query <index> <word or pattern>')
+    return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))